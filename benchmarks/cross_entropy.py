@@ -0,0 +1,92 @@
+"""
+交叉样本熵基准
+
+在一组通道上比较 cross_match_counts (所有通道的模板合并为一个共享索引，一次扫描统计所有通道对)
+与逐个通道对统计的方式 (每个通道对单独建立排序索引，调用 _cross_match_counts；对角线调用
+count_template_matches)，在每个粗粒化尺度上报告两者的运行时间，并检查所有通道对的匹配对数
+是否完全一致，不一致时以非零状态退出。同时报告前 --mv-channels 个通道的多元多尺度样本熵的运行时间
+(模板池为 通道数 × 样本数 个模板，计算量随通道数的平方增长)。
+
+通道由 adfecgdb 中第一个记录的所有通道组成；--channels 大于记录的通道数时，用随机混合的
+合成通道补足 (与 benchmarks.threshold_sweep 相同)。
+
+用法 (在项目根目录下):
+    python -m benchmarks.cross_entropy [--channels 通道数] [--samples 样本数] [--max-scale 尺度]
+                                       [--mv-channels 通道数]
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.threshold_sweep import load_signals
+from entropy.base_entropy import count_template_matches
+from entropy.streaming import _sorted_columns, _cross_match_counts
+from entropy.tiling import tile_elements
+from entropy.multivariate import _standardize, cross_match_counts, multivariate_multiscale_entropy
+from utils.signal_processing import iter_coarse_grained
+from config import SAMPEN_M, SAMPEN_R_RATIO
+
+def pairwise_counts(signals, m, r_ratio):
+    """对照: 每个通道对单独统计匹配对数"""
+    standardized = _standardize(signals)
+    n_channels, n = standardized.shape
+    tolerance = standardized.dtype.type(r_ratio)
+    max_elements = tile_elements(2 * standardized.itemsize + 8)
+    columns = [_sorted_columns(np.lib.stride_tricks.sliding_window_view(channel, m + 1)[:n - m])
+               for channel in standardized]
+    count_m = np.zeros((n_channels, n_channels), dtype=np.int64)
+    count_m1 = np.zeros((n_channels, n_channels), dtype=np.int64)
+    for a in range(n_channels):
+        count_m[a, a], count_m1[a, a] = count_template_matches(standardized[a], m, r_ratio)
+        for b in range(a + 1, n_channels):
+            counts = _cross_match_counts(columns[a], columns[b], tolerance, m, max_elements)
+            count_m[a, b] = count_m[b, a] = counts[0]
+            count_m1[a, b] = count_m1[b, a] = counts[1]
+    return count_m, count_m1
+
+def main():
+    parser = argparse.ArgumentParser(description="交叉样本熵基准")
+    parser.add_argument('--channels', type=int, default=32, help="通道数")
+    parser.add_argument('--samples', type=int, default=2000, help="每个通道的样本数")
+    parser.add_argument('--max-scale', type=int, default=20, help="最大尺度因子")
+    parser.add_argument('--mv-channels', type=int, default=4, help="计算多元多尺度样本熵的通道数")
+    args = parser.parse_args()
+
+    signals = load_signals(args.channels, args.samples)
+    print(f"{len(signals)} 通道 x {signals.shape[1]} 样本, m={SAMPEN_M}, r={SAMPEN_R_RATIO}")
+
+    # 各尺度的粗粒化序列分别用两种方式统计，粗尺度上序列很短，逐个通道对的调用开销占主要部分
+    shared_time = pairwise_time = 0.0
+    mismatched = []
+    for scale, coarse in enumerate(iter_coarse_grained(signals, args.max_scale), start=1):
+        start = time.perf_counter()
+        shared = cross_match_counts(coarse, SAMPEN_M, SAMPEN_R_RATIO)
+        shared_time += time.perf_counter() - start
+        start = time.perf_counter()
+        reference = pairwise_counts(coarse, SAMPEN_M, SAMPEN_R_RATIO)
+        pairwise_time += time.perf_counter() - start
+        if not all(np.array_equal(a, b) for a, b in zip(shared, reference)):
+            mismatched.append(scale)
+        if scale == 1:
+            print(f"  尺度1: 共享索引 {shared_time:.2f} s, 逐个通道对 {pairwise_time:.2f} s "
+                  f"(加速 {pairwise_time / shared_time:.2f}x)")
+    n_pairs = len(signals) * (len(signals) + 1) // 2
+    print(f"  {args.max_scale} 个尺度: 共享索引 {shared_time:.2f} s, 逐个通道对 ({n_pairs} 次/尺度) "
+          f"{pairwise_time:.2f} s (加速 {pairwise_time / shared_time:.2f}x)")
+
+    start = time.perf_counter()
+    mvmse = multivariate_multiscale_entropy(signals[:args.mv_channels], args.max_scale, SAMPEN_M, SAMPEN_R_RATIO)
+    print(f"  前 {args.mv_channels} 个通道的多元多尺度样本熵: {time.perf_counter() - start:.2f} s")
+    print(f"    {np.array2string(mvmse, precision=3)}")
+
+    if mismatched:
+        print(f"  错误: 以下尺度上共享索引与逐个通道对的匹配对数不一致: {mismatched}")
+        sys.exit(1)
+    print("  所有尺度、所有通道对的匹配对数一致")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+计算精度 (float32 / float64) 的精度回归检查
+
+在 adfecgdb 的真实记录上分别以 float64 和 float32 运行 加载 → 预处理 → 多尺度熵 → 相似度网络 → 网络指标，
+报告两种精度之间多尺度熵的最大绝对差、网络指标的最大相对差和邻接矩阵中边的一致性，以及各自的
+运行时间和峰值内存。任一差异超出下面的容差时以非零状态退出。
+
+用法 (在项目根目录下):
+    python -m benchmarks.dtype_accuracy [--max-samples 样本数] [--max-scale 尺度] [--families sampen fuzzy]
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preprocessing.edf_loader import load_edf
+from utils.signal_processing import preprocess_signal
+from entropy.mse import compute_multiscale_entropy, ENTROPY_FAMILIES
+from network_analysis.similarity import compute_similarity_matrix
+from network_analysis.construct_graph import threshold_similarity_matrix
+from network_analysis.network_metrics import compute_network_metrics
+from config import (SAMPEN_M, SAMPEN_R_RATIO, PE_ORDER, PE_DELAY, FUZZY_N, SIMILARITY_MEASURE,
+                    SIMILARITY_THRESHOLD, LOW_FREQ, HIGH_FREQ, FILTER_ORDER, SAMPLING_RATE)
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RECORD_DIR = os.path.join(REPO_DIR, "adfecgdb")
+
+# float32 相对 float64 的容差
+MSE_ABS_TOL = 1e-3  # 多尺度熵的最大绝对差
+SIMILARITY_ABS_TOL = 1e-5  # 相似度矩阵的最大绝对差；与阈值的距离小于该值的边允许不一致
+METRIC_REL_TOL = 1e-4  # 网络指标的最大相对差
+
+def run_pipeline(edf_path, dtype, max_samples, max_scale, families):
+    """以指定精度运行一个记录的计算流水线，返回结果、运行时间和tracemalloc记录的峰值分配"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    data, _, sfreq = load_edf(edf_path, channels=slice(0, 6), stop=max_samples, return_sfreq=True, dtype=dtype)
+    signals = preprocess_signal(data, LOW_FREQ, HIGH_FREQ, sfreq or SAMPLING_RATE, FILTER_ORDER, overwrite=True)
+    entropy = compute_multiscale_entropy(signals, max_scale, families, SAMPEN_M, SAMPEN_R_RATIO,
+                                         pe_order=PE_ORDER, pe_delay=PE_DELAY, n_fuzzy=FUZZY_N)
+    similarity = compute_similarity_matrix(signals, SIMILARITY_MEASURE)
+    adjacency = threshold_similarity_matrix(similarity, SIMILARITY_THRESHOLD)
+    metrics = compute_network_metrics(adjacency)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'entropy': entropy, 'similarity': similarity, 'adjacency': adjacency, 'metrics': metrics,
+            'time_s': elapsed, 'peak_bytes': peak, 'signal_dtype': signals.dtype}
+
+def compare_record(ref, test):
+    """
+    比较 float64 (ref) 与 float32 (test) 的结果
+
+    返回:
+    tuple: (差异字典, 超出容差的问题列表)
+    """
+    problems = []
+    diffs = {}
+    for family, values in ref['entropy'].items():
+        diff = np.abs(test['entropy'][family] - values)
+        # 两种精度下都为NaN/inf (匹配数为0) 的位置视为一致
+        same_invalid = ~np.isfinite(values) & ~np.isfinite(test['entropy'][family])
+        diff = np.where(same_invalid, 0.0, diff)
+        diffs[f'mse_{family}'] = float(np.nanmax(np.where(np.isnan(diff), np.inf, diff)))
+        if diffs[f'mse_{family}'] > MSE_ABS_TOL:
+            problems.append(f"{family} 多尺度熵最大绝对差 {diffs[f'mse_{family}']:.2e} > {MSE_ABS_TOL:.0e}")
+
+    diffs['similarity'] = float(np.max(np.abs(test['similarity'] - ref['similarity'])))
+    if diffs['similarity'] > SIMILARITY_ABS_TOL:
+        problems.append(f"相似度最大绝对差 {diffs['similarity']:.2e} > {SIMILARITY_ABS_TOL:.0e}")
+
+    edges_ref = ref['adjacency'] > 0
+    edges_test = test['adjacency'] > 0
+    disagree = edges_ref != edges_test
+    near_threshold = np.abs(ref['similarity'] - SIMILARITY_THRESHOLD) < SIMILARITY_ABS_TOL
+    n_pairs = edges_ref.size - edges_ref.shape[0]
+    diffs['edge_agreement'] = 1.0 - np.count_nonzero(disagree) / max(n_pairs, 1)
+    if np.any(disagree & ~near_threshold):
+        problems.append(f"{np.count_nonzero(disagree & ~near_threshold) // 2} 条远离阈值的边不一致")
+
+    worst = 0.0
+    for name, value in ref['metrics'].items():
+        other = test['metrics'][name]
+        if np.isnan(value) and np.isnan(other):
+            continue
+        rel = abs(other - value) / max(abs(value), 1e-12)
+        worst = max(worst, rel)
+        if not rel <= METRIC_REL_TOL:
+            problems.append(f"网络指标 {name} 相对差 {rel:.2e} > {METRIC_REL_TOL:.0e}")
+    diffs['metrics_rel'] = worst
+    return diffs, problems
+
+def main():
+    parser = argparse.ArgumentParser(description="检查float32计算精度相对float64的误差")
+    parser.add_argument('--max-samples', type=int, default=20000, help="每个通道使用的样本数，0表示整段记录")
+    parser.add_argument('--max-scale', type=int, default=10, help="最大尺度因子")
+    parser.add_argument('--families', nargs='+', default=list(ENTROPY_FAMILIES), choices=ENTROPY_FAMILIES,
+                        help="要比较的多尺度熵")
+    args = parser.parse_args()
+    max_samples = args.max_samples or None
+
+    edf_paths = sorted(glob.glob(os.path.join(RECORD_DIR, "*.edf")))
+    if not edf_paths:
+        print(f"在 {RECORD_DIR} 中没有找到EDF文件")
+        sys.exit(1)
+
+    all_problems = []
+    for edf_path in edf_paths:
+        name = os.path.basename(edf_path)
+        ref = run_pipeline(edf_path, np.float64, max_samples, args.max_scale, args.families)
+        test = run_pipeline(edf_path, np.float32, max_samples, args.max_scale, args.families)
+        if test['signal_dtype'] != np.float32:
+            all_problems.append(f"{name}: 预处理后的信号精度为 {test['signal_dtype']}，不是float32")
+        diffs, problems = compare_record(ref, test)
+        all_problems.extend(f"{name}: {p}" for p in problems)
+
+        print(f"记录 {name}")
+        for label, result in (('float64', ref), ('float32', test)):
+            print(f"  {label}: {result['time_s']:.2f} s, 峰值内存 {result['peak_bytes'] / 1024 ** 2:.1f} MiB")
+        print("  " + ", ".join(f"{key}={value:.3g}" for key, value in diffs.items()))
+
+    if all_problems:
+        print("错误: float32结果超出容差:")
+        for problem in all_problems:
+            print(f"  {problem}")
+        sys.exit(1)
+    print("float32结果均在容差范围内")
+
+if __name__ == "__main__":
+    main()
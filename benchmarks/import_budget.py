@@ -0,0 +1,67 @@
+"""
+启动开销检查
+
+在全新的解释器中导入计算入口 (main 以及各计算模块)，测量导入耗时，并检查
+matplotlib、可视化模块以及 mne、networkx、scipy.signal 等重量级依赖没有在导入时加载。
+超出时间预算或加载了禁止的模块时以非零状态退出。
+
+用法 (在项目根目录下):
+    python -m benchmarks.import_budget [--budget 秒] [--repeat 次数]
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 导入耗时预算(秒)
+IMPORT_BUDGET_S = 0.5
+
+# 仅计算入口在导入时不应加载的模块
+FORBIDDEN_MODULES = ['matplotlib', 'visualization', 'mne', 'networkx', 'scipy.signal', 'scipy.spatial', 'tqdm']
+
+_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import main
+elapsed = time.perf_counter() - start
+print(json.dumps({'elapsed': elapsed, 'loaded': [m for m in %r if m in sys.modules]}))
+""" % (FORBIDDEN_MODULES,)
+
+def measure_import(repeat=5):
+    """
+    在独立子进程中多次导入main
+    
+    返回:
+    tuple: (最短导入耗时(秒), 导入后已加载的禁止模块列表)
+    """
+    timings = []
+    loaded = set()
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', _PROBE], cwd=REPO_DIR)
+        result = json.loads(output.decode().strip().splitlines()[-1])
+        timings.append(result['elapsed'])
+        loaded.update(result['loaded'])
+    return min(timings), sorted(loaded)
+
+def main():
+    parser = argparse.ArgumentParser(description="检查计算入口的导入耗时")
+    parser.add_argument('--budget', type=float, default=IMPORT_BUDGET_S, help="导入耗时预算(秒)")
+    parser.add_argument('--repeat', type=int, default=5, help="测量次数")
+    args = parser.parse_args()
+    
+    elapsed, loaded = measure_import(args.repeat)
+    print(f"导入main耗时: {elapsed:.3f} s (预算 {args.budget:.3f} s)")
+    ok = True
+    if loaded:
+        print(f"错误: 导入时加载了重量级模块: {loaded}")
+        ok = False
+    if elapsed > args.budget:
+        print("错误: 导入耗时超出预算")
+        ok = False
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
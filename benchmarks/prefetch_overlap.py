@@ -0,0 +1,106 @@
+"""
+加载与计算重叠的批处理基准
+
+在 adfecgdb 的记录上分别以关闭和开启后台预取 (PREFETCH_RECORDS) 的方式运行仅计算模式的批处理，
+每次运行前用 posix_fadvise 把EDF文件从页缓存中清除 (冷磁盘)。报告总墙钟时间、加载阶段和计算阶段
+(预处理、熵、网络、保存) 各自的总时间，以及最慢阶段的时间，即完全重叠时批处理时间的下限。
+
+本机磁盘很快时加载只占很少时间；--read-mbps 在加载后按文件大小等待，模拟较慢的磁盘。
+
+用法 (在项目根目录下):
+    python -m benchmarks.prefetch_overlap [--max-samples 样本数] [--read-mbps 速度] [--depth 预取数]
+"""
+import os
+import sys
+import glob
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from utils.profiling import get_events
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RECORD_DIR = os.path.join(REPO_DIR, "adfecgdb")
+
+COMPUTE_STAGES = ['preprocess', 'entropy', 'entropy_extra', 'graph', 'metrics', 'dynamic_network', 'persist']
+
+def evict_page_cache(paths):
+    """把文件从页缓存中清除，使下一次读取来自磁盘"""
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+def run_batch(prefetch_depth, max_samples, read_mbps, work_dir):
+    """运行一次批处理，返回 (墙钟时间, 加载总时间, 计算总时间)"""
+    load_record = main.load_record
+    process_single_file = main.process_single_file
+
+    def throttled_load(edf_path, max_samples=max_samples, n_max_channels=6):
+        loaded = load_record(edf_path, max_samples, n_max_channels)
+        if read_mbps:
+            time.sleep(os.path.getsize(edf_path) / (read_mbps * 1024 ** 2))
+        return loaded
+
+    def limited_process(edf_path, max_samples=max_samples, n_workers=main.N_WORKERS, loaded=None):
+        if loaded is None:
+            loaded = throttled_load(edf_path, max_samples)
+        return process_single_file(edf_path, max_samples, n_workers, loaded)
+
+    main.load_record, main.process_single_file = throttled_load, limited_process
+    main.PREFETCH_RECORDS = prefetch_depth
+    get_events(clear=True)
+    evict_page_cache(glob.glob(os.path.join(RECORD_DIR, "*.edf")))
+    try:
+        start = time.perf_counter()
+        main.run_batch_analysis(profile=True, profile_memory=False, headless=True)
+        wall = time.perf_counter() - start
+    finally:
+        main.load_record, main.process_single_file = load_record, process_single_file
+
+    events = get_events(clear=True)
+    load = sum(e['dur'] for e in events if e['name'] == 'load') / 1e6
+    if read_mbps:
+        # 模拟的读取等待不在 'load' 阶段内计时，单独计入
+        total_bytes = sum(os.path.getsize(path) for path in glob.glob(os.path.join(main.DATA_DIR, "*.edf")))
+        load += total_bytes / (read_mbps * 1024 ** 2)
+    compute = sum(e['dur'] for e in events if e['name'] in COMPUTE_STAGES) / 1e6
+    return wall, load, compute
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="加载与计算重叠的批处理基准")
+    parser.add_argument('--max-samples', type=int, default=20000, help="每个通道使用的样本数")
+    parser.add_argument('--read-mbps', type=float, default=0, help="模拟的磁盘读取速度(MB/s)，0表示不模拟")
+    parser.add_argument('--depth', type=int, default=2, help="开启预取时的队列深度")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="prefetch_bench_")
+    main.DATA_DIR = RECORD_DIR
+    main.OUTPUT_DIR = os.path.join(work_dir, "output")
+    main.RESULTS_STORE_DIR = os.path.join(work_dir, "results_store")
+    main.CACHE_ENABLED = False
+    main.BATCH_WORKERS = 1
+    main.print = lambda *a, **k: None  # 只输出基准结果
+
+    try:
+        rows = []
+        for label, depth in (("子进程中加载", 0), (f"后台预取 (深度 {args.depth})", args.depth)):
+            wall, load, compute = run_batch(depth, args.max_samples, args.read_mbps, work_dir)
+            rows.append((label, wall, load, compute))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"{'方式':<20}{'墙钟(s)':>10}{'加载(s)':>10}{'计算(s)':>10}{'最慢阶段(s)':>14}{'串行和(s)':>12}")
+    for label, wall, load, compute in rows:
+        print(f"{label:<20}{wall:>10.2f}{load:>10.2f}{compute:>10.2f}{max(load, compute):>14.2f}"
+              f"{load + compute:>12.2f}")
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,132 @@
+"""
+QRS注释读取与HRV分析基准
+
+对 adfecgdb 中每个记录的 `.edf.qrs` 注释文件:
+    - 比较向量化的 read_annotations 与逐个字解码、为每个注释创建字典的读取方式，检查两者的样本位置
+      和注释类型完全一致 (不一致时以非零状态退出)，并报告读取时间
+    - 比较下标数组一次分段计算逐搏特征与逐个心搏切片计算的时间，检查结果一致
+    - 报告整段记录的HRV分析 (RR间期和逐搏特征序列的多尺度熵和网络) 的时间，并与原始信号前
+      --samples 个样本的多尺度样本熵的时间比较
+
+用法 (在项目根目录下):
+    python -m benchmarks.qrs_annotations [--samples 样本数] [--repeat 次数]
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preprocessing.edf_loader import load_edf
+from preprocessing.annotations import read_annotations, read_qrs_peaks
+from utils.signal_processing import preprocess_signal
+from utils.beats import beat_segments, beat_features
+from entropy.mse import compute_mse_batch
+from pipeline.hrv import hrv_analysis
+from config import (LOW_FREQ, HIGH_FREQ, FILTER_ORDER, SAMPEN_M, SAMPEN_R_RATIO, MSE_MAX_SCALE, HRV_MAX_SCALE,
+                    HRV_RR_RANGE, HRV_BEAT_WINDOW, HRV_BEAT_FEATURE, SIMILARITY_MEASURE, SIMILARITY_THRESHOLD)
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RECORD_DIR = os.path.join(REPO_DIR, "adfecgdb")
+
+def naive_read(annotation_path):
+    """对照: 逐个字解码，每个注释一个字典"""
+    with open(annotation_path, 'rb') as f:
+        raw = f.read()
+    annotations = []
+    sample = 0
+    pos = 0
+    while pos + 1 < len(raw):
+        word = raw[pos] | (raw[pos + 1] << 8)
+        pos += 2
+        code, interval = word >> 10, word & 0x3FF
+        if word == 0:
+            break
+        if code == 59:
+            high = raw[pos] | (raw[pos + 1] << 8)
+            low = raw[pos + 2] | (raw[pos + 3] << 8)
+            skip = (high << 16) | low
+            sample += skip - (1 << 32) if skip >= (1 << 31) else skip
+            pos += 4
+        elif code == 63:
+            annotations[-1]['aux'] = raw[pos:pos + interval].decode('latin-1')
+            pos += interval + (interval & 1)
+        elif code in (60, 61, 62):
+            continue
+        else:
+            sample += interval
+            annotations.append({'sample': sample, 'code': code})
+    return annotations
+
+def naive_features(signals, peaks, before, after):
+    """对照: 逐个心搏切片计算峰峰值"""
+    values = []
+    for peak in peaks:
+        if peak - before >= 0 and peak + after < signals.shape[1]:
+            segment = signals[:, peak - before:peak + after + 1]
+            values.append(segment.max(axis=1) - segment.min(axis=1))
+    return np.array(values).T
+
+def timed(func, repeat):
+    """运行 repeat 次，返回 (最后一次的结果, 最短时间)"""
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+def main():
+    parser = argparse.ArgumentParser(description="QRS注释读取与HRV分析基准")
+    parser.add_argument('--samples', type=int, default=20000, help="对照的原始信号多尺度熵的样本数")
+    parser.add_argument('--repeat', type=int, default=20, help="读取和分段计时的重复次数")
+    args = parser.parse_args()
+
+    failed = False
+    for edf_path in sorted(glob.glob(os.path.join(RECORD_DIR, "*.edf"))):
+        qrs_path = edf_path + '.qrs'
+        if not os.path.exists(qrs_path):
+            continue
+        name = os.path.basename(edf_path)
+        (samples, codes, _), fast = timed(lambda: read_annotations(qrs_path), args.repeat)
+        reference, slow = timed(lambda: naive_read(qrs_path), args.repeat)
+        if (not np.array_equal(samples, [a['sample'] for a in reference])
+                or not np.array_equal(codes, [a['code'] for a in reference])):
+            print(f"  错误: {name} 向量化读取与逐个解码的结果不一致")
+            failed = True
+
+        data, labels, sfreq = load_edf(edf_path, return_sfreq=True, verbose=False)
+        signals = preprocess_signal(data, LOW_FREQ, HIGH_FREQ, sfreq, FILTER_ORDER)
+        peaks = read_qrs_peaks(qrs_path, sfreq)
+        before, after = int(round(HRV_BEAT_WINDOW[0] * sfreq)), int(round(HRV_BEAT_WINDOW[1] * sfreq))
+        features, batched = timed(lambda: beat_features(beat_segments(signals, peaks, before, after)[0]),
+                                  args.repeat)
+        reference, looped = timed(lambda: naive_features(signals, peaks, before, after), args.repeat)
+        if not np.allclose(features['amplitude'], reference):
+            print(f"  错误: {name} 批量分段与逐个心搏的峰峰值不一致")
+            failed = True
+
+        start = time.perf_counter()
+        hrv = hrv_analysis(signals, labels, peaks, sfreq, HRV_MAX_SCALE, SAMPEN_M, SAMPEN_R_RATIO, False,
+                           SIMILARITY_MEASURE, SIMILARITY_THRESHOLD, HRV_BEAT_WINDOW, HRV_RR_RANGE,
+                           HRV_BEAT_FEATURE)
+        hrv_time = time.perf_counter() - start
+        start = time.perf_counter()
+        compute_mse_batch(signals[:, :args.samples], MSE_MAX_SCALE, SAMPEN_M, SAMPEN_R_RATIO)
+        raw_time = time.perf_counter() - start
+
+        print(f"{name}: {len(samples)} 个注释, {len(peaks)} 个心搏, {len(labels)} 通道 x {signals.shape[1]} 样本")
+        print(f"  读取注释: 向量化 {fast * 1e3:.3f} ms, 逐个解码 {slow * 1e3:.3f} ms (加速 {slow / fast:.1f}x)")
+        print(f"  逐搏特征: 批量分段 {batched * 1e3:.2f} ms, 逐个心搏 {looped * 1e3:.2f} ms "
+              f"(加速 {looped / batched:.1f}x)")
+        print(f"  整段记录的HRV分析 ({hrv['series'].shape[1]} 个心搏): {hrv_time * 1e3:.1f} ms; "
+              f"原始信号前 {args.samples} 个样本的多尺度熵: {raw_time:.2f} s")
+    if failed:
+        sys.exit(1)
+    print("所有记录的注释和逐搏特征与逐个计算的结果一致")
+
+if __name__ == "__main__":
+    main()
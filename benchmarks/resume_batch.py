@@ -0,0 +1,134 @@
+"""
+可续跑批处理与分片的检查
+
+在 adfecgdb 的记录上以仅计算模式运行批处理:
+    - 完整运行一次，作为对照
+    - 再运行一次，在运行清单中出现第一个完成的记录后强制终止 (SIGKILL)，然后用同一运行目录续跑:
+      检查终止前完成的记录没有被重新计算 (清单中的记录不变)，续跑后所有记录都完成，且网络指标与
+      完整运行一致
+    - 以 --shards 个分片同时运行到同一目录: 检查每个记录恰好由一个分片完成，合并后的网络指标与
+      完整运行一致
+报告各次运行的墙钟时间，不一致时以非零状态退出。
+
+用法 (在项目根目录下):
+    python -m benchmarks.resume_batch [--max-samples 样本数] [--shards 分片数]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import argparse
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from pipeline.manifest import manifest_name
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RECORD_DIR = os.path.join(REPO_DIR, "adfecgdb")
+
+def run_batch(run_dir, shard=None):
+    """在当前进程中运行一次仅计算模式的批处理"""
+    main.run_batch_analysis(profile=False, profile_memory=False, headless=True, resume=run_dir, shard=shard)
+
+def start_batch(run_dir, shard=None):
+    """在子进程中运行批处理"""
+    process = multiprocessing.get_context('fork').Process(target=run_batch, args=(run_dir, shard))
+    process.start()
+    return process
+
+def read_records(path):
+    """清单中的记录，清单不存在或不完整时为空"""
+    try:
+        with open(path) as f:
+            return json.load(f)['records']
+    except (OSError, ValueError, KeyError):
+        return {}
+
+def read_summary(run_dir):
+    """运行目录中的网络指标汇总"""
+    with open(os.path.join(run_dir, "network_metrics_comparison_summary.json")) as f:
+        return json.load(f)
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="可续跑批处理与分片的检查")
+    parser.add_argument('--max-samples', type=int, default=5000, help="每个通道使用的样本数")
+    parser.add_argument('--shards', type=int, default=2, help="同时运行的分片数")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="resume_bench_")
+    main.DATA_DIR = RECORD_DIR
+    main.OUTPUT_DIR = os.path.join(work_dir, "output")
+    main.CACHE_ENABLED = False
+    main.RESULTS_STORE_ENABLED = False
+    main.BATCH_WORKERS = 1
+    main.MAX_SAMPLES = args.max_samples
+    main.load_record.__defaults__ = (args.max_samples, 6)
+    main.print = lambda *a, **k: None  # 只输出检查结果
+
+    failed = False
+    try:
+        # 完整运行
+        full_dir = os.path.join(work_dir, "full")
+        start = time.perf_counter()
+        run_batch(full_dir)
+        full_time = time.perf_counter() - start
+        expected = read_summary(full_dir)
+        print(f"完整运行: {len(expected)} 个记录, {full_time:.2f} s")
+
+        # 在第一个记录完成后终止，再续跑
+        resume_dir = os.path.join(work_dir, "resumed")
+        manifest_path = os.path.join(resume_dir, manifest_name())
+        start = time.perf_counter()
+        process = start_batch(resume_dir)
+        while process.is_alive() and not read_records(manifest_path):
+            time.sleep(0.01)
+        os.kill(process.pid, signal.SIGKILL)
+        process.join()
+        before = read_records(manifest_path)
+        start_resume = time.perf_counter()
+        run_batch(resume_dir)
+        resume_time = time.perf_counter() - start_resume
+        after = read_records(manifest_path)
+        print(f"终止前完成 {len(before)} 个记录; 续跑完成其余 {len(after) - len(before)} 个记录, "
+              f"{resume_time:.2f} s (含终止前共 {time.perf_counter() - start:.2f} s)")
+        if any(after.get(name) != entry for name, entry in before.items()):
+            print("  错误: 终止前完成的记录在续跑时被重新计算")
+            failed = True
+        if read_summary(resume_dir) != expected:
+            print("  错误: 续跑后的网络指标与完整运行不一致")
+            failed = True
+
+        # 多个分片同时运行到同一目录
+        shard_dir = os.path.join(work_dir, "sharded")
+        start = time.perf_counter()
+        processes = [start_batch(shard_dir, (i, args.shards)) for i in range(args.shards)]
+        for process in processes:
+            process.join()
+        shard_time = time.perf_counter() - start
+        counts = {}
+        for i in range(args.shards):
+            for name in read_records(os.path.join(shard_dir, manifest_name((i, args.shards)))):
+                counts[name] = counts.get(name, 0) + 1
+        print(f"{args.shards} 个分片同时运行: 各分片完成 {sum(counts.values())} 个记录, {shard_time:.2f} s")
+        if sorted(counts) != sorted(expected) or any(count != 1 for count in counts.values()):
+            print(f"  错误: 记录没有恰好由一个分片完成: {counts}")
+            failed = True
+        # 同时结束的分片各自的汇总可能不完整；用一次不分片的续跑 (不重新计算任何记录) 重新生成合并的汇总
+        run_batch(shard_dir)
+        if read_summary(shard_dir) != expected:
+            print("  错误: 合并分片后的网络指标与完整运行不一致")
+            failed = True
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if failed:
+        sys.exit(1)
+    print("续跑和分片的结果与完整运行一致，已完成的记录没有被重新计算")
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,244 @@
+"""
+流水线各阶段的性能基准
+
+对每个阶段 (加载、预处理、粗粒化、多尺度熵、相似度网络、网络指标) 记录运行时间
+和峰值内存，数据包括 adfecgdb 中的真实记录以及样本数、通道数、最大尺度逐步增大的
+合成信号。结果保存为JSON，可用 --compare 比较不同提交的结果。
+
+用法 (在项目根目录下):
+    python -m benchmarks.run_benchmarks [--quick] [--output 结果文件.json]
+    python -m benchmarks.run_benchmarks --compare 旧结果.json 新结果.json
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import datetime
+import platform
+import subprocess
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preprocessing.edf_loader import load_edf
+from utils.signal_processing import preprocess_signal, coarse_grain_time_series, coarse_grain_all_scales
+from entropy.mse import compute_mse_batch, compute_multiscale_entropy
+from network_analysis.similarity import compute_similarity_matrix
+from network_analysis.construct_graph import construct_similarity_graph, threshold_similarity_matrix
+from network_analysis.network_metrics import compute_network_metrics
+from config import SAMPEN_M, SAMPEN_R_RATIO, SIMILARITY_THRESHOLD, LOW_FREQ, HIGH_FREQ, SAMPLING_RATE
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RECORD_DIR = os.path.join(REPO_DIR, "adfecgdb")
+RESULTS_DIR = os.path.join(REPO_DIR, "benchmarks", "results")
+
+# 合成信号的扫描范围: (完整模式, 快速模式)
+SAMPLE_SWEEP = ([1000, 2000, 5000, 10000, 20000, 50000], [1000, 2000, 5000])
+CHANNEL_SWEEP = ([4, 8, 16, 32, 64, 128, 256], [4, 16, 64])
+SCALE_SWEEP = ([5, 10, 20, 30, 40], [5, 10, 20])
+
+def measure(func, repeat=3):
+    """
+    测量函数的运行时间和峰值内存
+    
+    参数:
+    func (callable): 无参数函数
+    repeat (int): 计时重复次数
+    
+    返回:
+    dict: 最短时间、中位时间(秒) 以及 tracemalloc 记录的峰值分配(字节)
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    
+    # 内存单独测量一次，避免tracemalloc的开销影响计时
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    return {'time_s': min(times), 'time_median_s': float(np.median(times)), 'peak_bytes': peak}
+
+def synthetic_signals(n_channels, n_samples, seed=0):
+    """生成带有通道间相关性的合成信号 (随机游走分量 + 公共分量 + 白噪声)"""
+    rng = np.random.default_rng(seed)
+    common = rng.standard_normal(n_samples)
+    walk = np.cumsum(rng.standard_normal((n_channels, n_samples)), axis=1) * 0.05
+    return walk + 0.5 * common + rng.standard_normal((n_channels, n_samples))
+
+def stage_functions(signals, max_scale):
+    """返回在给定信号上运行各计算阶段的无参数函数"""
+    similarity = compute_similarity_matrix(signals, 'correlation')
+    adjacency = threshold_similarity_matrix(similarity, SIMILARITY_THRESHOLD)
+    return {
+        'preprocess': lambda: preprocess_signal(signals, LOW_FREQ, HIGH_FREQ, SAMPLING_RATE),
+        'coarse_grain_loop': lambda: [[coarse_grain_time_series(s, k) for k in range(1, max_scale + 1)]
+                                      for s in signals],
+        'coarse_grain_all_scales': lambda: coarse_grain_all_scales(signals, max_scale),
+        'mse': lambda: compute_mse_batch(signals, max_scale, SAMPEN_M, SAMPEN_R_RATIO),
+        'mpe': lambda: compute_multiscale_entropy(signals, max_scale, ('permutation',)),
+        'mfe': lambda: compute_multiscale_entropy(signals, max_scale, ('fuzzy',), SAMPEN_M, SAMPEN_R_RATIO),
+        'similarity_correlation': lambda: compute_similarity_matrix(signals, 'correlation'),
+        'similarity_phase_sync': lambda: compute_similarity_matrix(signals, 'phase_sync'),
+        'similarity_mutual_info': lambda: compute_similarity_matrix(signals, 'mutual_info'),
+        'construct_graph': lambda: construct_similarity_graph(signals, 'correlation', SIMILARITY_THRESHOLD),
+        'network_metrics': lambda: compute_network_metrics(adjacency),
+    }
+
+def run_record_benchmarks(repeat, max_samples, max_scale):
+    """在 adfecgdb 的真实记录上运行所有阶段"""
+    results = []
+    for edf_path in sorted(glob.glob(os.path.join(RECORD_DIR, "*.edf"))):
+        name = os.path.basename(edf_path)
+        print(f"记录 {name}")
+        entry = {'record': name, 'stages': {}}
+        entry['stages']['load_full'] = measure(lambda: load_edf(edf_path), repeat)
+        entry['stages']['load_window'] = measure(lambda: load_edf(edf_path, channels=slice(0, 6),
+                                                                  stop=max_samples), repeat)
+        data, _, sfreq = load_edf(edf_path, channels=slice(0, 6), stop=max_samples, return_sfreq=True)
+        signals = preprocess_signal(data, LOW_FREQ, HIGH_FREQ, sfreq)
+        for stage, func in stage_functions(signals, max_scale).items():
+            entry['stages'][stage] = measure(func, repeat)
+        results.append(entry)
+    return results
+
+def run_sweep(parameter, values, repeat, base):
+    """
+    固定其他参数，扫描一个参数 (n_samples, n_channels 或 max_scale)
+    
+    参数:
+    parameter (str): 被扫描的参数名
+    values (list): 参数取值
+    repeat (int): 计时重复次数
+    base (dict): 其他参数的基准取值
+    
+    返回:
+    list: 每个取值对应的各阶段测量结果
+    """
+    results = []
+    for value in values:
+        params = dict(base, **{parameter: value})
+        print(f"扫描 {parameter}={value}")
+        signals = synthetic_signals(params['n_channels'], params['n_samples'])
+        funcs = stage_functions(signals, params['max_scale'])
+        # 熵的开销与通道数线性相关，通道扫描时只测一个通道以控制总时间
+        if parameter == 'n_channels':
+            funcs['mse'] = lambda: compute_mse_batch(signals[:1], params['max_scale'], SAMPEN_M, SAMPEN_R_RATIO)
+            funcs['mfe'] = lambda: compute_multiscale_entropy(signals[:1], params['max_scale'], ('fuzzy',),
+                                                              SAMPEN_M, SAMPEN_R_RATIO)
+        stages = {stage: measure(func, repeat) for stage, func in funcs.items()}
+        results.append({'params': params, 'stages': stages})
+    return results
+
+def scaling_report(sweeps):
+    """
+    计算每个阶段的运行时间随扫描参数增长的双对数斜率 (经验复杂度指数)
+    
+    返回:
+    dict: {参数名: {阶段名: 斜率}}
+    """
+    report = {}
+    for parameter, entries in sweeps.items():
+        x = np.array([entry['params'][parameter] for entry in entries], dtype=float)
+        report[parameter] = {}
+        for stage in entries[0]['stages']:
+            t = np.array([entry['stages'][stage]['time_s'] for entry in entries])
+            valid = t > 0
+            if valid.sum() >= 2:
+                report[parameter][stage] = float(np.polyfit(np.log(x[valid]), np.log(t[valid]), 1)[0])
+    return report
+
+def print_scaling_report(report):
+    """打印扩展性报告"""
+    print("\n扩展性报告 (运行时间 ~ 参数^斜率)")
+    for parameter, slopes in report.items():
+        print(f"\n  {parameter}:")
+        for stage, slope in slopes.items():
+            print(f"    {stage:<28s} {slope:6.2f}")
+
+def git_revision():
+    """当前提交的哈希，不在git仓库中时返回None"""
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare_results(old_path, new_path):
+    """比较两个基准结果文件中各阶段的运行时间和峰值内存"""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    
+    def flatten(result):
+        rows = {}
+        for entry in result.get('records', []):
+            for stage, values in entry['stages'].items():
+                rows[(entry['record'], stage)] = values
+        for parameter, entries in result.get('sweeps', {}).items():
+            for entry in entries:
+                for stage, values in entry['stages'].items():
+                    rows[(f"{parameter}={entry['params'][parameter]}", stage)] = values
+        return rows
+    
+    old_rows, new_rows = flatten(old), flatten(new)
+    print(f"{'case':<22s} {'stage':<28s} {'time old':>10s} {'time new':>10s} {'ratio':>7s} {'mem ratio':>9s}")
+    for key in sorted(set(old_rows) & set(new_rows)):
+        o, n = old_rows[key], new_rows[key]
+        ratio = n['time_s'] / o['time_s'] if o['time_s'] > 0 else np.nan
+        mem_ratio = n['peak_bytes'] / o['peak_bytes'] if o['peak_bytes'] > 0 else np.nan
+        print(f"{key[0]:<22s} {key[1]:<28s} {o['time_s']:10.4f} {n['time_s']:10.4f} {ratio:7.2f} {mem_ratio:9.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="流水线各阶段的性能基准")
+    parser.add_argument('--quick', action='store_true', help="使用较小的扫描范围")
+    parser.add_argument('--repeat', type=int, default=3, help="每项计时的重复次数")
+    parser.add_argument('--output', help="结果JSON路径，默认保存到 benchmarks/results/")
+    parser.add_argument('--no-records', action='store_true', help="跳过真实记录")
+    parser.add_argument('--no-sweeps', action='store_true', help="跳过合成信号扫描")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="比较两个结果文件")
+    args = parser.parse_args()
+    
+    if args.compare:
+        compare_results(*args.compare)
+        return
+    
+    mode = 1 if args.quick else 0
+    base = {'n_samples': 5000, 'n_channels': 6, 'max_scale': 10}
+    result = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'platform': {'python': platform.python_version(), 'numpy': np.__version__,
+                     'machine': platform.machine(), 'cpu_count': os.cpu_count()},
+        'base_params': base,
+    }
+    
+    if not args.no_records:
+        result['records'] = run_record_benchmarks(args.repeat, base['n_samples'], base['max_scale'])
+    if not args.no_sweeps:
+        result['sweeps'] = {
+            'n_samples': run_sweep('n_samples', SAMPLE_SWEEP[mode], args.repeat, base),
+            'n_channels': run_sweep('n_channels', CHANNEL_SWEEP[mode], args.repeat, base),
+            'max_scale': run_sweep('max_scale', SCALE_SWEEP[mode], args.repeat, base),
+        }
+        result['scaling'] = scaling_report(result['sweeps'])
+        print_scaling_report(result['scaling'])
+    
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        revision = (result['git_revision'] or 'nogit')[:8]
+        output = os.path.join(RESULTS_DIR, f"bench_{datetime.datetime.now():%Y%m%d_%H%M}_{revision}.json")
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"\n结果已保存到 {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+流式分析的延迟和吞吐量基准
+
+把 adfecgdb 中的记录按块回放给 StreamingAnalyzer，记录每个数据块的处理延迟 (中位数、P95、最大值)
+和吞吐量 (每秒处理的样本数以及相对实时的倍数)，并与每个步长都从头重算整个窗口的方式比较。
+同时把每次输出的多尺度熵与在同一段滤波后窗口上从头计算的结果比较，报告最大偏差。
+任一记录的P95延迟超过一个数据块的时长 (无法跟上实时数据)，或尺度1的最大偏差超过 --max-error 时
+以非零状态退出。
+
+用法 (在项目根目录下):
+    python -m benchmarks.streaming_latency [--seconds 秒] [--chunk 秒] [--window 秒] [--hop 秒] [--max-error 偏差]
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preprocessing.edf_reader import read_edf_header, read_edf_data, iter_edf_chunks
+from pipeline.streaming import StreamingAnalyzer
+from utils.signal_processing import StreamingBandpass
+from entropy.mse import compute_mse_batch
+from network_analysis.similarity import compute_similarity_matrix
+from network_analysis.construct_graph import threshold_similarity_matrix
+from network_analysis.network_metrics import compute_network_metrics
+from config import (SAMPEN_M, SAMPEN_R_RATIO, SIMILARITY_MEASURE, SIMILARITY_THRESHOLD, LOW_FREQ, HIGH_FREQ,
+                    FILTER_ORDER, STREAM_WINDOW, STREAM_HOP, STREAM_CHUNK, STREAM_MAX_SCALE, STREAM_WARMUP,
+                    STREAM_R_TOLERANCE)
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RECORD_DIR = os.path.join(REPO_DIR, "adfecgdb")
+
+def replay(edf_path, process, chunk_size, stop):
+    """按块回放记录，返回每块的处理延迟(秒)"""
+    latencies = []
+    for chunk in iter_edf_chunks(edf_path, chunk_size, slice(0, 6), stop=stop):
+        start = time.perf_counter()
+        process(chunk)
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies)
+
+def recompute_processor(n_channels, sfreq, window, hop, max_scale):
+    """对照: 每个步长都在完整窗口上从头计算多尺度熵和相似度网络"""
+    bandpass = StreamingBandpass(sfreq, LOW_FREQ, HIGH_FREQ, FILTER_ORDER)
+    state = {'buffer': np.zeros((n_channels, 0)), 'total': 0}
+
+    def process(chunk):
+        filtered = bandpass.process(chunk)
+        previous = state['total']
+        state['total'] += filtered.shape[1]
+        state['buffer'] = np.concatenate([state['buffer'], filtered], axis=1)[:, -window:]
+        # 本块内每个输出时刻都重算一次 (都在块结束时的窗口上计算，计算量与逐时刻重算相同)
+        n_emit = sum(1 for t in range(previous + 1, state['total'] + 1) if t >= window and (t - window) % hop == 0)
+        for _ in range(n_emit):
+            signals = state['buffer']
+            compute_mse_batch(signals, max_scale, SAMPEN_M, SAMPEN_R_RATIO)
+            similarity = compute_similarity_matrix(signals, SIMILARITY_MEASURE)
+            compute_network_metrics(threshold_similarity_matrix(similarity, SIMILARITY_THRESHOLD))
+    return process
+
+def entropy_error(edf_path, analyzer, sfreq, chunk_size, stop, max_scale):
+    """
+    增量多尺度熵与逐窗口重算的最大偏差
+
+    用另一个相同设计的流式滤波器得到同一段滤波后的数据流，在每个输出时刻的窗口上从头计算多尺度熵。
+    粗粒化的块从分析窗口的起点划分，与数据流中的划分位置不同，因此尺度大于1时即使容限相同也有
+    小的差异；尺度1的偏差只来自容限。
+
+    返回:
+    tuple: (尺度1的最大绝对偏差, 所有尺度的最大绝对偏差)
+    """
+    analyzer.reset()
+    bandpass = StreamingBandpass(sfreq, LOW_FREQ, HIGH_FREQ, FILTER_ORDER)
+    filtered, updates = [], []
+    for chunk in iter_edf_chunks(edf_path, chunk_size, slice(0, 6), stop=stop):
+        filtered.append(bandpass.process(chunk))
+        updates.extend(analyzer.push(chunk))
+    filtered = np.concatenate(filtered, axis=1)
+    first = overall = 0.0
+    for update in updates:
+        reference = compute_mse_batch(filtered[:, update['end'] - analyzer.window:update['end']], max_scale,
+                                      SAMPEN_M, SAMPEN_R_RATIO)
+        error = np.abs(update['mse'] - reference)
+        if np.isfinite(error[:, 0]).any():
+            first = max(first, float(np.nanmax(error[:, 0])))
+        if np.isfinite(error).any():
+            overall = max(overall, float(np.nanmax(error[np.isfinite(error)])))
+    return first, overall
+
+def summarize(latencies, n_samples, sfreq):
+    return {
+        'median_ms': float(np.median(latencies) * 1e3),
+        'p95_ms': float(np.percentile(latencies, 95) * 1e3),
+        'max_ms': float(latencies.max() * 1e3),
+        'samples_per_s': n_samples / latencies.sum(),
+        'realtime_factor': n_samples / sfreq / latencies.sum(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="流式分析的延迟和吞吐量基准")
+    parser.add_argument('--seconds', type=float, default=60.0, help="每个记录回放的时长(秒)")
+    parser.add_argument('--chunk', type=float, default=STREAM_CHUNK, help="数据块长度(秒)")
+    parser.add_argument('--window', type=float, default=STREAM_WINDOW, help="窗口长度(秒)")
+    parser.add_argument('--hop', type=float, default=STREAM_HOP, help="输出间隔(秒)")
+    parser.add_argument('--max-scale', type=int, default=STREAM_MAX_SCALE, help="最大尺度因子")
+    parser.add_argument('--no-baseline', action='store_true', help="跳过从头重算的对照")
+    parser.add_argument('--max-error', type=float, default=0.05, help="尺度1样本熵相对逐窗口重算的最大允许偏差")
+    args = parser.parse_args()
+
+    edf_paths = sorted(glob.glob(os.path.join(RECORD_DIR, "*.edf")))
+    if not edf_paths:
+        print(f"在 {RECORD_DIR} 中没有找到EDF文件")
+        sys.exit(1)
+
+    ok = True
+    for edf_path in edf_paths:
+        header = read_edf_header(edf_path)
+        _, labels, sfreq = read_edf_data(edf_path, slice(0, 6), 0, 0, header=header)
+        window, hop = int(round(args.window * sfreq)), int(round(args.hop * sfreq))
+        chunk_size = max(1, int(round(args.chunk * sfreq)))
+        stop = int(round(args.seconds * sfreq))
+
+        analyzer = StreamingAnalyzer(len(labels), sfreq, window, hop, args.max_scale, SAMPEN_M, SAMPEN_R_RATIO,
+                                     similarity_measure=SIMILARITY_MEASURE, threshold=SIMILARITY_THRESHOLD,
+                                     low_freq=LOW_FREQ, high_freq=HIGH_FREQ, filter_order=FILTER_ORDER,
+                                     warmup=int(round(STREAM_WARMUP * sfreq)), r_tolerance=STREAM_R_TOLERANCE)
+        latencies = replay(edf_path, analyzer.push, chunk_size, stop)
+        n_samples = analyzer.n_samples
+        result = summarize(latencies, n_samples, sfreq)
+        name = os.path.basename(edf_path)
+        print(f"记录 {name} ({len(labels)} 通道, {sfreq:g} Hz, 数据块 {chunk_size} 样本)")
+        print(f"  增量: 延迟中位数 {result['median_ms']:.1f} ms, P95 {result['p95_ms']:.1f} ms, "
+              f"最大 {result['max_ms']:.1f} ms; 吞吐量 {result['samples_per_s']:.0f} 样本/秒 "
+              f"({result['realtime_factor']:.1f}x 实时)")
+        if result['p95_ms'] > args.chunk * 1e3:
+            print(f"  错误: P95延迟超过数据块时长 {args.chunk * 1e3:.0f} ms")
+            ok = False
+        first_error, overall_error = entropy_error(edf_path, analyzer, sfreq, chunk_size, stop, args.max_scale)
+        print(f"  与逐窗口重算的多尺度熵的最大偏差: 尺度1 {first_error:.4f}, 所有尺度 {overall_error:.4f}")
+        if first_error > args.max_error:
+            print(f"  错误: 尺度1的偏差超过 {args.max_error}")
+            ok = False
+
+        if not args.no_baseline:
+            baseline = recompute_processor(len(labels), sfreq, window, hop, args.max_scale)
+            base_latencies = replay(edf_path, baseline, chunk_size, stop)
+            base = summarize(base_latencies, n_samples, sfreq)
+            print(f"  从头重算: 延迟中位数 {base['median_ms']:.1f} ms, P95 {base['p95_ms']:.1f} ms, "
+                  f"最大 {base['max_ms']:.1f} ms; 吞吐量 {base['samples_per_s']:.0f} 样本/秒 "
+                  f"({base['realtime_factor']:.1f}x 实时); 增量方式加速 "
+                  f"{base_latencies.sum() / latencies.sum():.1f}x")
+
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+阈值扫描基准
+
+在一组阈值上比较 threshold_sweep (边排序一次、增量加入) 与逐个阈值重建networkx网络并计算
+指标的方式: 报告两者的运行时间，并检查边数、密度、平均强度、连通分量数和最大连通分量在
+每个阈值上是否一致，不一致时以非零状态退出。
+
+相似度矩阵由 adfecgdb 中记录的所有通道计算；--channels 大于记录的通道数时，用随机混合的
+合成通道补足，以测试较大的网络。
+
+用法 (在项目根目录下):
+    python -m benchmarks.threshold_sweep [--points 档数] [--channels 通道数] [--samples 样本数]
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preprocessing.edf_reader import read_edf_data
+from utils.signal_processing import preprocess_signal
+from network_analysis.similarity import compute_similarity_matrix
+from network_analysis.construct_graph import threshold_similarity_matrix
+from network_analysis.network_metrics import extract_network_metrics
+from network_analysis.threshold_sweep import threshold_sweep
+from config import LOW_FREQ, HIGH_FREQ, FILTER_ORDER, SIMILARITY_MEASURE
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RECORD_DIR = os.path.join(REPO_DIR, "adfecgdb")
+
+def load_signals(n_channels, n_samples, seed=0):
+    """读取第一个记录的所有通道，不足 n_channels 时用记录通道的随机混合加噪声补足"""
+    edf_path = sorted(glob.glob(os.path.join(RECORD_DIR, "*.edf")))[0]
+    data, _, sfreq = read_edf_data(edf_path, None, 0, n_samples)
+    signals = preprocess_signal(data, LOW_FREQ, HIGH_FREQ, sfreq, FILTER_ORDER)
+    rng = np.random.default_rng(seed)
+    n_extra = max(0, n_channels - len(signals))
+    mixing = rng.normal(size=(n_extra, len(signals)))
+    extra = mixing @ signals + rng.normal(scale=2.0, size=(n_extra, signals.shape[1]))
+    return np.vstack([signals, extra])[:n_channels]
+
+def rebuild_metrics(similarity, thresholds):
+    """对照: 每个阈值重建networkx网络并计算指标和连通分量"""
+    import networkx as nx
+
+    curves = {name: [] for name in ['n_edges', 'density', 'avg_strength', 'n_components', 'largest_component']}
+    for threshold in thresholds:
+        G = nx.from_numpy_array(threshold_similarity_matrix(similarity, threshold))
+        metrics = extract_network_metrics(G)
+        sizes = [len(c) for c in nx.connected_components(G)]
+        curves['n_edges'].append(G.number_of_edges())
+        curves['density'].append(metrics['density'])
+        curves['avg_strength'].append(metrics['avg_strength'])
+        curves['n_components'].append(len(sizes))
+        curves['largest_component'].append(max(sizes) / G.number_of_nodes())
+    return {name: np.array(values, dtype=np.float64) for name, values in curves.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description="阈值扫描基准")
+    parser.add_argument('--points', type=int, default=200, help="阈值档数")
+    parser.add_argument('--channels', type=int, default=32, help="网络节点数")
+    parser.add_argument('--samples', type=int, default=20000, help="每个通道的样本数")
+    args = parser.parse_args()
+
+    signals = load_signals(args.channels, args.samples)
+    similarity = compute_similarity_matrix(signals, SIMILARITY_MEASURE)
+    thresholds = np.linspace(0.0, 1.0, args.points)
+
+    start = time.perf_counter()
+    sweep = threshold_sweep(similarity, thresholds=thresholds)
+    sweep_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reference = rebuild_metrics(similarity, thresholds)
+    rebuild_time = time.perf_counter() - start
+
+    mismatched = [name for name, values in reference.items()
+                  if not np.allclose(sweep[name], values, rtol=1e-9, atol=1e-12, equal_nan=True)]
+    print(f"{len(signals)} 个节点, {args.points} 个阈值")
+    print(f"  阈值扫描: {sweep_time * 1e3:.2f} ms")
+    print(f"  逐个重建: {rebuild_time * 1e3:.2f} ms (加速 {rebuild_time / sweep_time:.0f}x)")
+    if mismatched:
+        print(f"  错误: 以下指标与逐个重建的结果不一致: {mismatched}")
+        sys.exit(1)
+    print("  各阈值上的指标与逐个重建的结果一致")
+
+if __name__ == "__main__":
+    main()
@@ -5,22 +5,85 @@
 # 数据参数
 DATA_DIR = "data/adfecgdb/"  # 数据目录路径
 OUTPUT_DIR = "output"  # 输出目录路径
+MAX_SAMPLES = None  # 每个通道分析的样本点数上限，None表示使用整段记录
+
+# 缓存参数
+CACHE_ENABLED = True  # 是否启用磁盘结果缓存
+CACHE_DIR = "cache"  # 缓存目录路径
+CACHE_MAX_BYTES = 2 * 1024 ** 3  # 缓存总大小上限(字节)，超出后淘汰最久未使用的缓存
+
+# 结果库参数
+RESULTS_STORE_ENABLED = True  # 是否将每次运行的熵和网络指标追加到列式结果库
+RESULTS_STORE_DIR = "results_store"  # 结果库目录路径，多次运行共用以便跨运行比较
 
 # 熵计算参数
 SAMPEN_M = 2  # 嵌入维度
 SAMPEN_R_RATIO = 0.2  # 容限因子比例
 MSE_MAX_SCALE = 20  # 最大尺度因子
+MSE_FIXED_R = False  # 是否所有尺度共用尺度1的容限 (Costa原始MSE方法)
+EXTRA_ENTROPY = []  # 除样本熵外额外计算的多尺度熵，可选 "permutation", "fuzzy"
+MULTIVARIATE_ENTROPY = False  # 是否计算所选通道的多元多尺度样本熵和所有通道对的多尺度交叉样本熵
+PE_ORDER = 3  # 排列熵的阶数
+PE_DELAY = 1  # 排列熵的时间延迟
+FUZZY_N = 2  # 模糊熵隶属度函数的指数
+FUZZY_MAX_SAMPLES = 20000  # 模糊熵使用的样本点数上限 (计算量与长度的平方成正比，整段记录时需要数小时)，None表示不限制
+ENTROPY_MEMORY_BUDGET = 256 * 1024 ** 2  # 熵计算中模板比较分块的内存上限(字节)
+ENTROPY_TILE_BYTES = 0  # 模板比较分块的大小(字节)，0表示按CPU二级缓存大小自动选择
+COMPUTE_DTYPE = "float64"  # 计算精度，可选 "float32" (信号数组的内存占用和内存带宽减半)
+
+# 并行计算参数
+N_WORKERS = 0  # 熵计算使用的进程数，0表示使用全部CPU核心，1表示串行
+BATCH_WORKERS = 0  # 批处理时同时处理的记录数，0表示使用全部CPU核心
+RECORD_TIMEOUT = 1800  # 单个记录的超时时间(秒)，None表示不限制
+PREFETCH_RECORDS = 2  # 后台线程提前加载的记录数 (加载与计算重叠)，0表示在各记录的子进程中加载
 
 # 网络分析参数
 SIMILARITY_THRESHOLD = 0.5  # 相似度阈值，低于此值的边将被过滤
-SIMILARITY_MEASURE = "correlation"  # 相似度计算方法
+SIMILARITY_MEASURE = "correlation"  # 相似度计算方法，可选 "correlation", "phase_sync", "mutual_info", "cross_sampen"
+THRESHOLD_SWEEP = None  # 阈值扫描: None 不扫描, "threshold" 在相似度阈值上扫描, "density" 在比例密度上扫描
+THRESHOLD_SWEEP_POINTS = 200  # 阈值扫描的档数，阈值或比例密度在0到1之间均匀分布
+DYNAMIC_NETWORK = False  # 是否在整段记录上计算滑动窗口动态网络
+DYNAMIC_WINDOW = 5000  # 动态网络窗口长度(样本点)
+DYNAMIC_STRIDE = 500  # 动态网络窗口步长(样本点)
+
+# 替代数据显著性检验参数
+SURROGATE_COUNT = 0  # 每个通道的替代数据个数，0表示不做显著性检验 (最小p值为 1/(个数+1))
+SURROGATE_METHOD = "phase"  # 替代数据生成方法，可选 "phase" (相位随机化), "iaaft" (同时保留取值分布)
+SURROGATE_TARGETS = ["mse", "edges"]  # 检验对象: "mse" 多尺度熵的各尺度, "edges" 网络的各条边
+SURROGATE_ALPHA = 0.05  # 显著性水平，p值不小于此值的边从网络中删除；None表示只保存p值而不删除边
+SURROGATE_SEED = 0  # 替代数据的随机数种子 (结果可复现)
+SURROGATE_STOP_AFTER = 10  # 序贯检验: 某个 (通道, 尺度) 两侧都已有此数量的替代数据不弱于观测值时停止计算该位置，None表示全部计算
+SURROGATE_MEMORY_BUDGET = 256 * 1024 ** 2  # 每块替代数据的内存上限(字节)
+
+# 心率变异性 (HRV) 分析参数
+HRV_ANALYSIS = False  # 是否读取 .edf.qrs 注释，在整段记录上计算RR间期和逐搏特征序列的多尺度熵和网络
+HRV_MAX_SCALE = 10  # 心搏序列的最大尺度因子 (心搏序列远短于原始信号)
+HRV_RR_RANGE = (0.25, 2.0)  # 有效RR间期的范围(秒)，超出范围的心搏 (误检或漏检) 被排除
+HRV_BEAT_WINDOW = (0.05, 0.05)  # 心搏窗口在R峰之前和之后的时长(秒)
+HRV_BEAT_FEATURE = "amplitude"  # 逐搏特征，可选 "amplitude" (峰峰值), "rms" (均方根)
+
+# 流式分析参数 (python main.py --stream 文件.edf)
+STREAM_WINDOW = 10.0  # 流式分析的窗口长度(秒)
+STREAM_HOP = 1.0  # 流式分析的输出间隔(秒)
+STREAM_CHUNK = 0.25  # 回放EDF文件时每个数据块的长度(秒)
+STREAM_MAX_SCALE = 10  # 流式多尺度熵的最大尺度因子
+STREAM_WARMUP = 3.0  # 流式滤波器的预热时长(秒)，这段样本只用于滤波器收敛，不进入分析窗口
+STREAM_R_TOLERANCE = 0.02  # 样本熵容限与按当前窗口标准差应有的容限的最大相对偏离，超过时重新统计匹配对数
 
 # 信号预处理参数
-LOW_FREQ = 0.5  # 低通滤波截止频率
-HIGH_FREQ = 45.0  # 高通滤波截止频率
-SAMPLING_RATE = 256  # 采样率
+LOW_FREQ = 0.5  # 带通滤波下限频率(Hz)
+HIGH_FREQ = 45.0  # 带通滤波上限频率(Hz)
+FILTER_ORDER = 4  # 巴特沃斯带通滤波器阶数
+SAMPLING_RATE = 256  # 默认采样率，仅在文件中没有采样率信息时使用 (通常使用EDF文件头中的采样率)
+
+# 性能记录参数
+PROFILE_ENABLED = False  # 是否记录各阶段运行时间与内存并导出trace.json (也可使用 --profile)
+PROFILE_MEMORY = True  # 性能记录时是否用tracemalloc记录峰值内存
 
 # 可视化参数
+HEADLESS = False  # 仅计算模式：不导入matplotlib和可视化模块，不生成图表 (也可使用 --headless)
 SAVE_FIGURES = True  # 是否保存图表
 SHOW_FIGURES = False  # 是否显示图表
 DPI = 300  # 图表DPI
+RENDER_WORKERS = 1  # 后台绘图进程数，绘图与下一个记录的计算并行；0表示在主进程中同步绘图
+RENDER_MAX_PENDING = 32  # 等待绘制的图表数上限，超过时提交方等待最早的任务完成 (限制内存)
@@ -1,4 +1,14 @@
-from .mse import compute_mse
-from .base_entropy import calculate_sample_entropy
+from .mse import compute_mse, compute_mse_batch, compute_mpe, compute_mfe, compute_multiscale_entropy, ENTROPY_FAMILIES
+from .base_entropy import (calculate_sample_entropy, calculate_permutation_entropy, calculate_fuzzy_entropy,
+                           permutation_entropy_batch, sample_entropy_from_counts)
+from .streaming import SlidingMultiscaleEntropy
+from .parallel import compute_mse_parallel
+from .multivariate import (cross_match_counts, cross_sample_entropy_matrix, cross_sampen_similarity,
+                           multiscale_cross_entropy, multivariate_sample_entropy, multivariate_multiscale_entropy)
 
-__all__ = ['compute_mse', 'calculate_sample_entropy']
+__all__ = ['compute_mse', 'compute_mse_batch', 'compute_mpe', 'compute_mfe', 'compute_multiscale_entropy',
+           'ENTROPY_FAMILIES', 'compute_mse_parallel', 'calculate_sample_entropy',
+           'calculate_permutation_entropy', 'calculate_fuzzy_entropy', 'permutation_entropy_batch',
+           'sample_entropy_from_counts', 'SlidingMultiscaleEntropy', 'cross_match_counts',
+           'cross_sample_entropy_matrix', 'cross_sampen_similarity', 'multiscale_cross_entropy',
+           'multivariate_sample_entropy', 'multivariate_multiscale_entropy']
@@ -1,14 +1,80 @@
+import math
 import numpy as np
+from .tiling import tile_elements
+from utils.dtypes import as_float_array
 
-# 尝试导入熵计算所需的库
-try:
-    import nolds
-    HAS_NOLDS = True
-except ImportError:
-    HAS_NOLDS = False
-    print("警告: nolds库未安装，样本熵计算将不可用。请使用pip安装: pip install nolds")
+def count_template_matches(time_series, m, r):
+    """
+    统计长度为m和m+1的模板向量中相似模板对的数量 (切比雪夫距离 < r)。
+    
+    与nolds.sampen保持一致: 只使用前 N-m 个模板, 每个无序模板对只计数一次,
+    不包含自匹配。模板按第一个分量排序后, 每个模板只可能与排序后紧随其后、
+    第一个分量相差小于r的模板匹配; 这些候选对按行分块 (见 entropy.tiling), 单行的候选列
+    超过块大小时列也分块; 每块的距离矩阵大小受缓存和内存预算限制, 计数在块之间累加,
+    因此百万级样本的序列也只占用有限内存。
+    
+    参数:
+    time_series (np.array): 一维时间序列
+    m (int): 嵌入维度
+    r (float): 容限
+    
+    返回:
+    tuple: (长度为m的匹配对数, 长度为m+1的匹配对数)
+    """
+    x = as_float_array(time_series)
+    n_templates = len(x) - m
+    if n_templates < 2:
+        return 0, 0
+    # 容限转换为序列的精度，避免float32距离在比较时被提升为float64
+    r = x.dtype.type(r)
+    
+    # 按第一个分量排序的模板, 每个分量单独连续存放
+    windows = np.lib.stride_tricks.sliding_window_view(x, m + 1)[:n_templates]
+    order = np.argsort(windows[:, 0], kind='stable')
+    columns = [windows[order, k] for k in range(m + 1)]
+    first = columns[0]
+    # 每个模板的候选列上界 (留出浮点舍入余量, 精确判断在块内进行)
+    upper_bound = np.searchsorted(first, first + r + 4 * np.spacing(np.abs(first) + r), side='right')
+    
+    # 每个元素的工作集: 距离和临时数组以及若干布尔掩码；所有块共用同一组缓冲区
+    max_elements = tile_elements(bytes_per_element=2 * x.itemsize + 8)
+    distance_buffer = np.empty(max_elements, dtype=x.dtype)
+    diff_buffer = np.empty(max_elements, dtype=x.dtype)
+    count_m = count_m1 = 0
+    start = 0
+    while start < n_templates - 1:
+        # 行数按块内实际列宽收缩, 保证块大小不超过上限
+        n_rows = max(1, min(max_elements // max(1, upper_bound[start] - start - 1), n_templates - 1 - start))
+        while n_rows > 1 and n_rows * (upper_bound[start + n_rows - 1] - start - 1) > max_elements:
+            n_rows //= 2
+        stop = start + n_rows
+        # 单行的候选列数仍可能超过上限 (长序列、r较大时)，此时列也分块
+        col_width = max(1, max_elements // n_rows)
+        for col_start in range(start + 1, upper_bound[stop - 1], col_width):
+            col_stop = min(col_start + col_width, upper_bound[stop - 1])
+            shape = (stop - start, col_stop - col_start)
+            distance = distance_buffer[:shape[0] * shape[1]].reshape(shape)
+            diff = diff_buffer[:shape[0] * shape[1]].reshape(shape)
+            np.subtract(first[start:stop, np.newaxis], first[np.newaxis, col_start:col_stop], out=distance)
+            np.abs(distance, out=distance)
+            for k in range(1, m + 1):
+                np.subtract(columns[k][start:stop, np.newaxis], columns[k][np.newaxis, col_start:col_stop], out=diff)
+                np.abs(diff, out=diff)
+                if k == m:
+                    break
+                np.maximum(distance, diff, out=distance)
+            # 只计数排序后列序号大于行序号的模板对
+            match = distance < r
+            match &= np.arange(col_start, col_stop)[np.newaxis, :] > np.arange(start, stop)[:, np.newaxis]
+            count_m += int(np.count_nonzero(match))
+            # 长度为m+1的模板在长度m匹配的基础上再比较最后一个分量
+            match &= diff < r
+            count_m1 += int(np.count_nonzero(match))
+        start = stop
+    
+    return count_m, count_m1
 
-def calculate_sample_entropy(time_series, m=2, r_ratio=0.2):
+def calculate_sample_entropy(time_series, m=2, r_ratio=0.2, r=None):
     """
     计算时间序列的样本熵 (Sample Entropy)。
     
@@ -16,24 +82,74 @@ def calculate_sample_entropy(time_series, m=2, r_ratio=0.2):
     time_series (np.array): 一维时间序列
     m (int): 嵌入维度
     r_ratio (float): 容限因子比例
+    r (float): 可选，绝对容限；为None时使用 r_ratio * std(time_series)
     
     返回:
     float: 样本熵值
     """
     if len(time_series) == 0:
         return np.nan
-    r = r_ratio * np.std(time_series)
+    if r is None:
+        r = r_ratio * np.std(time_series)
     if r == 0:
         return np.nan
-        
-    try:
-        if HAS_NOLDS:
-            return nolds.sampen(time_series, emb_dim=m, tolerance=r)
-        else:
-            print("无法计算样本熵: 请安装nolds库")
-            return np.nan
-    except Exception as e:
-        return np.nan
+    
+    count_m, count_m1 = count_template_matches(time_series, m, r)
+    return float(sample_entropy_from_counts(count_m, count_m1))
+
+def sample_entropy_from_counts(count_m, count_m1):
+    """
+    由模板匹配对数计算样本熵
+    
+    与nolds相同的边界约定: 两者均为0时为NaN, 只有m+1为0时为inf, 只有m为0时为-inf。
+    
+    参数:
+    count_m (int | np.array): 长度为m的匹配对数
+    count_m1 (int | np.array): 长度为m+1的匹配对数
+    
+    返回:
+    float | np.array: 样本熵
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return -np.log(np.asarray(count_m1, dtype=np.float64) / np.asarray(count_m, dtype=np.float64))
+
+def permutation_entropy_batch(signals, m=3, delay=1, normalize=True):
+    """
+    批量计算多通道的排列熵 (Permutation Entropy)
+    
+    所有通道的嵌入向量通过跨步视图得到 (不复制数据)，一次 argsort 得到每个向量的
+    序数模式，再把排列编码为整数 (排序下标与 m 的幂次的点积) 统计各模式的频率。
+    与antropy.perm_entropy的定义一致: 以2为底，归一化时除以 log2(m!)。
+    
+    参数:
+    signals (np.array): 形状为 [n_channels, n_timepoints] 的信号
+    m (int): 嵌入维度/阶数
+    delay (int): 时间延迟
+    normalize (bool): 是否归一化到 [0, 1]
+    
+    返回:
+    np.array: 形状为 [n_channels] 的排列熵值，序列过短时为NaN
+    """
+    x = np.atleast_2d(as_float_array(signals))
+    n_channels = x.shape[0]
+    span = (m - 1) * delay + 1
+    n_vectors = x.shape[1] - span + 1
+    if n_vectors < 1:
+        return np.full(n_channels, np.nan)
+    
+    # [n_channels, n_vectors, m] 的嵌入视图
+    embedded = np.lib.stride_tricks.sliding_window_view(x, span, axis=1)[:, :, ::delay]
+    patterns = np.argsort(embedded, axis=2, kind='stable')
+    codes = patterns @ (m ** np.arange(m))
+    
+    values = np.empty(n_channels)
+    for ch in range(n_channels):
+        _, counts = np.unique(codes[ch], return_counts=True)
+        p = counts / n_vectors
+        values[ch] = np.sum(p * np.log2(n_vectors / counts))
+    if normalize:
+        values /= np.log2(math.factorial(m))
+    return values
 
 def calculate_permutation_entropy(time_series, m=3, delay=1):
     """
@@ -45,21 +161,67 @@ def calculate_permutation_entropy(time_series, m=3, delay=1):
     delay (int): 时间延迟
     
     返回:
-    float: 排列熵值
+    float: 归一化的排列熵值
     """
     if len(time_series) < m * delay:
         return np.nan
-        
-    try:
-        if HAS_ANTROPY:
-            return antropy.perm_entropy(time_series, order=m, delay=delay, normalize=True)
-        else:
-            print("无法计算排列熵: 请安装antropy库")
-            return np.nan
-    except Exception as e:
-        return np.nan
+    return float(permutation_entropy_batch(time_series, m=m, delay=delay)[0])
 
-def calculate_fuzzy_entropy(time_series, m=2, r_ratio=0.2, n_fuzzy=2):
+def fuzzy_similarity_sums(time_series, m, r, n_fuzzy=2):
+    """
+    计算长度为m和m+1的模板向量两两之间的模糊隶属度平均值
+    
+    每个模板先减去自身均值 (去基线)，模板对的距离为切比雪夫距离 d，隶属度为
+    exp(-d^n / r)。与样本熵一致只使用前 N-m 个模板，不包含自匹配。隶属度处处非零，
+    无法像样本熵那样跳过远处的模板对，计算量为 O(N^2)；模板按行分块 (见 entropy.tiling)，
+    每块与全部模板的距离在预先分配的缓冲区中原地计算，内存只取决于块大小。
+    
+    参数:
+    time_series (np.array): 一维时间序列
+    m (int): 嵌入维度
+    r (float): 容限
+    n_fuzzy (int): 模糊函数的指数
+    
+    返回:
+    tuple: (长度为m的平均隶属度, 长度为m+1的平均隶属度)
+    """
+    x = as_float_array(time_series)
+    n_templates = len(x) - m
+    if n_templates < 2:
+        return 0.0, 0.0
+    
+    windows = np.lib.stride_tricks.sliding_window_view(x, m + 1)[:n_templates]
+    # 每个元素的工作集: 距离和临时数组
+    block = max(1, min(tile_elements(bytes_per_element=2 * x.itemsize) // n_templates, n_templates))
+    distance_buffer = np.empty((block, n_templates), dtype=x.dtype)
+    diff_buffer = np.empty((block, n_templates), dtype=x.dtype)
+    
+    phis = []
+    for dim in (m, m + 1):
+        templates = windows[:, :dim] - windows[:, :dim].mean(axis=1, keepdims=True)
+        columns = [np.ascontiguousarray(templates[:, k]) for k in range(dim)]
+        total = 0.0
+        for start in range(0, n_templates, block):
+            stop = min(start + block, n_templates)
+            distance = distance_buffer[:stop - start]
+            diff = diff_buffer[:stop - start]
+            np.subtract(columns[0][start:stop, np.newaxis], columns[0][np.newaxis, :], out=distance)
+            np.abs(distance, out=distance)
+            for k in range(1, dim):
+                np.subtract(columns[k][start:stop, np.newaxis], columns[k][np.newaxis, :], out=diff)
+                np.abs(diff, out=diff)
+                np.maximum(distance, diff, out=distance)
+            # 隶属度 exp(-d^n / r)
+            np.power(distance, n_fuzzy, out=distance)
+            distance *= x.dtype.type(-1.0 / r)
+            np.exp(distance, out=distance)
+            # 去掉自匹配 (距离为0，隶属度为1)；求和在float64中累加
+            total += distance.sum(dtype=np.float64) - (stop - start)
+        phis.append(total / (n_templates * (n_templates - 1)))
+    
+    return phis[0], phis[1]
+
+def calculate_fuzzy_entropy(time_series, m=2, r_ratio=0.2, n_fuzzy=2, r=None):
     """
     计算时间序列的模糊熵 (Fuzzy Entropy)。
     
@@ -68,22 +230,19 @@ def calculate_fuzzy_entropy(time_series, m=2, r_ratio=0.2, n_fuzzy=2):
     m (int): 嵌入维度
     r_ratio (float): 容限因子比例
     n_fuzzy (int): 模糊函数的指数
+    r (float): 可选，绝对容限；为None时使用 r_ratio * std(time_series)
     
     返回:
     float: 模糊熵值
     """
     if len(time_series) < 2 * m:
         return np.nan
-        
-    r = r_ratio * np.std(time_series)
+    if r is None:
+        r = r_ratio * np.std(time_series)
     if r == 0:
         return np.nan
-        
-    try:
-        if HAS_ANTROPY:
-            return antropy.fuzzy_entropy(time_series, order=m, r=r, n=n_fuzzy)
-        else:
-            print("无法计算模糊熵: 请安装antropy库")
-            return np.nan
-    except Exception as e:
+    
+    phi_m, phi_m1 = fuzzy_similarity_sums(time_series, m, r, n_fuzzy)
+    if phi_m <= 0 or phi_m1 <= 0:
         return np.nan
+    return np.log(phi_m) - np.log(phi_m1)
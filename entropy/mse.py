@@ -1,8 +1,94 @@
 import numpy as np
-from .base_entropy import calculate_sample_entropy
-from utils.signal_processing import coarse_grain_time_series
+from .base_entropy import calculate_sample_entropy, calculate_fuzzy_entropy, permutation_entropy_batch
+from utils.signal_processing import iter_coarse_grained
+from utils.dtypes import as_float_array
+from utils.profiling import profile_stage
 
-def compute_mse(signal, max_scale=20, m=2, r_ratio=0.2):
+ENTROPY_FAMILIES = ['sampen', 'permutation', 'fuzzy']
+
+def compute_multiscale_entropy(signals, max_scale=20, families=('sampen',), m=2, r_ratio=0.2,
+                               fixed_r=False, pe_order=3, pe_delay=1, n_fuzzy=2, cells=None, fuzzy_max_samples=None):
+    """
+    批量计算多通道、多种熵的多尺度曲线
+    
+    所有尺度的粗粒化序列由一次累积和得到，并写入同一个预先分配的缓冲区，
+    各种熵在同一次遍历粗粒化序列时计算。排列熵对每个尺度的全部通道一次计算，
+    样本熵和模糊熵逐通道计算。计算精度与输入信号相同 (float32或float64)。
+    
+    参数:
+    signals (np.array): 一维信号或形状为 [n_channels, n_timepoints] 的信号
+    max_scale (int): 最大尺度因子
+    families (list): 要计算的熵，可选 'sampen', 'permutation', 'fuzzy'
+    m (int): 样本熵和模糊熵的嵌入维度
+    r_ratio (float): 样本熵和模糊熵的容限因子比例
+    fixed_r (bool): 为True时所有尺度使用尺度1的容限 r_ratio * std(原始信号)
+                    (Costa原始MSE方法)；为False时每个尺度按粗粒化序列重新计算容限
+    pe_order (int): 排列熵的阶数
+    pe_delay (int): 排列熵的时间延迟
+    n_fuzzy (int): 模糊熵隶属度函数的指数
+    cells (np.array): 可选，形状为 [n_channels, max_scale] 的布尔数组，样本熵和模糊熵只计算为True的
+                      (通道, 尺度)，其余为NaN；排列熵对整个尺度批量计算，不受影响
+    fuzzy_max_samples (int): 模糊熵 (计算量与序列长度的平方成正比) 只使用原始信号的前这么多个样本点，
+                             即尺度 s 上只使用前 fuzzy_max_samples // s 个粗粒化点；None表示不限制
+    
+    返回:
+    dict: 熵名称到形状为 [n_channels, max_scale] 的熵值数组的字典
+    """
+    unknown = set(families) - set(ENTROPY_FAMILIES)
+    if unknown:
+        raise ValueError(f"不支持的熵: {sorted(unknown)}，可选: {ENTROPY_FAMILIES}")
+    
+    signals = np.atleast_2d(as_float_array(signals))
+    n_channels = signals.shape[0]
+    values = {family: np.full((n_channels, max_scale), np.nan) for family in families}
+    
+    with profile_stage('coarse_grain', max_scale=max_scale):
+        coarse_series = iter_coarse_grained(signals, max_scale)
+    # 尺度1的容限，仅在fixed_r时复用
+    base_r = r_ratio * np.std(signals, axis=1)
+    
+    for scale_idx, coarse in enumerate(coarse_series):
+        scale = scale_idx + 1
+        if 'permutation' in values and coarse.shape[1] >= pe_order * pe_delay:
+            with profile_stage('permutation', scale=scale):
+                values['permutation'][:, scale_idx] = permutation_entropy_batch(coarse, pe_order, pe_delay)
+        if coarse.shape[1] < 2 * m:
+            continue
+        for ch in range(n_channels):
+            if cells is not None and not cells[ch, scale_idx]:
+                continue
+            r = base_r[ch] if fixed_r else None
+            if 'sampen' in values:
+                with profile_stage('sampen', channel=ch, scale=scale):
+                    values['sampen'][ch, scale_idx] = calculate_sample_entropy(coarse[ch], m=m,
+                                                                               r_ratio=r_ratio, r=r)
+            if 'fuzzy' in values:
+                fuzzy_series = coarse[ch] if fuzzy_max_samples is None else coarse[ch, :fuzzy_max_samples // scale]
+                if len(fuzzy_series) < 2 * m:
+                    continue
+                with profile_stage('fuzzy', channel=ch, scale=scale):
+                    values['fuzzy'][ch, scale_idx] = calculate_fuzzy_entropy(fuzzy_series, m=m, r_ratio=r_ratio,
+                                                                             n_fuzzy=n_fuzzy, r=r)
+    return values
+
+def compute_mse_batch(signals, max_scale=20, m=2, r_ratio=0.2, fixed_r=False, cells=None):
+    """
+    批量计算多通道的多尺度样本熵 (Multiscale Sample Entropy)
+    
+    参数:
+    signals (np.array): 一维信号或形状为 [n_channels, n_timepoints] 的信号
+    max_scale (int): 最大尺度因子
+    m (int): 嵌入维度
+    r_ratio (float): 容限因子比例
+    fixed_r (bool): 是否在所有尺度上使用尺度1的容限 (见 compute_multiscale_entropy)
+    cells (np.array): 可选，只计算为True的 (通道, 尺度)，其余为NaN
+    
+    返回:
+    np.array: 形状为 [n_channels, max_scale] 的样本熵值
+    """
+    return compute_multiscale_entropy(signals, max_scale, ('sampen',), m, r_ratio, fixed_r, cells=cells)['sampen']
+
+def compute_mse(signal, max_scale=20, m=2, r_ratio=0.2, fixed_r=False):
     """
     计算多尺度样本熵 (Multiscale Sample Entropy)
     
@@ -11,16 +97,44 @@ def compute_mse(signal, max_scale=20, m=2, r_ratio=0.2):
     max_scale (int): 最大尺度因子
     m (int): 嵌入维度
     r_ratio (float): 容限因子比例
+    fixed_r (bool): 是否在所有尺度上使用尺度1的容限
     
     返回:
     list: 不同尺度下的样本熵值
     """
-    mse_values = []
-    for scale in range(1, max_scale + 1):
-        coarse_ts = coarse_grain_time_series(signal, scale)
-        if len(coarse_ts) < 2 * m:
-            mse_values.append(np.nan)
-            continue
-        sampen = calculate_sample_entropy(coarse_ts, m=m, r_ratio=r_ratio)
-        mse_values.append(sampen)
-    return mse_values
+    return compute_mse_batch(signal, max_scale, m, r_ratio, fixed_r)[0].tolist()
+
+def compute_mpe(signal, max_scale=20, order=3, delay=1):
+    """
+    计算多尺度排列熵 (Multiscale Permutation Entropy)
+    
+    参数:
+    signal (np.array): 输入信号
+    max_scale (int): 最大尺度因子
+    order (int): 排列熵的阶数
+    delay (int): 时间延迟
+    
+    返回:
+    list: 不同尺度下的归一化排列熵值
+    """
+    return compute_multiscale_entropy(signal, max_scale, ('permutation',), pe_order=order,
+                                      pe_delay=delay)['permutation'][0].tolist()
+
+def compute_mfe(signal, max_scale=20, m=2, r_ratio=0.2, n_fuzzy=2, fixed_r=False, max_samples=None):
+    """
+    计算多尺度模糊熵 (Multiscale Fuzzy Entropy)
+    
+    参数:
+    signal (np.array): 输入信号
+    max_scale (int): 最大尺度因子
+    m (int): 嵌入维度
+    r_ratio (float): 容限因子比例
+    n_fuzzy (int): 隶属度函数的指数
+    fixed_r (bool): 是否在所有尺度上使用尺度1的容限
+    max_samples (int): 只使用信号的前这么多个样本点 (见 compute_multiscale_entropy)，None表示不限制
+    
+    返回:
+    list: 不同尺度下的模糊熵值
+    """
+    return compute_multiscale_entropy(signal, max_scale, ('fuzzy',), m, r_ratio, fixed_r, n_fuzzy=n_fuzzy,
+                                      fuzzy_max_samples=max_samples)['fuzzy'][0].tolist()
@@ -0,0 +1,381 @@
+"""
+交叉样本熵与多元多尺度样本熵
+
+两者都在每个尺度上建立一个共享的模板索引，而不是对每个通道对单独统计:
+    交叉样本熵: 所有通道 (各自标准化) 的模板合并为一个按第一个分量排序的索引，模板带有通道标签。
+               一次分块扫描统计所有候选模板对，匹配对按两端的通道标签累加到 C×C 的计数矩阵，
+               对角线为各通道自身的样本熵计数，非对角线为交叉样本熵 (Richman & Moorman) 的计数。
+    多元样本熵: Ahmed & Mandic (2011) 的定义。同一时刻所有通道长度为m的子序列拼接为一个复合模板，
+               m+1维时依次把每个通道延长一个样本，得到 通道数 × 模板数 个m+1维复合模板，不论延长的是
+               哪个通道，所有m+1维模板合并为一个池两两比较 (逐位置比较，不同延长方式的模板在延长通道
+               之后的位置错开一位)。所有复合模板的第一个分量都是第一个通道的第一个样本，因此模板池
+               按该分量排序后同样可以只比较候选模板对。容限按 Ahmed & Mandic 取 r_ratio * tr(S)，
+               标准化后即 r_ratio * 通道数。
+
+计数与 count_template_matches 约定相同: 只使用前 N-m 个模板，每个无序模板对只计数一次，
+不包含自匹配；所有通道先标准化，交叉样本熵的容限为 r_ratio。
+"""
+import numpy as np
+from .tiling import tile_elements
+from .base_entropy import sample_entropy_from_counts
+from utils.signal_processing import iter_coarse_grained
+from utils.dtypes import as_float_array
+
+# 复合模板在整个分块上计算距离的分量数，其余分量只在通过筛选的候选对上比较
+FULL_TILE_COMPONENTS = 2
+
+def _standardize(signals):
+    """每个通道减去均值并除以标准差，常数通道为NaN"""
+    centered = signals - signals.mean(axis=1, keepdims=True)
+    std = centered.std(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return centered / np.where(std > 0, std, np.nan)
+
+def _iter_tiles(first, r, max_elements):
+    """
+    按第一个分量排序的模板索引上的分块 (与 count_template_matches 相同)
+
+    每个模板只与排序后位于其后、第一个分量相差小于r的候选模板比较；行数按块内实际列宽收缩，
+    单行的候选列超过 max_elements 时列也分块，保证每块的距离数组不超过 max_elements 个元素。
+
+    返回:
+    generator: 依次产生 (行起点, 行终点, 候选列起点, 候选列终点)，只包含非空的块
+    """
+    n_templates = len(first)
+    upper_bound = np.searchsorted(first, first + r + 4 * np.spacing(np.abs(first) + r), side='right')
+    start = 0
+    while start < n_templates - 1:
+        n_rows = max(1, min(max_elements // max(1, upper_bound[start] - start - 1), n_templates - 1 - start))
+        while n_rows > 1 and n_rows * (upper_bound[start + n_rows - 1] - start - 1) > max_elements:
+            n_rows //= 2
+        stop = start + n_rows
+        col_width = max(1, max_elements // n_rows)
+        for col_start in range(start + 1, upper_bound[stop - 1], col_width):
+            yield start, stop, col_start, min(col_start + col_width, upper_bound[stop - 1])
+        start = stop
+
+def _labelled_pair_counts(columns, m, r, labels, n_labels):
+    """
+    在带标签的共享模板索引上按标签对统计匹配对数
+
+    每块的候选列按标签分组排列，距离在整个块上计算后，每组候选列的匹配数用一次 reduceat 求和，
+    再按行标签累加，不需要取出每个匹配对的位置。
+
+    参数:
+    columns (list): 按第一个分量排序的 m+1 个模板分量
+    m (int): 嵌入维度
+    r: 容限 (与模板精度相同)
+    labels (np.array): 每个模板的标签 (通道序号)，int16 (每块的候选列按标签稳定排序时使用基数排序)
+    n_labels (int): 标签数
+
+    返回:
+    np.array: 形状为 [2, n_labels, n_labels] 的长度m和m+1的匹配对数；(a, b) 位置为排序在前的
+              模板标签为a、排序在后的模板标签为b的模板对数
+    """
+    counts = np.zeros((2, n_labels * n_labels), dtype=np.int64)
+    first = columns[0]
+    max_elements = tile_elements(bytes_per_element=2 * first.itemsize + 8)
+    distance_buffer = np.empty(max_elements, dtype=first.dtype)
+    diff_buffer = np.empty(max_elements, dtype=first.dtype)
+    for start, stop, col_start, col_stop in _iter_tiles(first, r, max_elements):
+        col_order = col_start + np.argsort(labels[col_start:col_stop], kind='stable')
+        col_labels = labels[col_order]
+        groups = np.flatnonzero(np.r_[True, col_labels[1:] != col_labels[:-1]])
+        codes = (labels[start:stop, np.newaxis].astype(np.intp) * n_labels + col_labels[groups][np.newaxis, :]).ravel()
+
+        shape = (stop - start, col_stop - col_start)
+        distance = distance_buffer[:shape[0] * shape[1]].reshape(shape)
+        diff = diff_buffer[:shape[0] * shape[1]].reshape(shape)
+        np.subtract(first[start:stop, np.newaxis], first[col_order][np.newaxis, :], out=distance)
+        np.abs(distance, out=distance)
+        for k in range(1, m + 1):
+            np.subtract(columns[k][start:stop, np.newaxis], columns[k][col_order][np.newaxis, :], out=diff)
+            np.abs(diff, out=diff)
+            if k == m:
+                break
+            np.maximum(distance, diff, out=distance)
+        match = distance < r
+        # 只有序号落在本块行范围内的候选列需要排除排序在前的模板对
+        inside = np.flatnonzero(col_order < stop)
+        match[:, inside] &= col_order[inside][np.newaxis, :] > np.arange(start, stop)[:, np.newaxis]
+        for row in range(2):
+            if row == 1:
+                match &= diff < r
+            group_counts = np.add.reduceat(match, groups, axis=1, dtype=np.int64)
+            counts[row] += np.bincount(codes, weights=group_counts.ravel(),
+                                       minlength=n_labels * n_labels).astype(np.int64)
+    return counts.reshape(2, n_labels, n_labels)
+
+def _composite_layout(n_channels, m, extended=None):
+    """
+    复合模板各分量的来源
+
+    参数:
+    n_channels (int): 通道数
+    m (int): 每个通道的嵌入维度
+    extended (int): 延长一个样本的通道，None表示不延长
+
+    返回:
+    tuple: (通道序号数组, 相对时刻数组)，第q个分量为 x[通道[q]](i + 相对时刻[q])；
+           分量按通道依次排列，每个通道内按时刻排列
+    """
+    channels, lags = [], []
+    for c in range(n_channels):
+        length = m + 1 if c == extended else m
+        channels.extend([c] * length)
+        lags.extend(range(length))
+    return np.array(channels), np.array(lags)
+
+def _pooled_pair_counts(signals, n_templates, channels, lags, r):
+    """
+    统计复合模板池中的匹配对数
+
+    池中有 类数 × n_templates 个复合模板: 第t类中时刻i的模板的第q个分量为
+    signals[channels[t, q], i + lags[t, q]]，不同类的模板之间也逐位置比较。所有类的第0个分量
+    都是第一个通道在时刻i的样本，整个池按该分量排序后在共享索引上分块；前 FULL_TILE_COMPONENTS 个
+    分量在整个块上计算距离，筛选后候选对已很稀疏，其余分量只在候选对上取出比较。
+
+    参数:
+    signals (np.array): 形状为 [n_channels, n_timepoints] 的C连续信号
+    n_templates (int): 每类的模板数 (时刻 0 .. n_templates-1)
+    channels (np.array): 形状为 [类数, 分量数] 的各分量的通道序号，第0列须全为0
+    lags (np.array): 形状为 [类数, 分量数] 的各分量的相对时刻，第0列须全为0
+    r: 容限 (与信号精度相同)
+
+    返回:
+    int: 匹配对数 (每个无序模板对只计数一次，不包含自匹配)
+    """
+    n_types, n_components = channels.shape
+    flat = signals.ravel()
+    # 每类每个分量相对于模板时刻的展平偏移
+    offsets = channels * signals.shape[1] + lags
+    order = np.argsort(np.tile(signals[0, :n_templates], n_types), kind='stable')
+    types, times = np.divmod(order, n_templates)
+    n_full = min(FULL_TILE_COMPONENTS, n_components)
+    full = [flat[times + offsets[types, q]] for q in range(n_full)]
+
+    first = full[0]
+    max_elements = tile_elements(bytes_per_element=2 * first.itemsize + 8)
+    distance_buffer = np.empty(max_elements, dtype=first.dtype)
+    diff_buffer = np.empty(max_elements, dtype=first.dtype)
+    count = 0
+    for start, stop, col_start, col_stop in _iter_tiles(first, r, max_elements):
+        shape = (stop - start, col_stop - col_start)
+        distance = distance_buffer[:shape[0] * shape[1]].reshape(shape)
+        diff = diff_buffer[:shape[0] * shape[1]].reshape(shape)
+        np.subtract(first[start:stop, np.newaxis], first[np.newaxis, col_start:col_stop], out=distance)
+        np.abs(distance, out=distance)
+        for k in range(1, n_full):
+            np.subtract(full[k][start:stop, np.newaxis], full[k][np.newaxis, col_start:col_stop], out=diff)
+            np.abs(diff, out=diff)
+            np.maximum(distance, diff, out=distance)
+        match = distance < r
+        match &= np.arange(col_start, col_stop)[np.newaxis, :] > np.arange(start, stop)[:, np.newaxis]
+        rows, cols = np.nonzero(match)
+        rows += start
+        cols += col_start
+        row_times, row_types = times[rows], types[rows]
+        col_times, col_types = times[cols], types[cols]
+        for q in range(n_full, n_components):
+            keep = np.abs(flat[row_times + offsets[row_types, q]] - flat[col_times + offsets[col_types, q]]) < r
+            row_times, row_types = row_times[keep], row_types[keep]
+            col_times, col_types = col_times[keep], col_types[keep]
+        count += len(row_times)
+    return count
+
+def _cross_counts(standardized, m, r):
+    """在标准化后的信号上统计所有通道对的匹配对数，见 cross_match_counts"""
+    n_channels, n = standardized.shape
+    n_templates = n - m
+    if n_templates < 1:
+        zeros = np.zeros((n_channels, n_channels), dtype=np.int64)
+        return zeros, zeros.copy()
+
+    # 常数通道 (标准化后为NaN) 不参与匹配
+    valid = ~np.isnan(standardized).any(axis=1)
+    windows = np.lib.stride_tricks.sliding_window_view(standardized[valid], m + 1, axis=1)[:, :n_templates]
+    labels = np.repeat(np.flatnonzero(valid), n_templates).astype(np.int16)
+    templates = windows.reshape(-1, m + 1)
+    order = np.argsort(templates[:, 0], kind='stable')
+    columns = [templates[order, k] for k in range(m + 1)]
+
+    counts = _labelled_pair_counts(columns, m, standardized.dtype.type(r), labels[order], n_channels)
+    # 排序在前后的两种顺序合并；对角线上每个模板对只出现一次
+    symmetric = counts + counts.transpose(0, 2, 1)
+    diag = np.arange(n_channels)
+    symmetric[:, diag, diag] = counts[:, diag, diag]
+    return symmetric[0], symmetric[1]
+
+def cross_match_counts(signals, m=2, r_ratio=0.2):
+    """
+    统计所有通道对之间的模板匹配对数 (共享模板索引)
+
+    参数:
+    signals (np.array): 形状为 [n_channels, n_timepoints] 的信号，每个通道先标准化
+    m (int): 嵌入维度
+    r_ratio (float): 容限 (标准化后的信号上即为 r_ratio * std)
+
+    返回:
+    tuple: (长度为m的匹配对数, 长度为m+1的匹配对数)，均为形状 [n_channels, n_channels] 的对称矩阵；
+           对角线为各通道内部的匹配对数 (与 count_template_matches 相同)，非对角线为两个通道之间
+           的模板对数 (第一个通道的模板 i 与第二个通道的模板 j 的所有组合)
+    """
+    return _cross_counts(_standardize(np.atleast_2d(as_float_array(signals))), m, r_ratio)
+
+def cross_sample_entropy_matrix(signals, m=2, r_ratio=0.2):
+    """
+    计算所有通道对的交叉样本熵 (Cross-SampEn)
+
+    参数:
+    signals (np.array): 形状为 [n_channels, n_timepoints] 的信号
+    m (int): 嵌入维度
+    r_ratio (float): 容限因子比例
+
+    返回:
+    np.array: 形状为 [n_channels, n_channels] 的对称交叉样本熵矩阵，对角线为各通道的样本熵；
+              没有匹配的模板对时为NaN或inf (与 sample_entropy_from_counts 相同)
+    """
+    count_m, count_m1 = cross_match_counts(signals, m, r_ratio)
+    return sample_entropy_from_counts(count_m, count_m1)
+
+def cross_sampen_similarity(signals, m=2, r_ratio=0.2):
+    """
+    基于交叉样本熵的非线性相似度
+
+    相似度为两个通道之间长度m匹配的模板对在长度m+1时仍然匹配的比例，即 exp(-交叉样本熵)，
+    取值范围 [0, 1]，两个通道的动态越同步越接近1。
+
+    参数:
+    signals (np.array): 形状为 [n_channels, n_timepoints] 的信号
+    m (int): 嵌入维度
+    r_ratio (float): 容限因子比例
+
+    返回:
+    np.array: 形状为 [n_channels, n_channels] 的相似度矩阵，没有匹配模板对的通道对为NaN
+    """
+    count_m, count_m1 = cross_match_counts(signals, m, r_ratio)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return count_m1 / count_m.astype(np.float64)
+
+def multiscale_cross_entropy(signals, max_scale=20, m=2, r_ratio=0.2, fixed_r=False):
+    """
+    计算所有通道对的多尺度交叉样本熵
+
+    每个尺度的粗粒化序列建立一个共享模板索引，一次统计所有通道对。
+
+    参数:
+    signals (np.array): 形状为 [n_channels, n_timepoints] 的信号
+    max_scale (int): 最大尺度因子
+    m (int): 嵌入维度
+    r_ratio (float): 容限因子比例
+    fixed_r (bool): 为True时各尺度都使用按原始信号标准差确定的容限；为False时每个尺度的粗粒化序列
+                    重新标准化
+
+    返回:
+    np.array: 形状为 [max_scale, n_channels, n_channels] 的交叉样本熵，序列过短的尺度为NaN
+    """
+    signals = np.atleast_2d(as_float_array(signals))
+    n_channels = signals.shape[0]
+    values = np.full((max_scale, n_channels, n_channels), np.nan)
+    if fixed_r:
+        # 粗粒化 (块平均) 是线性的，按原始信号标准化后再粗粒化即各尺度共用原始信号的容限
+        signals = _standardize(signals)
+    for scale_idx, coarse in enumerate(iter_coarse_grained(signals, max_scale)):
+        if coarse.shape[1] < 2 * m:
+            continue
+        count_m, count_m1 = _cross_counts(coarse if fixed_r else _standardize(coarse), m, r_ratio)
+        values[scale_idx] = sample_entropy_from_counts(count_m, count_m1)
+    return values
+
+def multivariate_match_counts(signals, m=2, r=0.2):
+    """
+    统计多元复合模板的匹配对数 (Ahmed & Mandic)
+
+    时刻i的长度m复合模板由所有通道的 x_c(i), ..., x_c(i+m-1) 拼接而成，复合模板之间的距离为所有分量上的
+    切比雪夫距离。m+1维时第c种延长方式在通道c的子序列末尾加入 x_c(i+m)；所有延长方式的
+    通道数 × 模板数 个m+1维模板合并为一个池，池中任意两个模板 (包括延长方式不同的模板) 都逐位置比较。
+
+    参数:
+    signals (np.array): 形状为 [n_channels, n_timepoints] 的信号 (应已标准化)
+    m (int): 每个通道的嵌入维度
+    r (float): 容限
+
+    返回:
+    tuple: (长度为m的复合模板匹配对数, m+1维模板池的匹配对数)；两者的模板总数分别为 模板数 和
+           通道数 × 模板数，计算多元样本熵时各自除以模板对总数 (见 multivariate_sample_entropy)
+    """
+    signals = np.ascontiguousarray(np.atleast_2d(as_float_array(signals)))
+    n_channels, n = signals.shape
+    n_templates = n - m
+    if n_templates < 2:
+        return 0, 0
+
+    r = signals.dtype.type(r)
+    channels, lags = _composite_layout(n_channels, m)
+    count_m = _pooled_pair_counts(signals, n_templates, channels[np.newaxis], lags[np.newaxis], r)
+    layouts = [_composite_layout(n_channels, m, c) for c in range(n_channels)]
+    count_m1 = _pooled_pair_counts(signals, n_templates, np.array([layout[0] for layout in layouts]),
+                                   np.array([layout[1] for layout in layouts]), r)
+    return count_m, count_m1
+
+def _multivariate_entropy_from_counts(count_m, count_m1, n_templates, n_channels):
+    """由两组模板的匹配对数和模板总数计算多元样本熵 (各自除以模板对总数后取比值)"""
+    pool = n_channels * n_templates
+    pairs_m = n_templates * (n_templates - 1) / 2
+    pairs_m1 = pool * (pool - 1) / 2
+    return float(sample_entropy_from_counts(count_m * pairs_m1 / pairs_m, count_m1))
+
+def multivariate_sample_entropy(signals, m=2, r_ratio=0.2):
+    """
+    计算多元样本熵 (Multivariate Sample Entropy, Ahmed & Mandic 2011)
+
+    所有通道标准化后容限为 r_ratio * 通道数 (协方差矩阵的迹)；多元样本熵为
+    -ln(m+1维模板池中的匹配比例 / 长度m复合模板的匹配比例)，匹配比例为匹配对数除以模板对总数。
+
+    参数:
+    signals (np.array): 形状为 [n_channels, n_timepoints] 的信号
+    m (int): 每个通道的嵌入维度
+    r_ratio (float): 容限因子比例
+
+    返回:
+    float: 多元样本熵，任一通道为常数时为NaN
+    """
+    standardized = _standardize(np.atleast_2d(as_float_array(signals)))
+    if np.isnan(standardized).any():
+        return np.nan
+    n_channels, n = standardized.shape
+    count_m, count_m1 = multivariate_match_counts(standardized, m, r_ratio * n_channels)
+    return _multivariate_entropy_from_counts(count_m, count_m1, n - m, n_channels)
+
+def multivariate_multiscale_entropy(signals, max_scale=20, m=2, r_ratio=0.2, fixed_r=False):
+    """
+    计算多元多尺度样本熵 (Multivariate Multiscale Sample Entropy)
+
+    参数:
+    signals (np.array): 形状为 [n_channels, n_timepoints] 的信号
+    max_scale (int): 最大尺度因子
+    m (int): 每个通道的嵌入维度
+    r_ratio (float): 容限因子比例
+    fixed_r (bool): 为True时各尺度都使用按原始信号标准差确定的容限 (粗粒化序列只按原始信号的
+                    均值和标准差标准化)；为False时每个尺度的粗粒化序列重新标准化
+
+    返回:
+    np.array: 形状为 [max_scale] 的多元样本熵，序列过短的尺度为NaN
+    """
+    signals = np.atleast_2d(as_float_array(signals))
+    values = np.full(max_scale, np.nan)
+    if fixed_r:
+        # 粗粒化 (块平均) 是线性的，按原始信号标准化后再粗粒化即各尺度共用原始信号的容限
+        signals = _standardize(signals)
+        if np.isnan(signals).any():
+            return values
+    for scale_idx, coarse in enumerate(iter_coarse_grained(signals, max_scale)):
+        if coarse.shape[1] < 2 * m:
+            continue
+        if fixed_r:
+            count_m, count_m1 = multivariate_match_counts(coarse, m, r_ratio * len(coarse))
+            values[scale_idx] = _multivariate_entropy_from_counts(count_m, count_m1, coarse.shape[1] - m,
+                                                                  len(coarse))
+        else:
+            values[scale_idx] = multivariate_sample_entropy(coarse, m, r_ratio)
+    return values
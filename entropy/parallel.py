@@ -0,0 +1,114 @@
+"""
+熵计算的多进程执行层
+
+信号数组只复制一次到共享内存，工作进程直接映射该内存而不是接收pickle副本。
+任务以 (通道, 尺度) 为单位调度，并按计算量从大到小提交 (尺度1最先)，
+避免耗时最长的尺度1任务在最后才开始导致其余进程空闲。
+"""
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+from .base_entropy import calculate_sample_entropy
+from .mse import compute_mse_batch
+from utils.signal_processing import coarse_grain_time_series
+from utils.dtypes import as_float_array
+from utils.profiling import enable_profiling, is_profiling_enabled, profile_stage, get_events, add_events
+
+# 工作进程中映射的共享信号数组
+_shared_signals = None
+_shared_block = None
+
+def resolve_n_workers(n_workers, n_tasks=None):
+    """
+    将配置中的进程数解析为实际使用的进程数
+    
+    参数:
+    n_workers (int): 进程数，None或<=0表示使用全部CPU核心
+    n_tasks (int): 任务数量，进程数不会超过任务数
+    
+    返回:
+    int: 实际进程数 (至少为1)
+    """
+    if n_workers is None or n_workers <= 0:
+        n_workers = os.cpu_count() or 1
+    if n_tasks is not None:
+        n_workers = min(n_workers, n_tasks)
+    return max(1, n_workers)
+
+def _attach_shared_signals(shm_name, shape, dtype):
+    """工作进程初始化: 映射父进程创建的共享内存"""
+    global _shared_signals, _shared_block
+    _shared_block = shared_memory.SharedMemory(name=shm_name)
+    _shared_signals = np.ndarray(shape, dtype=dtype, buffer=_shared_block.buf)
+
+def _sample_entropy_task(channel, scale, m, r_ratio, fixed_r, profile=(False, False)):
+    """工作进程任务: 计算单个 (通道, 尺度) 的样本熵，返回 (熵值, 该任务的阶段记录)"""
+    if profile[0]:
+        enable_profiling(*profile)
+    with profile_stage('sampen', channel=channel, scale=scale):
+        signal = _shared_signals[channel]
+        coarse_ts = coarse_grain_time_series(signal, scale)
+        if len(coarse_ts) < 2 * m:
+            value = np.nan
+        else:
+            r = r_ratio * np.std(signal) if fixed_r else None
+            value = calculate_sample_entropy(coarse_ts, m=m, r_ratio=r_ratio, r=r)
+    return value, get_events(clear=True) if profile[0] else []
+
+def compute_mse_parallel(signals, max_scale=20, m=2, r_ratio=0.2, fixed_r=False,
+                         n_workers=None, show_progress=True, cells=None):
+    """
+    使用进程池并行计算多通道的多尺度样本熵
+    
+    结果与 compute_mse_batch 完全一致，且与任务完成顺序无关。
+    
+    参数:
+    signals (np.array): 一维信号或形状为 [n_channels, n_timepoints] 的信号
+    max_scale (int): 最大尺度因子
+    m (int): 嵌入维度
+    r_ratio (float): 容限因子比例
+    fixed_r (bool): 是否在所有尺度上使用尺度1的容限
+    n_workers (int): 进程数，None或<=0表示使用全部CPU核心，1表示串行计算
+    show_progress (bool): 是否显示进度条
+    cells (np.array): 可选，形状为 [n_channels, max_scale] 的布尔数组，只计算为True的 (通道, 尺度)，其余为NaN
+    
+    返回:
+    np.array: 形状为 [n_channels, max_scale] 的样本熵值
+    """
+    signals = np.ascontiguousarray(np.atleast_2d(as_float_array(signals)))
+    n_channels = signals.shape[0]
+    
+    # 尺度从小到大 (计算量从大到小) 排列任务
+    tasks = [(ch, scale) for scale in range(1, max_scale + 1) for ch in range(n_channels)
+             if cells is None or cells[ch, scale - 1]]
+    n_workers = resolve_n_workers(n_workers, len(tasks))
+    if n_workers == 1:
+        return compute_mse_batch(signals, max_scale, m, r_ratio, fixed_r, cells)
+    
+    mse_values = np.full((n_channels, max_scale), np.nan)
+    profile = is_profiling_enabled()
+    shm = shared_memory.SharedMemory(create=True, size=signals.nbytes)
+    try:
+        np.ndarray(signals.shape, dtype=signals.dtype, buffer=shm.buf)[:] = signals
+    
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_attach_shared_signals,
+                                 initargs=(shm.name, signals.shape, signals.dtype)) as executor:
+            futures = {
+                executor.submit(_sample_entropy_task, ch, scale, m, r_ratio, fixed_r, profile): (ch, scale)
+                for ch, scale in tasks
+            }
+            completed = as_completed(futures)
+            if show_progress:
+                from tqdm import tqdm
+                completed = tqdm(completed, total=len(futures), desc="熵分析")
+            for future in completed:
+                ch, scale = futures[future]
+                mse_values[ch, scale - 1], events = future.result()
+                add_events(events)
+    finally:
+        shm.close()
+        shm.unlink()
+    
+    return mse_values
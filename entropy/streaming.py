@@ -0,0 +1,269 @@
+"""
+滑动窗口上的增量多尺度样本熵
+
+每个尺度保存窗口内粗粒化序列的环形缓冲区，以及窗口内长度为m和m+1的相似模板对数。
+窗口每前移一段，只把移出的模板与窗口中其余模板之间的匹配对数减去、把新进入的模板与
+其余模板之间的匹配对数加上，每次更新的开销为 O(新模板数 × 窗口模板数) 而不是从头统计
+整个窗口的 O(窗口模板数^2)。
+
+匹配对数依赖容限r，因此r在窗口第一次填满时按该窗口的标准差确定 (校准)。之后每个尺度用窗口内
+样本的滚动和与平方和跟踪当前窗口的标准差，某个通道按当前窗口应有的r与正在使用的r相对偏离超过
+r_tolerance 时，该通道在该尺度上改用新的r并从头统计，因此输出的熵与逐窗口重算的结果之差有界，
+不随数据流的时长漂移；r_tolerance 为0时每次窗口标准差变化都重新统计，与逐窗口重算完全一致。
+recalibrate 按当前窗口重新确定所有的r并重新统计。粗粒化的块从数据流的第一个样本开始划分，
+因此尺度为τ时窗口包含最近 window // τ 个完整的块。
+"""
+import numpy as np
+from .base_entropy import count_template_matches, sample_entropy_from_counts
+from .tiling import tile_elements
+from utils.ring_buffer import RingBuffer
+from utils.dtypes import as_float_array
+
+def _sorted_columns(templates):
+    """将模板按第一个分量排序，每个分量单独连续存放"""
+    order = np.argsort(templates[:, 0], kind='stable')
+    return [templates[order, k] for k in range(templates.shape[1])]
+
+def _cross_match_counts(rows_columns, cols_columns, tolerance, m, max_elements):
+    """
+    统计两组模板之间的匹配对数 (切比雪夫距离 < r)
+
+    与 count_template_matches 相同，两组模板都按第一个分量排序，每个行模板只与第一个分量
+    相差不超过r的候选模板比较；候选按行分块，每块的距离数组不超过 max_elements 个元素。
+
+    参数:
+    rows_columns (list): 按第一个分量排序的行模板，每个分量一个数组 (见 _sorted_columns)
+    cols_columns (list): 按第一个分量排序的候选模板
+    tolerance: 容限 (与模板精度相同)
+    m (int): 嵌入维度
+    max_elements (int): 每块距离数组的元素数上限
+
+    返回:
+    np.array: (长度为m的匹配对数, 长度为m+1的匹配对数)
+    """
+    counts = np.zeros(2, dtype=np.int64)
+    n_rows_total = len(rows_columns[0])
+    if n_rows_total == 0 or len(cols_columns[0]) == 0:
+        return counts
+
+    first = rows_columns[0]
+    # 每个行模板的候选区间 (留出浮点舍入余量, 精确判断在块内进行)
+    margin = 4 * np.spacing(np.abs(first) + tolerance)
+    lower = np.searchsorted(cols_columns[0], first - tolerance - margin, side='left')
+    upper = np.searchsorted(cols_columns[0], first + tolerance + margin, side='right')
+    start = 0
+    while start < n_rows_total:
+        n_rows = max(1, min(max_elements // max(1, upper[start] - lower[start]), n_rows_total - start))
+        # 行模板比候选模板稀疏时，块的列宽随行数增长；限制列宽不超过单行候选区间的两倍
+        width = max(1, upper[start] - lower[start])
+        while n_rows > 1 and (n_rows * (upper[start + n_rows - 1] - lower[start]) > max_elements
+                              or upper[start + n_rows - 1] - lower[start] > 2 * width):
+            n_rows //= 2
+        stop = start + n_rows
+        col_start, col_stop = lower[start], upper[stop - 1]
+        if col_stop > col_start:
+            block = [column[start:stop, np.newaxis] for column in rows_columns]
+            candidates = [column[np.newaxis, col_start:col_stop] for column in cols_columns]
+            distance = np.abs(block[0] - candidates[0])
+            for k in range(1, m):
+                np.maximum(distance, np.abs(block[k] - candidates[k]), out=distance)
+            match = distance < tolerance
+            counts[0] += np.count_nonzero(match)
+            match &= np.abs(block[m] - candidates[m]) < tolerance
+            counts[1] += np.count_nonzero(match)
+        start = stop
+    return counts
+
+def _pair_change(leaving, remaining, entering, r, m):
+    """
+    窗口前移时匹配对数的变化: 减去移出模板的匹配对，加上新模板的匹配对 (各组内部的模板对也计入)
+
+    参数:
+    leaving, remaining, entering (np.array): 形状为 [n_channels, n, m+1] 的移出、保留和新进入的模板
+    r (np.array): 形状为 [n_channels] 的容限
+
+    返回:
+    np.array: 形状为 [2, n_channels] 的匹配对数变化
+    """
+    max_elements = tile_elements(bytes_per_element=2 * remaining.itemsize + 8)
+    change = np.zeros((2, len(r)), dtype=np.int64)
+    for ch in range(len(r)):
+        remaining_columns = _sorted_columns(remaining[ch])
+        for templates, sign in ((leaving[ch], -1), (entering[ch], 1)):
+            if len(templates) == 0:
+                continue
+            columns = _sorted_columns(templates)
+            # 组内模板对: 全部有序对减去自匹配后除以2
+            within = _cross_match_counts(columns, columns, r[ch], m, max_elements) - len(templates) * (r[ch] > 0)
+            change[:, ch] += sign * (_cross_match_counts(columns, remaining_columns, r[ch], m, max_elements)
+                                     + within // 2)
+    return change
+
+class _ScaleState:
+    """单个尺度的粗粒化缓冲区和匹配对数"""
+
+    def __init__(self, n_channels, scale, window, dtype):
+        self.scale = scale
+        self.coarse = RingBuffer(n_channels, max(1, window // scale), dtype)
+        self.carry = np.zeros((n_channels, 0), dtype=dtype)  # 尚未凑满一个块的样本
+        self.r = None
+        self.counts = np.zeros((2, n_channels), dtype=np.int64)
+        self.sums = np.zeros((2, n_channels))  # 窗口内样本的和与平方和 (float64)
+
+    def extend(self, values):
+        """写入新的粗粒化点并更新滚动和"""
+        dropped = self.coarse.extend(values).astype(np.float64)
+        values = values.astype(np.float64)
+        self.sums[0] += values.sum(axis=1) - dropped.sum(axis=1)
+        self.sums[1] += (values ** 2).sum(axis=1) - (dropped ** 2).sum(axis=1)
+
+    def refresh_sums(self):
+        """从窗口重新计算滚动和，消除累积的舍入误差"""
+        values = self.coarse.view().astype(np.float64)
+        self.sums = np.stack([values.sum(axis=1), (values ** 2).sum(axis=1)])
+
+    def std(self):
+        """由滚动和得到的窗口标准差"""
+        size = max(1, self.coarse.size)
+        mean = self.sums[0] / size
+        return np.sqrt(np.maximum(self.sums[1] / size - mean ** 2, 0.0))
+
+    def coarse_grain(self, chunk):
+        """将新样本与上次剩余的样本拼接后按块求平均，返回新的粗粒化点"""
+        if self.scale == 1:
+            return chunk
+        samples = np.concatenate([self.carry, chunk], axis=1) if self.carry.shape[1] else chunk
+        n_blocks = samples.shape[1] // self.scale
+        self.carry = samples[:, n_blocks * self.scale:].copy()
+        blocks = samples[:, :n_blocks * self.scale].reshape(samples.shape[0], n_blocks, self.scale)
+        return blocks.mean(axis=2, dtype=np.float64).astype(samples.dtype, copy=False)
+
+class SlidingMultiscaleEntropy:
+    """
+    滑动窗口上的增量多尺度样本熵
+
+    参数:
+    n_channels (int): 通道数
+    window (int): 窗口长度(样本点)
+    max_scale (int): 最大尺度因子
+    m (int): 嵌入维度
+    r_ratio (float): 容限因子比例
+    fixed_r (bool): 是否在所有尺度上使用尺度1的容限
+    dtype: 缓冲区和模板比较的精度
+    r_tolerance (float): 正在使用的r与按当前窗口标准差应有的r的最大相对偏离，超过时重新统计
+    """
+
+    def __init__(self, n_channels, window, max_scale=20, m=2, r_ratio=0.2, fixed_r=False, dtype=np.float64,
+                 r_tolerance=0.02):
+        self.n_channels = n_channels
+        self.window = window
+        self.max_scale = max_scale
+        self.m = m
+        self.r_ratio = r_ratio
+        self.fixed_r = fixed_r
+        self.dtype = dtype
+        self.r_tolerance = r_tolerance
+        self.reset()
+
+    def reset(self):
+        """清空所有尺度的缓冲区和计数，开始新的数据流"""
+        self._scales = [_ScaleState(self.n_channels, scale, self.window, self.dtype)
+                        for scale in range(1, self.max_scale + 1)]
+        self.calibrated = False
+
+    @property
+    def ready(self):
+        """窗口是否已填满 (此后才能得到熵值)"""
+        return self._scales[0].coarse.full
+
+    def _templates(self, values):
+        return np.lib.stride_tricks.sliding_window_view(values, self.m + 1, axis=1)
+
+    def _recount(self, state, channels):
+        """按各通道当前的r从头统计指定通道的匹配对数"""
+        values = state.coarse.view()
+        for ch in channels:
+            state.counts[:, ch] = count_template_matches(values[ch], self.m, state.r[ch])
+
+    def _target_r(self):
+        """按当前窗口的标准差各尺度应使用的r"""
+        base_r = self.r_ratio * self._scales[0].std()
+        return [base_r if self.fixed_r else self.r_ratio * state.std() for state in self._scales]
+
+    def recalibrate(self):
+        """按当前窗口重新确定各尺度的容限r，并从头统计匹配对数"""
+        for state in self._scales:
+            state.refresh_sums()
+        for state, r in zip(self._scales, self._target_r()):
+            state.r = r.astype(state.coarse.view().dtype)
+            self._recount(state, range(self.n_channels))
+        self.calibrated = True
+
+    def _follow_window(self):
+        """r偏离当前窗口应有的值超过 r_tolerance 的 (尺度, 通道) 改用新的r并重新统计"""
+        for state, target in zip(self._scales, self._target_r()):
+            drift = np.abs(target - state.r) > self.r_tolerance * state.r
+            # r为0的通道 (常数窗口) 在窗口不再为常数时也需要重新统计
+            drift |= (state.r == 0) & (target > 0)
+            channels = np.flatnonzero(drift)
+            if len(channels) == 0:
+                continue
+            state.refresh_sums()
+            target = self.r_ratio * (self._scales[0].std() if self.fixed_r else state.std())
+            state.r[channels] = target[channels]
+            self._recount(state, channels)
+
+    def update(self, chunk):
+        """
+        写入新样本并更新各尺度的匹配对数
+
+        参数:
+        chunk (np.array): 形状为 [n_channels, n_samples] 的数据块
+        """
+        chunk = as_float_array(np.atleast_2d(chunk), self.dtype)
+        for state in self._scales:
+            new_values = state.coarse_grain(chunk)
+            if new_values.shape[1] == 0:
+                continue
+            if not self.calibrated:
+                state.extend(new_values)
+                continue
+
+            capacity = state.coarse.capacity
+            n_templates = capacity - self.m
+            if new_values.shape[1] >= n_templates:
+                # 新模板数不少于窗口模板数时从头统计更快
+                state.extend(new_values)
+                self._recount(state, range(self.n_channels))
+                continue
+
+            # 窗口已满: 移出的模板在旧窗口开头，新模板在新窗口末尾，二者之间的模板保持不变
+            n_new = new_values.shape[1]
+            leaving = self._templates(state.coarse.view())[:, :n_new].copy()
+            state.extend(new_values)
+            new_templates = self._templates(state.coarse.view())
+            state.counts += _pair_change(leaving, new_templates[:, :n_templates - n_new],
+                                         new_templates[:, n_templates - n_new:], state.r, self.m)
+
+        if not self.calibrated:
+            if self.ready:
+                self.recalibrate()
+        else:
+            self._follow_window()
+
+    def values(self):
+        """
+        当前窗口的多尺度样本熵
+
+        返回:
+        np.array: 形状为 [n_channels, max_scale] 的样本熵，窗口未满或序列过短的尺度为NaN
+        """
+        values = np.full((self.n_channels, self.max_scale), np.nan)
+        if not self.calibrated:
+            return values
+        for scale_idx, state in enumerate(self._scales):
+            if state.coarse.size < 2 * self.m:
+                continue
+            entropy = sample_entropy_from_counts(state.counts[0], state.counts[1])
+            values[:, scale_idx] = np.where(state.r > 0, entropy, np.nan)
+        return values
@@ -0,0 +1,75 @@
+"""
+模板比较的分块 (tile) 设置
+
+样本熵和模糊熵需要比较所有模板对，直接向量化需要 O(N^2) 内存。这里的内核把模板按行
+分成若干块，每块只与需要比较的列计算距离，计数在块之间累加，因此内存只取决于块大小。
+块的工作集默认与CPU二级缓存大小相当，且不超过内存预算。
+"""
+import os
+
+DEFAULT_MEMORY_BUDGET = 256 * 1024 ** 2  # 单个分块工作集的上限(字节)
+_FALLBACK_CACHE_BYTES = 1024 ** 2
+
+_memory_budget = DEFAULT_MEMORY_BUDGET
+_tile_bytes = 0
+_cache_bytes = None
+
+def configure_tiling(memory_budget=None, tile_bytes=0):
+    """
+    设置分块参数 (在创建工作进程之前调用，子进程通过fork继承)
+
+    参数:
+    memory_budget (int): 单个分块工作集的上限(字节)，None表示使用默认值
+    tile_bytes (int): 分块工作集大小(字节)，0表示按CPU二级缓存大小自动选择
+    """
+    global _memory_budget, _tile_bytes
+    _memory_budget = DEFAULT_MEMORY_BUDGET if memory_budget is None else memory_budget
+    _tile_bytes = tile_bytes
+
+def cache_size_bytes():
+    """
+    检测CPU二级缓存的大小，无法检测时返回1 MiB
+
+    返回:
+    int: 缓存大小(字节)
+    """
+    global _cache_bytes
+    if _cache_bytes is not None:
+        return _cache_bytes
+
+    size = 0
+    try:
+        size = os.sysconf('SC_LEVEL2_CACHE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        pass
+    if not size or size <= 0:
+        # sysconf 不可用时读取 sysfs 中的缓存描述
+        base = '/sys/devices/system/cpu/cpu0/cache'
+        try:
+            for index in sorted(os.listdir(base)):
+                with open(os.path.join(base, index, 'level')) as f:
+                    level = int(f.read())
+                if level == 2:
+                    with open(os.path.join(base, index, 'size')) as f:
+                        text = f.read().strip()
+                    units = {'K': 1024, 'M': 1024 ** 2}
+                    size = int(text[:-1]) * units[text[-1]] if text[-1] in units else int(text)
+                    break
+        except (OSError, ValueError):
+            size = 0
+
+    _cache_bytes = size if size and size > 0 else _FALLBACK_CACHE_BYTES
+    return _cache_bytes
+
+def tile_elements(bytes_per_element):
+    """
+    每个分块可容纳的距离矩阵元素数
+
+    参数:
+    bytes_per_element (int): 每个元素对应的工作集字节数 (距离数组加上临时数组)
+
+    返回:
+    int: 元素数 (至少为1)
+    """
+    tile_bytes = _tile_bytes if _tile_bytes > 0 else cache_size_bytes()
+    return max(1, min(tile_bytes, _memory_budget) // bytes_per_element)
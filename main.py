@@ -1,138 +1,781 @@
 """
 主程序入口点
-"""
-from utils.plotting_config import configure_matplotlib_fonts
-configure_matplotlib_fonts() # 配置matplotlib字体
 
+matplotlib与可视化模块只在首次绘图时导入；仅计算模式 (--headless) 下完全不导入，
+只保存数值结果。
+"""
 import os
 import glob
+import json
+import pickle
 import numpy as np
-import matplotlib.pyplot as plt
-from tqdm import tqdm
 import warnings
 import datetime
 warnings.filterwarnings('ignore')
 
 # 导入项目模块
 from preprocessing.edf_loader import load_edf
+from preprocessing.edf_reader import read_edf_header, read_edf_data, iter_edf_chunks
+from preprocessing.annotations import qrs_annotation_path, read_qrs_peaks
 from utils.signal_processing import preprocess_signal
-from entropy.mse import compute_mse
-from network_analysis.construct_graph import construct_similarity_graph
-from network_analysis.network_metrics import extract_network_metrics
-from visualization.plot_entropy import plot_entropy_curve, plot_entropy_comparison
-from visualization.plot_network import plot_network_graph, plot_network_metrics_comparison
+from utils.dtypes import resolve_dtype
+from entropy.parallel import compute_mse_parallel
+from entropy.mse import compute_multiscale_entropy
+from entropy.multivariate import multiscale_cross_entropy, multivariate_multiscale_entropy
+from entropy.tiling import configure_tiling
+from network_analysis.similarity import compute_similarity_matrix
+from network_analysis.construct_graph import threshold_similarity_matrix
+from network_analysis.network_metrics import extract_network_metrics, METRIC_NAMES
+from network_analysis.dynamic import dynamic_network_analysis
+from network_analysis.threshold_sweep import threshold_sweep
+from pipeline.batch import run_isolated_batch
+from pipeline.prefetch import Prefetcher
+from pipeline.cache import ResultCache, file_digest, make_cache_key
+from pipeline.results_store import ResultsStore
+from pipeline.render import FigureRenderer, render_figure
+from pipeline.streaming import StreamingAnalyzer
+from pipeline.significance import surrogate_test, prune_edges
+from pipeline.hrv import hrv_analysis
+from pipeline.manifest import RunManifest, in_shard, parse_shard, write_pickle_atomic
+from utils.profiling import enable_profiling, profile_stage, get_events, add_events, export_chrome_trace, print_summary
 
 # 导入配置
 from config import *
 
-def process_single_file(edf_path, max_samples=5000):
-    """处理单个EDF文件"""
-    file_name = os.path.basename(edf_path).split('.')[0]
-    print(f"\n处理文件: {file_name}")
-    
-    # 加载EDF数据
-    data, labels = load_edf(edf_path)
-    if data is None:
-        print(f"无法处理文件 {file_name}，跳过")
+# 熵计算的模板比较分块参数 (工作进程通过fork继承)
+configure_tiling(ENTROPY_MEMORY_BUDGET, ENTROPY_TILE_BYTES)
+
+_visualization = None
+
+def load_visualization():
+    """首次绘图时导入matplotlib与可视化模块，并配置matplotlib字体"""
+    global _visualization
+    if _visualization is None:
+        from utils.plotting_config import configure_matplotlib_fonts
+        configure_matplotlib_fonts() # 配置matplotlib字体
+        import visualization
+        _visualization = visualization
+    return _visualization
+
+def get_result_cache():
+    """按配置创建结果缓存，未启用时返回None"""
+    if not CACHE_ENABLED:
         return None
+    return ResultCache(CACHE_DIR, CACHE_MAX_BYTES)
+
+def get_results_store():
+    """按配置打开列式结果库，未启用时返回None"""
+    if not RESULTS_STORE_ENABLED:
+        return None
+    return ResultsStore(RESULTS_STORE_DIR)
+
+def run_parameters():
+    """本次运行中影响结果的配置参数，与结果一起保存以便跨运行比较"""
+    return {
+        'data_dir': DATA_DIR, 'max_samples': MAX_SAMPLES, 'sampen_m': SAMPEN_M, 'sampen_r_ratio': SAMPEN_R_RATIO,
+        'mse_max_scale': MSE_MAX_SCALE, 'mse_fixed_r': MSE_FIXED_R, 'extra_entropy': EXTRA_ENTROPY,
+        'multivariate_entropy': MULTIVARIATE_ENTROPY,
+        'pe_order': PE_ORDER, 'pe_delay': PE_DELAY, 'fuzzy_n': FUZZY_N,
+        'fuzzy_max_samples': FUZZY_MAX_SAMPLES,
+        'similarity_measure': SIMILARITY_MEASURE, 'similarity_threshold': SIMILARITY_THRESHOLD,
+        'threshold_sweep': THRESHOLD_SWEEP, 'threshold_sweep_points': THRESHOLD_SWEEP_POINTS,
+        'surrogate_count': SURROGATE_COUNT, 'surrogate_method': SURROGATE_METHOD,
+        'surrogate_targets': SURROGATE_TARGETS, 'surrogate_alpha': SURROGATE_ALPHA, 'surrogate_seed': SURROGATE_SEED,
+        'surrogate_stop_after': SURROGATE_STOP_AFTER,
+        'hrv_analysis': HRV_ANALYSIS, 'hrv_max_scale': HRV_MAX_SCALE, 'hrv_rr_range': HRV_RR_RANGE,
+        'hrv_beat_window': HRV_BEAT_WINDOW, 'hrv_beat_feature': HRV_BEAT_FEATURE,
+        'dynamic_network': DYNAMIC_NETWORK, 'dynamic_window': DYNAMIC_WINDOW, 'dynamic_stride': DYNAMIC_STRIDE,
+        'low_freq': LOW_FREQ, 'high_freq': HIGH_FREQ, 'filter_order': FILTER_ORDER, 'sampling_rate': SAMPLING_RATE,
+        'compute_dtype': COMPUTE_DTYPE, 'metric_names': METRIC_NAMES,
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds')
+    }
+
+def record_inputs(edf_path):
+    """记录输入文件 (EDF文件和HRV分析使用的QRS注释) 的内容摘要，作为运行清单中单元的输入键"""
+    qrs_path = qrs_annotation_path(edf_path) if HRV_ANALYSIS else None
+    return make_cache_key(file_digest(edf_path), file_digest(qrs_path) if qrs_path else None)
+
+def surrogate_pruning():
+    """是否按替代数据检验删除不显著的边 (替代数据个数须使可达到的最小p值小于显著性水平)"""
+    return (SURROGATE_COUNT > 0 and SURROGATE_ALPHA is not None and 'edges' in SURROGATE_TARGETS
+            and 1.0 / (SURROGATE_COUNT + 1) < SURROGATE_ALPHA)
+
+def load_record(edf_path, max_samples=MAX_SAMPLES, n_max_channels=6):
+    """
+    加载阶段: 读取处理一个记录所需的全部输入 (磁盘I/O)，不做计算也不打印，可以在后台线程中预取
     
-    # 选择前6个通道，或所有通道如果少于6个
-    n_channels = min(6, data.shape[0])
-    selected_data = data[:n_channels, :max_samples]
-    selected_labels = labels[:n_channels] if labels else [f"Channel {i+1}" for i in range(n_channels)]
+    参数:
+    edf_path (str): EDF文件路径
+    max_samples (int): 每个通道最多读取的样本数，None表示整段记录
+    n_max_channels (int): 最多使用的通道数
     
-    print(f"选择 {n_channels} 个通道用于分析: {selected_labels}")
-    print(f"每个通道使用 {selected_data.shape[1]} 个样本点")
+    返回:
+    dict: 'keys' 各阶段的缓存键 (未启用缓存时为None)；
+          预处理结果已缓存时 'preprocessed' 为缓存的 (信号, 标签, 采样率)，
+          否则 'data', 'labels', 'sfreq' 为所选通道的原始数据 (加载失败时 'data' 为None)
+    """
+    file_name = os.path.basename(edf_path).split('.')[0]
+    with profile_stage('load', record=file_name):
+        cache = get_result_cache()
+        keys = None
+        # 各阶段的缓存键: 预处理键由文件内容和预处理参数决定，熵和网络阶段在其基础上
+        # 只加入各自的参数，因此修改网络参数不会使熵结果失效
+        if cache is not None:
+            preprocess_key = make_cache_key(file_digest(edf_path), max_samples, n_max_channels,
+                                            LOW_FREQ, HIGH_FREQ, FILTER_ORDER, SAMPLING_RATE, COMPUTE_DTYPE)
+            keys = {
+                'preprocess': preprocess_key,
+                'mse': make_cache_key(preprocess_key, SAMPEN_M, SAMPEN_R_RATIO, MSE_MAX_SCALE, MSE_FIXED_R),
+                'entropy': make_cache_key(preprocess_key, EXTRA_ENTROPY, SAMPEN_M, SAMPEN_R_RATIO, MSE_MAX_SCALE,
+                                          MSE_FIXED_R, PE_ORDER, PE_DELAY, FUZZY_N,
+                                          FUZZY_MAX_SAMPLES if 'fuzzy' in EXTRA_ENTROPY else None),
+                'multivariate': make_cache_key(preprocess_key, 'multivariate-pooled', SAMPEN_M, SAMPEN_R_RATIO,
+                                               MSE_MAX_SCALE, MSE_FIXED_R),
+            }
+            keys['surrogate'] = make_cache_key(keys['mse'], SIMILARITY_MEASURE, SURROGATE_COUNT, SURROGATE_METHOD,
+                                               SURROGATE_TARGETS, SURROGATE_SEED, SURROGATE_STOP_AFTER)
+            # 删除不显著的边时网络依赖替代数据检验的结果
+            pruning = surrogate_pruning()
+            keys['network'] = make_cache_key(preprocess_key, SIMILARITY_MEASURE, SIMILARITY_THRESHOLD, METRIC_NAMES,
+                                             THRESHOLD_SWEEP, THRESHOLD_SWEEP_POINTS,
+                                             (keys['surrogate'], SURROGATE_ALPHA) if pruning else None)
+            # HRV分析使用整段记录和QRS注释文件
+            qrs_path = qrs_annotation_path(edf_path)
+            keys['hrv'] = make_cache_key(file_digest(edf_path), file_digest(qrs_path) if qrs_path else None,
+                                         n_max_channels, LOW_FREQ, HIGH_FREQ, FILTER_ORDER, COMPUTE_DTYPE,
+                                         SAMPEN_M, SAMPEN_R_RATIO, MSE_FIXED_R, SIMILARITY_MEASURE,
+                                         SIMILARITY_THRESHOLD, METRIC_NAMES, HRV_MAX_SCALE, HRV_RR_RANGE,
+                                         HRV_BEAT_WINDOW, HRV_BEAT_FEATURE)
+            cached = cache.load('preprocess', preprocess_key)
+            if cached is not None:
+                return {'keys': keys, 'preprocessed': (cached[0]['signals'], cached[1]['labels'], cached[1]['sfreq'])}
+        
+        # 只解码前6个通道 (或所有通道如果少于6个)，max_samples为None时读取整段记录
+        data, labels, sfreq = load_edf(edf_path, channels=slice(0, n_max_channels), stop=max_samples,
+                                       return_sfreq=True, dtype=resolve_dtype(COMPUTE_DTYPE), verbose=False)
+    return {'keys': keys, 'preprocessed': None, 'data': data, 'labels': labels, 'sfreq': sfreq}
+
+def process_single_file(edf_path, max_samples=MAX_SAMPLES, n_workers=N_WORKERS, loaded=None):
+    """
+    处理单个EDF文件
     
-    # 预处理每个通道的信号
-    preprocessed_signals = []
-    for i, signal in enumerate(selected_data):
-        proc_signal = preprocess_signal(signal, LOW_FREQ, HIGH_FREQ, SAMPLING_RATE)
-        preprocessed_signals.append(proc_signal)
+    loaded 为 load_record 预先加载的输入 (例如由后台线程预取)，为None时在此加载。
+    """
+    file_name = os.path.basename(edf_path).split('.')[0]
+    print(f"\n处理文件: {file_name}")
     
-    preprocessed_signals = np.array(preprocessed_signals)
+    if loaded is None:
+        loaded = load_record(edf_path, max_samples)
+    keys = loaded['keys']
+    cache = get_result_cache() if keys is not None else None
+    
+    if loaded['preprocessed'] is not None:
+        preprocessed_signals, selected_labels, sfreq = loaded['preprocessed']
+        print(f"使用缓存的预处理信号: {selected_labels}")
+    else:
+        selected_data, labels, sfreq = loaded['data'], loaded['labels'], loaded['sfreq']
+        if selected_data is None:
+            print(f"无法处理文件 {file_name}，跳过")
+            return None
+        
+        n_channels = selected_data.shape[0]
+        selected_labels = labels if labels else [f"Channel {i+1}" for i in range(n_channels)]
+        
+        print(f"选择 {n_channels} 个通道用于分析: {selected_labels}")
+        print(f"每个通道使用 {selected_data.shape[1]} 个样本点")
+        
+        # 所有通道一次完成去趋势、带通滤波和标准化，滤波器按文件的真实采样率设计；
+        # 原始数据之后不再使用，直接在其缓冲区上处理
+        sfreq = sfreq or SAMPLING_RATE
+        with profile_stage('preprocess', record=file_name):
+            preprocessed_signals = preprocess_signal(selected_data, LOW_FREQ, HIGH_FREQ, sfreq, FILTER_ORDER,
+                                                     overwrite=True)
+        if cache is not None:
+            cache.save('preprocess', keys['preprocess'], {'signals': preprocessed_signals},
+                       {'labels': selected_labels, 'sfreq': sfreq})
     
     # 计算熵
-    print("计算熵值...")
-    mse_results = []
+    cached = cache.load('mse', keys['mse']) if cache is not None else None
+    if cached is not None:
+        print("使用缓存的熵值")
+        mse_results = cached[0]['mse']
+    else:
+        print("计算熵值...")
+        # 按 (通道, 尺度) 任务并行计算多尺度样本熵，形状为 [n_channels, MSE_MAX_SCALE]
+        with profile_stage('entropy', record=file_name):
+            mse_results = compute_mse_parallel(preprocessed_signals, MSE_MAX_SCALE, SAMPEN_M, SAMPEN_R_RATIO,
+                                               MSE_FIXED_R, n_workers=n_workers)
+        if cache is not None:
+            cache.save('mse', keys['mse'], {'mse': mse_results})
+    
+    # 其他多尺度熵 (排列熵、模糊熵) 在同一次遍历粗粒化序列时计算
+    extra_entropy = {}
+    if EXTRA_ENTROPY:
+        cached = cache.load('entropy', keys['entropy']) if cache is not None else None
+        if cached is not None:
+            extra_entropy = cached[0]
+        else:
+            print(f"计算多尺度熵: {EXTRA_ENTROPY}")
+            if ('fuzzy' in EXTRA_ENTROPY and FUZZY_MAX_SAMPLES is not None
+                    and preprocessed_signals.shape[1] > FUZZY_MAX_SAMPLES):
+                print(f"警告: 模糊熵的计算量与序列长度的平方成正比，只使用前 {FUZZY_MAX_SAMPLES} 个样本点 "
+                      f"(共 {preprocessed_signals.shape[1]} 个，见 FUZZY_MAX_SAMPLES)")
+            with profile_stage('entropy_extra', record=file_name):
+                extra_entropy = compute_multiscale_entropy(preprocessed_signals, MSE_MAX_SCALE, EXTRA_ENTROPY,
+                                                           SAMPEN_M, SAMPEN_R_RATIO, MSE_FIXED_R,
+                                                           PE_ORDER, PE_DELAY, FUZZY_N,
+                                                           fuzzy_max_samples=FUZZY_MAX_SAMPLES)
+            if cache is not None:
+                cache.save('entropy', keys['entropy'], extra_entropy)
     
-    for i, signal in enumerate(tqdm(preprocessed_signals, desc="熵分析")):
-        # 计算多尺度样本熵
-        mse = compute_mse(signal, MSE_MAX_SCALE, SAMPEN_M, SAMPEN_R_RATIO)
-        mse_results.append(mse)
+    # 多元多尺度样本熵和多尺度交叉样本熵: 每个尺度一个共享模板索引
+    multivariate = {}
+    if MULTIVARIATE_ENTROPY:
+        cached = cache.load('multivariate', keys['multivariate']) if cache is not None else None
+        if cached is not None:
+            multivariate = cached[0]
+        else:
+            print("计算多元多尺度样本熵和多尺度交叉样本熵...")
+            with profile_stage('entropy_multivariate', record=file_name):
+                multivariate = {
+                    'mvmse': multivariate_multiscale_entropy(preprocessed_signals, MSE_MAX_SCALE, SAMPEN_M,
+                                                             SAMPEN_R_RATIO, MSE_FIXED_R),
+                    'cross_mse': multiscale_cross_entropy(preprocessed_signals, MSE_MAX_SCALE, SAMPEN_M,
+                                                          SAMPEN_R_RATIO, MSE_FIXED_R),
+                }
+            if cache is not None:
+                cache.save('multivariate', keys['multivariate'], multivariate)
     
-    # 构建网络并计算网络指标
-    print("构建相似性网络...")
-    G = construct_similarity_graph(preprocessed_signals, SIMILARITY_MEASURE, SIMILARITY_THRESHOLD)
-    network_metrics = extract_network_metrics(G)
+    # 替代数据显著性检验: 多尺度熵各尺度和网络各条边的p值
+    surrogate = {}
+    if SURROGATE_COUNT > 0:
+        cached = cache.load('surrogate', keys['surrogate']) if cache is not None else None
+        if cached is not None:
+            print("使用缓存的替代数据检验结果")
+            surrogate = cached[0]
+        else:
+            print(f"替代数据检验: 每个通道 {SURROGATE_COUNT} 个 {SURROGATE_METHOD} 替代数据")
+            with profile_stage('surrogate_test', record=file_name):
+                surrogate = surrogate_test(preprocessed_signals, SURROGATE_COUNT, SURROGATE_METHOD, SURROGATE_TARGETS,
+                                           MSE_MAX_SCALE, SAMPEN_M, SAMPEN_R_RATIO, MSE_FIXED_R, SIMILARITY_MEASURE,
+                                           mse=mse_results, seed=SURROGATE_SEED, n_workers=n_workers,
+                                           memory_budget=SURROGATE_MEMORY_BUDGET, stop_after=SURROGATE_STOP_AFTER)
+            if cache is not None:
+                cache.save('surrogate', keys['surrogate'], surrogate)
+        if SURROGATE_ALPHA is not None and 'edge_p' in surrogate and not surrogate_pruning():
+            print(f"警告: {SURROGATE_COUNT} 个替代数据可达到的最小p值不小于显著性水平 {SURROGATE_ALPHA}，不删除边")
+    
+    # 构建网络 (加权邻接矩阵) 并计算网络指标
+    cached = cache.load('network', keys['network']) if cache is not None else None
+    if cached is not None:
+        print("使用缓存的网络")
+        arrays, network_metrics = cached
+        adjacency = arrays['adjacency']
+        sweep = {name[len('sweep_'):]: values for name, values in arrays.items() if name.startswith('sweep_')}
+    else:
+        print("构建相似性网络...")
+        with profile_stage('graph', record=file_name):
+            similarity = compute_similarity_matrix(preprocessed_signals, SIMILARITY_MEASURE)
+            adjacency = threshold_similarity_matrix(similarity, SIMILARITY_THRESHOLD)
+            if surrogate_pruning():
+                adjacency = prune_edges(adjacency, surrogate['edge_p'], SURROGATE_ALPHA)
+        with profile_stage('metrics', record=file_name):
+            network_metrics = extract_network_metrics(adjacency)
+        sweep = {}
+        if THRESHOLD_SWEEP is not None:
+            with profile_stage('threshold_sweep', record=file_name):
+                sweep = compute_threshold_sweep(similarity)
+        if cache is not None:
+            cache.save('network', keys['network'],
+                       {'adjacency': adjacency, **{f"sweep_{name}": values for name, values in sweep.items()}},
+                       network_metrics)
     
     print(f"网络指标: {network_metrics}")
     
-    return {
+    results = {
         'signals': preprocessed_signals,
         'labels': selected_labels,
+        'sfreq': sfreq,
         'mse': mse_results,
-        'network': G,
+        'entropy': extra_entropy,
+        'network': adjacency,
         'metrics': network_metrics
     }
+    if sweep:
+        results['sweep'] = sweep
+    if multivariate:
+        results['multivariate'] = multivariate
+    if surrogate:
+        results['surrogate'] = surrogate
+    
+    # 动态网络和HRV分析使用整段记录；已加载整段记录时直接使用预处理后的信号，否则只加载一次
+    full_record = (preprocessed_signals, sfreq) if max_samples is None else None
+    if DYNAMIC_NETWORK:
+        print("计算动态网络...")
+        with profile_stage('dynamic_network', record=file_name):
+            if full_record is None:
+                full_record = load_full_signals(edf_path, len(selected_labels))
+            if full_record[0] is not None:
+                results['dynamic'] = dynamic_network_analysis(full_record[0], DYNAMIC_WINDOW, DYNAMIC_STRIDE,
+                                                              SIMILARITY_MEASURE, SIMILARITY_THRESHOLD)
+    
+    # HRV分析: QRS注释给出的R峰把整段记录变为RR间期和逐搏特征序列
+    if HRV_ANALYSIS:
+        hrv = compute_hrv(edf_path, file_name, selected_labels, keys, cache, full_record)
+        if hrv is not None:
+            results['hrv'] = hrv
+    
+    return results
+
+def compute_hrv(edf_path, file_name, labels, keys, cache, full_record=None):
+    """
+    读取QRS注释并计算心搏级序列的多尺度熵和网络 (见 pipeline.hrv)
+    
+    参数:
+    full_record (tuple): 可选，已预处理的整段记录 (信号, 采样率)，None时在此加载
+    
+    返回:
+    dict: hrv_analysis 的结果，没有注释文件或加载失败时为None
+    """
+    qrs_path = qrs_annotation_path(edf_path)
+    if qrs_path is None:
+        print(f"未找到QRS注释文件 {edf_path}.qrs，跳过HRV分析")
+        return None
+    cached = cache.load('hrv', keys['hrv']) if cache is not None else None
+    if cached is not None:
+        print("使用缓存的HRV分析结果")
+        arrays, meta = cached
+        return {**arrays, 'series_labels': meta['series_labels'], 'metrics': meta['metrics']}
+    
+    print("HRV分析...")
+    with profile_stage('hrv', record=file_name):
+        signals, sfreq = full_record if full_record is not None else load_full_signals(edf_path, len(labels))
+        if signals is None:
+            return None
+        peaks = read_qrs_peaks(qrs_path, sfreq)
+        try:
+            hrv = hrv_analysis(signals, labels, peaks, sfreq, HRV_MAX_SCALE, SAMPEN_M, SAMPEN_R_RATIO, MSE_FIXED_R,
+                               SIMILARITY_MEASURE, SIMILARITY_THRESHOLD, HRV_BEAT_WINDOW, HRV_RR_RANGE,
+                               HRV_BEAT_FEATURE)
+        except ValueError as e:
+            print(f"{e}，跳过HRV分析")
+            return None
+    print(f"HRV: {len(peaks)} 个心搏, 使用 {hrv['series'].shape[1]} 个, 网络指标: {hrv['metrics']}")
+    if cache is not None:
+        cache.save('hrv', keys['hrv'],
+                   {name: values for name, values in hrv.items() if isinstance(values, np.ndarray)},
+                   {'series_labels': hrv['series_labels'], 'metrics': hrv['metrics']})
+    return hrv
+
+def compute_threshold_sweep(similarity):
+    """按配置在相似度阈值或比例密度上扫描网络指标 (见 network_analysis.threshold_sweep)"""
+    levels = np.linspace(0.0, 1.0, THRESHOLD_SWEEP_POINTS)
+    if THRESHOLD_SWEEP == 'threshold':
+        return threshold_sweep(similarity, thresholds=levels)
+    if THRESHOLD_SWEEP == 'density':
+        return threshold_sweep(similarity, densities=levels)
+    raise ValueError(f"不支持的阈值扫描方式: {THRESHOLD_SWEEP}")
 
-def save_single_file_results(file_name, results, output_dir):
-    """保存单个文件的分析结果"""
+def load_full_signals(edf_path, n_channels):
+    """
+    加载并预处理整段记录的所选通道
+    
+    返回:
+    tuple: (预处理后的信号, 采样率)，加载失败时为 (None, None)
+    """
+    full_data, _, sfreq = load_edf(edf_path, channels=slice(0, n_channels), return_sfreq=True,
+                                   dtype=resolve_dtype(COMPUTE_DTYPE))
+    if full_data is None:
+        return None, None
+    sfreq = sfreq or SAMPLING_RATE
+    return preprocess_signal(full_data, LOW_FREQ, HIGH_FREQ, sfreq, FILTER_ORDER, overwrite=True), sfreq
+
+def save_single_file_results(file_name, results, output_dir, headless=HEADLESS, renderer=None):
+    """
+    保存单个文件的分析结果，仅计算模式下只保存数值结果而不绘图
+    
+    图表任务提交给 renderer (pipeline.render.FigureRenderer) 后立即返回；
+    renderer为None时在当前进程中同步绘制。
+    """
+    file_output_dir = save_numeric_results(file_name, results, output_dir, headless)
+    if headless:
+        return
+    
+    jobs = figure_jobs(file_name, results, file_output_dir)
+    if renderer is not None:
+        renderer.submit_all(jobs)
+        return
+    
+    load_visualization()
+    with profile_stage('plotting', record=file_name):
+        for kind, kwargs in jobs:
+            render_figure(kind, reuse=not SHOW_FIGURES, **kwargs)
+
+def save_numeric_results(file_name, results, output_dir, headless=HEADLESS):
+    """保存单个文件的数值结果，返回该文件的输出目录"""
     # 创建文件特定的输出目录
     file_output_dir = os.path.join(output_dir, file_name)
     os.makedirs(file_output_dir, exist_ok=True)
     
+    if headless:
+        np.savez(os.path.join(file_output_dir, "results.npz"),
+                 labels=np.array(results['labels']), mse=results['mse'], adjacency=results['network'],
+                 **{f"entropy_{family}": values for family, values in results.get('entropy', {}).items()})
+        with open(os.path.join(file_output_dir, "metrics.json"), 'w') as f:
+            json.dump(results['metrics'], f, indent=2)
+    
+    # 保存阈值扫描的指标曲线
+    sweep = results.get('sweep')
+    if sweep is not None:
+        np.savez(os.path.join(file_output_dir, "threshold_sweep.npz"), **sweep)
+    
+    # 保存多元多尺度样本熵和多尺度交叉样本熵
+    multivariate = results.get('multivariate')
+    if multivariate is not None:
+        np.savez(os.path.join(file_output_dir, "multivariate_entropy.npz"), labels=np.array(results['labels']),
+                 **multivariate)
+    
+    # 保存替代数据检验的p值
+    surrogate = results.get('surrogate')
+    if surrogate is not None:
+        np.savez(os.path.join(file_output_dir, "surrogate_test.npz"), **surrogate)
+    
+    # 保存心搏级序列、多尺度熵和网络
+    hrv = results.get('hrv')
+    if hrv is not None:
+        np.savez(os.path.join(file_output_dir, "hrv.npz"), series_labels=np.array(hrv['series_labels']),
+                 **{name: values for name, values in hrv.items() if isinstance(values, np.ndarray)},
+                 **{f"metric_{name}": value for name, value in hrv['metrics'].items()})
+    
+    # 保存动态网络的相似度矩阵序列和指标时间序列
+    dynamic = results.get('dynamic')
+    if dynamic is not None:
+        np.savez(os.path.join(file_output_dir, "dynamic_network.npz"),
+                 starts=dynamic['starts'], similarity=dynamic['similarity'], **dynamic['metrics'])
+    return file_output_dir
+
+def figure_jobs(file_name, results, file_output_dir):
+    """
+    生成单个文件的绘图任务
+    
+    返回:
+    list: (图表类型, 参数字典) 列表，参数只包含绘图所需的小数组，可以发送给其他进程
+    """
     # 1. 为每个通道保存熵曲线
-    for i, label in enumerate(results['labels']):
-        # MSE曲线
-        plot_entropy_curve(
-            results['mse'][i],
-            title=f"{file_name} - {label} - MSE",
-            save_path=os.path.join(file_output_dir, f"{label}_mse.png"),
-            show=SHOW_FIGURES
-        )
+    jobs = [('entropy_curve', {
+        'entropy_values': results['mse'][i],
+        'title': f"{file_name} - {label} - MSE",
+        'save_path': os.path.join(file_output_dir, f"{label}_mse.png"),
+        'show': SHOW_FIGURES
+    }) for i, label in enumerate(results['labels'])]
+    
+    # 其他多尺度熵曲线
+    for family, values in results.get('entropy', {}).items():
+        jobs.extend(('entropy_curve', {
+            'entropy_values': values[i],
+            'title': f"{file_name} - {label} - Multiscale {family} entropy",
+            'save_path': os.path.join(file_output_dir, f"{label}_{family}.png"),
+            'show': SHOW_FIGURES
+        }) for i, label in enumerate(results['labels']))
+    
+    # 多元多尺度样本熵曲线 (所有通道一条曲线)
+    multivariate = results.get('multivariate')
+    if multivariate is not None:
+        jobs.append(('entropy_curve', {
+            'entropy_values': multivariate['mvmse'],
+            'title': f"{file_name} - Multivariate MSE",
+            'save_path': os.path.join(file_output_dir, "multivariate_mse.png"),
+            'show': SHOW_FIGURES
+        }))
     
     # 2. 保存网络图
-    plot_network_graph(
-        results['network'],
-        title=f"{file_name} - Signal Similarity Network",
-        save_path=os.path.join(file_output_dir, "network.png"),
-        show=SHOW_FIGURES
-    )
+    jobs.append(('network_graph', {
+        'G': results['network'],
+        'title': f"{file_name} - Signal Similarity Network",
+        'save_path': os.path.join(file_output_dir, "network.png"),
+        'show': SHOW_FIGURES
+    }))
+    
+    # 3. 保存阈值扫描的指标曲线
+    sweep = results.get('sweep')
+    if sweep is not None:
+        jobs.append(('dynamic_metrics', {
+            'starts': sweep['level'],
+            'metrics': {name: sweep[name] for name in ['density', 'avg_strength', 'n_components',
+                                                       'largest_component']},
+            'title': f"{file_name} - Threshold Sweep",
+            'xlabel': "Similarity Threshold" if THRESHOLD_SWEEP == 'threshold' else "Proportional Density",
+            'save_path': os.path.join(file_output_dir, "threshold_sweep.png"),
+            'show': SHOW_FIGURES
+        }))
+    
+    # 4. 保存心搏级序列 (RR间期和逐搏特征) 的多尺度熵曲线和网络图
+    hrv = results.get('hrv')
+    if hrv is not None:
+        jobs.extend(('entropy_curve', {
+            'entropy_values': hrv['mse'][i],
+            'title': f"{file_name} - {label} - Beat-level MSE",
+            'save_path': os.path.join(file_output_dir, f"hrv_{label.replace(' ', '_')}_mse.png"),
+            'show': SHOW_FIGURES
+        }) for i, label in enumerate(hrv['series_labels']))
+        jobs.append(('network_graph', {
+            'G': hrv['adjacency'],
+            'title': f"{file_name} - Beat-level Network",
+            'save_path': os.path.join(file_output_dir, "hrv_network.png"),
+            'show': SHOW_FIGURES
+        }))
+    
+    # 5. 保存动态网络的指标时间序列
+    dynamic = results.get('dynamic')
+    if dynamic is not None:
+        jobs.append(('dynamic_metrics', {
+            'starts': dynamic['starts'],
+            'metrics': dynamic['metrics'],
+            'title': f"{file_name} - Dynamic Network Metrics",
+            'save_path': os.path.join(file_output_dir, "dynamic_network.png"),
+            'show': SHOW_FIGURES
+        }))
+    return jobs
 
 def create_timestamped_output_dir():
-    """创建带时间戳的输出目录"""
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M")
-    timestamped_dir = os.path.join(OUTPUT_DIR, f"analysis_{timestamp}")
-    os.makedirs(timestamped_dir, exist_ok=True)
-    return timestamped_dir
-
-def run_batch_analysis():
-    """运行批量分析"""
+    """创建带时间戳的新输出目录，同名目录已存在时加序号 (新的运行不复用其他运行的目录和清单)"""
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    base_dir = os.path.join(OUTPUT_DIR, f"analysis_{timestamp}")
+    timestamped_dir, suffix = base_dir, 1
+    while True:
+        try:
+            os.makedirs(timestamped_dir)
+            return timestamped_dir
+        except FileExistsError:
+            timestamped_dir = f"{base_dir}_{suffix}"
+            suffix += 1
+
+def resolve_output_dir(resume=None):
+    """
+    确定本次运行的输出目录
+
+    参数:
+    resume (str): None表示新建带时间戳的目录，'latest' 表示续跑最近一次运行的目录 (没有时新建)，
+                  其他值为要续跑的目录路径 (不存在时创建，多个分片可以指定同一目录)
+
+    返回:
+    str: 输出目录
+    """
+    if resume is None:
+        return create_timestamped_output_dir()
+    if resume == 'latest':
+        previous = sorted(d for d in glob.glob(os.path.join(OUTPUT_DIR, "analysis_*")) if os.path.isdir(d))
+        if not previous:
+            return create_timestamped_output_dir()
+        resume = previous[-1]
+    os.makedirs(resume, exist_ok=True)
+    return resume
+
+def list_outputs(directory):
+    """输出目录中的文件 (相对路径)，作为清单中的输出位置"""
+    return sorted(os.path.relpath(os.path.join(root, name), directory)
+                  for root, _, names in os.walk(directory) for name in names if not name.endswith('.tmp'))
+
+def analyze_record(edf_file, output_dir, n_workers=N_WORKERS, profile=(False, False), headless=HEADLESS,
+                   loaded=None):
+    """
+    处理并保存单个记录，只返回用于汇总的精简结果 (不含信号数组和网络图)
+    
+    loaded 为父进程预取的 load_record 结果 (子进程通过fork继承，不复制)，为None时在子进程中加载。
+    
+    熵和网络指标同时追加到列式结果库，运行标识为输出目录名。
+    启用性能记录时，结果中的 'trace_events' 为该记录在子进程中记录的阶段事件。
+    非仅计算模式下不在此处绘图，而是在 'figure_jobs' 中返回绘图任务，由主进程提交给
+    后台渲染器，这样绘图不会推迟下一个记录的计算。
+    """
+    enable_profiling(*profile)
+    get_events(clear=True)
+    
+    results = process_single_file(edf_file, n_workers=n_workers, loaded=loaded)
+    if results is None:
+        return None
+    file_name = os.path.basename(edf_file).split('.')[0]
+    file_output_dir = save_numeric_results(file_name, results, output_dir, headless)
+    store = get_results_store()
+    if store is not None:
+        with profile_stage('persist', record=file_name):
+            store.append_record(os.path.basename(output_dir), file_name, results['labels'],
+                                results['mse'], results['metrics'])
+    return {
+        'labels': results['labels'],
+        'mse': results['mse'],
+        'metrics': results['metrics'],
+        'output_dir': file_output_dir,
+        'figure_jobs': [] if headless else figure_jobs(file_name, results, file_output_dir),
+        'trace_events': get_events(clear=True)
+    }
+
+def run_batch_analysis(profile=PROFILE_ENABLED, profile_memory=PROFILE_MEMORY, headless=HEADLESS, resume=None,
+                       shard=None):
+    """
+    运行批量分析
+    
+    参数:
+    profile (bool): 是否记录各阶段的运行时间与内存，并在输出目录中导出 trace.json
+    profile_memory (bool): 是否同时记录峰值内存分配
+    headless (bool): 仅计算模式，不导入matplotlib，不生成图表
+    resume (str): 续跑的运行目录，'latest' 表示最近一次运行，None表示新建运行目录 (见 resolve_output_dir)
+    shard (tuple): 只处理第 i 个分片的记录 (i, n)，None表示处理全部记录
+    
+    各记录按阶段流水处理: 加载 (磁盘I/O) 在后台线程中提前进行 (PREFETCH_RECORDS)，预处理、熵和网络
+    计算以及结果保存在独立子进程中进行，图表由后台渲染进程绘制 (RENDER_WORKERS)。阶段之间的队列
+    都是有界的，下游跟不上时上游等待，同时驻留内存的记录数有上限。
+    
+    输出目录中的运行清单记录每个记录的 'analysis' (计算和数值结果) 与 'figures' (图表) 阶段的完成
+    情况；续跑时以相同参数和相同输入文件完成的阶段被跳过，只有图表未完成的记录从保存的绘图任务
+    重新绘图，没有保存绘图任务 (之前以仅计算模式运行) 的记录重新计算。
+    """
     # 创建输出目录
-    output_dir = create_timestamped_output_dir()
+    output_dir = resolve_output_dir(resume)
     
-    # 获取所有EDF文件
-    edf_files = glob.glob(os.path.join(DATA_DIR, "*.edf"))
+    # 获取所有EDF文件 (分片时只保留分配给本分片的文件)
+    all_files = sorted(glob.glob(os.path.join(DATA_DIR, "*.edf")))
+    edf_files = [path for path in all_files if in_shard(path, shard)]
     if not edf_files:
         print(f"在 {DATA_DIR} 中没有找到EDF文件")
         return
     
-    # 处理每个文件
-    all_results = {}
-    for edf_file in edf_files:
-        results = process_single_file(edf_file)
-        if results:
-            file_name = os.path.basename(edf_file).split('.')[0]
-            all_results[file_name] = results
-            save_single_file_results(file_name, results, output_dir)
+    # 运行清单: 参数键不含时间戳，参数不变时续跑可以复用之前完成的阶段
+    params = run_parameters()
+    manifest = RunManifest(output_dir, {k: v for k, v in params.items() if k != 'timestamp'}, shard)
+    # 输入摘要覆盖整个数据集，汇总比较时用于核对其他分片完成的记录
+    record_names = {path: os.path.basename(path).split('.')[0] for path in all_files}
+    inputs = {record_names[path]: record_inputs(path) for path in all_files}
+    pending_files, pending_figures = [], []
+    for path in edf_files:
+        file_name = record_names[path]
+        entry = manifest.entry(file_name, 'analysis', inputs[file_name])
+        if entry is None:
+            pending_files.append(path)
+        elif not headless and not manifest.is_done(file_name, 'figures', inputs[file_name]):
+            if os.path.exists(os.path.join(output_dir, entry['output_dir'], 'figure_jobs.pkl')):
+                pending_figures.append(file_name)
+            else:
+                print(f"{file_name} 没有保存的绘图任务 (之前以仅计算模式运行)，重新计算以生成图表")
+                pending_files.append(path)
+    if len(pending_files) < len(edf_files):
+        print(f"续跑 {output_dir}: 跳过 {len(edf_files) - len(pending_files)} 个已完成的记录，"
+              f"待处理 {len(pending_files)} 个")
+    
+    # 运行参数写入结果库，各记录的结果由子进程直接追加
+    store = get_results_store()
+    if store is not None:
+        store.write_run_info(os.path.basename(output_dir), params)
+        print(f"结果将追加到结果库 {RESULTS_STORE_DIR} (运行 {os.path.basename(output_dir)})")
+    
+    # 多个记录并行处理时，记录内部的熵计算使用串行，避免进程数超额
+    n_batch_workers = BATCH_WORKERS if BATCH_WORKERS > 0 else (os.cpu_count() or 1)
+    n_batch_workers = max(1, min(n_batch_workers, len(pending_files)))
+    inner_workers = N_WORKERS if n_batch_workers == 1 else 1
+    
+    # 绘图任务在后台进程中执行；需要显示图表时在主进程中同步绘制
+    renderer = None
+    if not headless:
+        if SHOW_FIGURES or RENDER_WORKERS <= 0:
+            load_visualization()
+        renderer = FigureRenderer(0 if SHOW_FIGURES else RENDER_WORKERS, profile=(profile, profile_memory),
+                                  max_pending=RENDER_MAX_PENDING)
+    
+    # 图表未完成的记录: 从保存的绘图任务重新绘图，不重新计算
+    record_figures = {}  # 记录名 -> 该记录的图表路径
+    for file_name in pending_figures:
+        entry = manifest.entry(file_name, 'analysis', inputs[file_name])
+        try:
+            with open(os.path.join(output_dir, entry['output_dir'], 'figure_jobs.pkl'), 'rb') as f:
+                jobs = pickle.load(f)
+        except (OSError, KeyError, pickle.UnpicklingError, EOFError) as e:
+            print(f"无法读取 {file_name} 的绘图任务 ({e})，跳过其图表")
+            continue
+        renderer.submit_all(jobs)
+        record_figures[file_name] = [kwargs['save_path'] for _, kwargs in jobs]
     
-    # 比较不同文件的结果
+    # 滤波使用的scipy.signal导入需要约1秒；在主进程中导入一次，各记录的子进程通过fork继承，
+    # 而不是每个子进程各导入一次
+    if pending_files:
+        import scipy.signal  # noqa: F401
+    
+    # 加载线程在主进程中记录 'load' 阶段
+    enable_profiling(profile, profile_memory)
+    prefetcher = None
+    if PREFETCH_RECORDS > 0 and pending_files:
+        prefetcher = Prefetcher(load_record, pending_files, depth=PREFETCH_RECORDS)
+    
+    def record_tasks():
+        """按需产生记录任务: 只在有空闲的子进程槽位时才从预取队列中取出下一个已加载的记录"""
+        if prefetcher is None:
+            for edf_file in pending_files:
+                yield (edf_file, output_dir, inner_workers, (profile, profile_memory), headless)
+            return
+        for _, edf_file, loaded, error in prefetcher:
+            if error is not None:
+                print(f"预取文件 {os.path.basename(edf_file)} 失败 ({error})，改为在子进程中加载")
+            yield (edf_file, output_dir, inner_workers, (profile, profile_memory), headless, loaded)
+    
+    # 每个记录在独立子进程中处理，只接收精简结果；结果文件写完后才在清单中标记完成
+    try:
+        for idx, status, summary in run_isolated_batch(analyze_record, record_tasks(),
+                                                       n_workers=n_batch_workers, timeout=RECORD_TIMEOUT):
+            file_name = record_names[pending_files[idx]]
+            if status != 'ok':
+                print(f"处理文件 {file_name} 失败 ({status}): {summary}")
+                manifest.mark(file_name, 'analysis', status, edf=pending_files[idx], inputs=inputs[file_name],
+                              error=str(summary))
+            elif summary is None:
+                manifest.mark(file_name, 'analysis', 'skipped', edf=pending_files[idx], inputs=inputs[file_name])
+            else:
+                add_events(summary.pop('trace_events'))
+                jobs = summary.pop('figure_jobs')
+                file_output_dir = summary.pop('output_dir')
+                if renderer is not None:
+                    write_pickle_atomic(os.path.join(file_output_dir, 'figure_jobs.pkl'), jobs)
+                    renderer.submit_all(jobs)
+                    record_figures[file_name] = [kwargs['save_path'] for _, kwargs in jobs]
+                manifest.mark(file_name, 'analysis', edf=pending_files[idx], inputs=inputs[file_name],
+                              output_dir=os.path.relpath(file_output_dir, output_dir),
+                              outputs=list_outputs(file_output_dir),
+                              labels=summary['labels'], metrics=summary['metrics'])
+    finally:
+        if prefetcher is not None:
+            prefetcher.close()
+    
+    # 比较数据集中所有以当前输入完成的记录的结果 (包括之前的运行和其他分片完成的记录，按文件名排序，
+    # 与完成顺序无关)
+    manifest.reload()
+    all_results = {file_name: {'labels': entry['labels'], 'metrics': entry['metrics']}
+                   for file_name, entry in manifest.completed('analysis', inputs).items()}
     if all_results:
-        compare_results(all_results, output_dir)
+        with profile_stage('compare'):
+            compare_results(all_results, output_dir, headless, renderer)
+    
+    # 等待剩余的绘图任务完成，所有图表都已保存的记录在清单中标记完成
+    if renderer is not None:
+        with profile_stage('render_wait'):
+            failures = renderer.close()
+        print(f"已绘制 {renderer.n_submitted - len(failures)}/{renderer.n_submitted} 张图表")
+        failed_paths = {save_path for _, save_path, _ in failures}
+        for file_name, save_paths in record_figures.items():
+            n_failed = len(failed_paths.intersection(save_paths))
+            if n_failed == 0:
+                manifest.mark(file_name, 'figures', inputs=inputs[file_name],
+                              outputs=[os.path.relpath(path, output_dir) for path in save_paths])
+            else:
+                manifest.mark(file_name, 'figures', 'error', inputs=inputs[file_name],
+                              error=f"{n_failed} 张图表绘制失败")
+    
+    # 导出本次运行的阶段时间线
+    if profile:
+        trace_path = os.path.join(output_dir, "trace.json")
+        export_chrome_trace(trace_path)
+        print_summary()
+        print(f"性能记录已保存到 {trace_path}")
 
-def compare_results(all_results, output_dir):
-    """比较不同文件的结果"""
+def compare_results(all_results, output_dir, headless=HEADLESS, renderer=None):
+    """比较不同文件的结果，renderer不为None时比较图提交给后台渲染器"""
     if not all_results:
         print("没有可比较的结果")
         return
@@ -140,13 +783,91 @@ def compare_results(all_results, output_dir):
     # 比较不同记录的网络指标
     network_metrics_dict = {file_name: results['metrics'] for file_name, results in all_results.items()}
     
+    if headless:
+        summary_path = os.path.join(output_dir, "network_metrics_comparison_summary.json")
+        with open(summary_path, 'w') as f:
+            json.dump(network_metrics_dict, f, indent=2)
+        print(f"网络指标汇总已保存到 {summary_path}")
+        return
+    
     print("生成网络指标比较图...")
-    plot_network_metrics_comparison(
-        network_metrics_dict,
-        title="Network Metrics Comparison",
-        save_path=os.path.join(output_dir, "network_metrics_comparison.png"),
-        show=SHOW_FIGURES
-    )
+    kwargs = {
+        'metrics_dict': network_metrics_dict,
+        'title': "Network Metrics Comparison",
+        'save_path': os.path.join(output_dir, "network_metrics_comparison.png"),
+        'show': SHOW_FIGURES
+    }
+    if renderer is not None:
+        renderer.submit('metrics_comparison', **kwargs)
+    else:
+        load_visualization()
+        render_figure('metrics_comparison', reuse=not SHOW_FIGURES, **kwargs)
+
+def run_streaming(edf_path, realtime=False, n_max_channels=6):
+    """
+    流式分析: 把EDF文件按块回放给流式分析器，每个输出时刻打印网络指标，结束后保存结果序列
+    
+    参数:
+    edf_path (str): EDF文件路径
+    realtime (bool): 是否按采样率节奏回放 (模拟实时设备)
+    n_max_channels (int): 最多使用的通道数
+    
+    返回:
+    dict: 'end' 各输出时刻的窗口结束位置, 'mse' 形状为 [n_updates, n_channels, max_scale] 的多尺度熵,
+          'metrics' 指标名称到形状 [n_updates] 数组的字典
+    """
+    header = read_edf_header(edf_path)
+    channels = slice(0, n_max_channels)
+    # 读取0个样本，只取得所选通道的标签和采样率
+    _, labels, sfreq = read_edf_data(edf_path, channels, 0, 0, header=header)
+    sfreq = sfreq or SAMPLING_RATE
+    analyzer = StreamingAnalyzer(len(labels), sfreq, int(round(STREAM_WINDOW * sfreq)),
+                                 int(round(STREAM_HOP * sfreq)), STREAM_MAX_SCALE, SAMPEN_M, SAMPEN_R_RATIO,
+                                 MSE_FIXED_R, SIMILARITY_MEASURE, SIMILARITY_THRESHOLD, LOW_FREQ, HIGH_FREQ,
+                                 FILTER_ORDER, dtype=resolve_dtype(COMPUTE_DTYPE),
+                                 warmup=int(round(STREAM_WARMUP * sfreq)), r_tolerance=STREAM_R_TOLERANCE)
+    print(f"流式分析 {os.path.basename(edf_path)}: 通道 {labels}, 窗口 {STREAM_WINDOW} s, 步长 {STREAM_HOP} s")
+    
+    updates = []
+    for chunk in iter_edf_chunks(edf_path, max(1, int(round(STREAM_CHUNK * sfreq))), channels,
+                                 dtype=resolve_dtype(COMPUTE_DTYPE), realtime=realtime):
+        for update in analyzer.push(chunk):
+            metrics = update['metrics']
+            print(f"t={update['time']:.2f} s  样本熵(尺度1)均值={np.nanmean(update['mse'][:, 0]):.3f}  "
+                  f"密度={metrics['density']:.3f}  平均聚类系数={metrics['avg_clustering']:.3f}")
+            updates.append(update)
+    
+    result = {
+        'end': np.array([u['end'] for u in updates], dtype=np.int64),
+        'mse': np.array([u['mse'] for u in updates]).reshape(len(updates), len(labels), STREAM_MAX_SCALE),
+        'metrics': {name: np.array([u['metrics'][name] for u in updates]) for name in METRIC_NAMES},
+    }
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    file_name = os.path.basename(edf_path).split('.')[0]
+    output_path = os.path.join(OUTPUT_DIR, f"stream_{file_name}.npz")
+    np.savez(output_path, labels=np.array(labels), end=result['end'], mse=result['mse'], **result['metrics'])
+    print(f"流式分析结果已保存到 {output_path}")
+    return result
 
 if __name__ == "__main__":
-    run_batch_analysis()
+    import argparse
+    parser = argparse.ArgumentParser(description="生理信号多尺度熵与网络分析")
+    parser.add_argument('--profile', action='store_true', default=PROFILE_ENABLED,
+                        help="记录各阶段的运行时间与内存，并导出 trace.json")
+    parser.add_argument('--no-profile-memory', dest='profile_memory', action='store_false',
+                        default=PROFILE_MEMORY, help="性能记录时不记录内存 (降低开销)")
+    parser.add_argument('--headless', action='store_true', default=HEADLESS,
+                        help="仅计算模式: 不导入matplotlib，不生成图表，只保存数值结果")
+    parser.add_argument('--stream', metavar='EDF',
+                        help="流式分析: 按块回放指定的EDF文件，每个步长输出一次多尺度熵和网络指标")
+    parser.add_argument('--realtime', action='store_true', help="流式分析时按采样率节奏回放")
+    parser.add_argument('--resume', nargs='?', const='latest', metavar='DIR',
+                        help="续跑指定的运行目录 (不指定时为最近一次运行)，跳过清单中已完成的记录和阶段")
+    parser.add_argument('--shard', type=parse_shard, metavar='i/n',
+                        help="只处理第 i 个分片的记录 (0 <= i < n)，多个进程或机器配合 --resume DIR 分担同一数据集")
+    args = parser.parse_args()
+    if args.stream:
+        run_streaming(args.stream, realtime=args.realtime)
+    else:
+        run_batch_analysis(profile=args.profile, profile_memory=args.profile_memory, headless=args.headless,
+                           resume=args.resume, shard=args.shard)
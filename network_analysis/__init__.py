@@ -1,4 +1,9 @@
-from .construct_graph import construct_similarity_graph
-from .network_metrics import extract_network_metrics
+from .construct_graph import construct_similarity_graph, threshold_similarity_matrix
+from .network_metrics import extract_network_metrics, compute_network_metrics
+from .similarity import compute_similarity_matrix
+from .dynamic import dynamic_network_analysis, sliding_correlation_matrices, correlation_from_sums
+from .threshold_sweep import threshold_sweep, SWEEP_METRIC_NAMES
 
-__all__ = ['construct_similarity_graph', 'extract_network_metrics']
+__all__ = ['construct_similarity_graph', 'threshold_similarity_matrix', 'extract_network_metrics',
+           'compute_network_metrics', 'compute_similarity_matrix', 'dynamic_network_analysis',
+           'sliding_correlation_matrices', 'correlation_from_sums', 'threshold_sweep', 'SWEEP_METRIC_NAMES']
@@ -1,5 +1,24 @@
 import numpy as np
-import networkx as nx
+from .similarity import compute_similarity_matrix
+
+def threshold_similarity_matrix(similarity, threshold=0.0):
+    """
+    对相似度矩阵做阈值化，得到加权邻接矩阵
+    
+    参数:
+    similarity (np.array): 形状为 [n_channels, n_channels] 或 [n_graphs, n_channels, n_channels]
+                           的对称相似度矩阵
+    threshold (float): 相似度阈值，不大于此值或为NaN的边将被过滤
+    
+    返回:
+    np.array: 加权邻接矩阵，被过滤的边和对角线为0
+    """
+    with np.errstate(invalid='ignore'):
+        keep = similarity > threshold
+    adjacency = np.where(keep, similarity, 0.0)
+    diag = np.arange(adjacency.shape[-1])
+    adjacency[..., diag, diag] = 0.0
+    return adjacency
 
 def construct_similarity_graph(signals, similarity_measure='correlation', threshold=0.0):
     """
@@ -7,32 +26,23 @@ def construct_similarity_graph(signals, similarity_measure='correlation', thresh
     
     参数:
     signals (np.array): 形状为 [n_channels, n_timepoints] 的信号数据
-    similarity_measure (str): 相似度度量方式，可选 'correlation', 'mutual_info', 'phase_sync'
+    similarity_measure (str): 相似度度量方式，可选 'correlation', 'mutual_info', 'phase_sync', 'cross_sampen'
     threshold (float): 相似度阈值，低于此值的边将被过滤
     
     返回:
     networkx.Graph: 构建的网络图
     """
+    import networkx as nx  # 只在需要networkx图对象时导入
+    
     n_channels = signals.shape[0]
     G = nx.Graph()
     
     # 添加节点
-    for i in range(n_channels):
-        G.add_node(i)
-    
-    # 计算相似度并添加边
-    for i in range(n_channels):
-        for j in range(i+1, n_channels):
-            if similarity_measure == 'correlation':
-                # 使用相关系数作为相似度指标
-                corr = np.abs(np.corrcoef(signals[i], signals[j])[0, 1])
-                if not np.isnan(corr) and corr > threshold:
-                    G.add_edge(i, j, weight=corr)
-            # 可以添加其他相似度度量方式
-            # elif similarity_measure == 'mutual_info':
-            #     # 使用互信息作为相似度指标
-            #     mi = compute_mutual_info(signals[i], signals[j])
-            #     if not np.isnan(mi) and mi > threshold:
-            #         G.add_edge(i, j, weight=mi)
+    G.add_nodes_from(range(n_channels))
+    
+    # 一次计算全部通道对的相似度，在矩阵上阈值化后批量添加边
+    adjacency = threshold_similarity_matrix(compute_similarity_matrix(signals, similarity_measure), threshold)
+    rows, cols = np.nonzero(np.triu(adjacency, k=1))
+    G.add_weighted_edges_from(zip(rows.tolist(), cols.tolist(), adjacency[rows, cols].tolist()))
     
     return G
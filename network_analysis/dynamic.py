@@ -0,0 +1,100 @@
+import numpy as np
+from utils.dtypes import as_float_array
+from .similarity import compute_similarity_matrix
+from .construct_graph import threshold_similarity_matrix
+from .network_metrics import compute_network_metrics
+
+def correlation_from_sums(sum_x, sum_xx, n_samples):
+    """
+    由一阶和与交叉乘积和计算相关系数绝对值矩阵
+    
+    参数:
+    sum_x (np.array): 形状为 [n_channels] 的样本和
+    sum_xx (np.array): 形状为 [n_channels, n_channels] 的交叉乘积和
+    n_samples (int): 样本数
+    
+    返回:
+    np.array: 相关系数绝对值矩阵，对角线为0
+    """
+    mean = sum_x / n_samples
+    cov = sum_xx / n_samples - np.outer(mean, mean)
+    std = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = np.clip(np.abs(cov / np.outer(std, std)), 0.0, 1.0)
+    np.fill_diagonal(corr, 0.0)
+    return corr
+
+def sliding_correlation_matrices(signals, window, stride, refresh_every=64):
+    """
+    计算滑动窗口上的相关系数矩阵序列
+    
+    窗口每次前移stride个样本时，只从滚动的一阶和与交叉乘积和中减去移出的样本、
+    加上移入的样本，每步开销为 O(C^2 * stride) 而不是 O(C^2 * window)。
+    每隔 refresh_every 个窗口从头重算一次滚动和，以抑制浮点误差累积。
+    
+    参数:
+    signals (np.array): 形状为 [n_channels, n_timepoints] 的信号数据
+    window (int): 窗口长度(样本点)
+    stride (int): 窗口步长(样本点)
+    refresh_every (int): 重新计算滚动和的窗口间隔
+    
+    返回:
+    np.array: 形状为 [n_windows, n_channels, n_channels] 的相关系数绝对值矩阵，对角线为0
+    """
+    # 减去全局均值以减小滚动和中的抵消误差；滚动和在窗口之间累积误差，因此即使输入为float32也在float64中计算
+    x = np.asarray(signals, dtype=np.float64)
+    x = x - x.mean(axis=1, keepdims=True)
+    n_channels, n = x.shape
+    n_windows = (n - window) // stride + 1 if n >= window else 0
+    
+    matrices = np.empty((n_windows, n_channels, n_channels))
+    incremental = stride < window
+    for k in range(n_windows):
+        start = k * stride
+        if not incremental or k % refresh_every == 0:
+            segment = x[:, start:start + window]
+            sum_x = segment.sum(axis=1)
+            sum_xx = segment @ segment.T
+        else:
+            leaving = x[:, start - stride:start]
+            entering = x[:, start + window - stride:start + window]
+            sum_x += entering.sum(axis=1) - leaving.sum(axis=1)
+            sum_xx += entering @ entering.T - leaving @ leaving.T
+        matrices[k] = correlation_from_sums(sum_x, sum_xx, window)
+    
+    return matrices
+
+def dynamic_network_analysis(signals, window, stride, similarity_measure='correlation', threshold=0.0):
+    """
+    滑动窗口动态网络分析
+    
+    相关系数使用增量滚动更新；其他相似度度量在每个窗口上调用 compute_similarity_matrix。
+    所有窗口的网络阈值化后堆叠，一次性计算网络指标。
+    
+    参数:
+    signals (np.array): 形状为 [n_channels, n_timepoints] 的信号数据
+    window (int): 窗口长度(样本点)
+    stride (int): 窗口步长(样本点)
+    similarity_measure (str): 相似度度量方式
+    threshold (float): 相似度阈值
+    
+    返回:
+    dict: 'starts' 为每个窗口的起始样本，'similarity' 为形状 [n_windows, C, C] 的相似度矩阵，
+          'metrics' 为指标名称到形状 [n_windows] 数组的字典
+    """
+    signals = as_float_array(signals)
+    if similarity_measure == 'correlation':
+        similarity = sliding_correlation_matrices(signals, window, stride)
+    else:
+        n_windows = (signals.shape[1] - window) // stride + 1 if signals.shape[1] >= window else 0
+        similarity = np.array([
+            compute_similarity_matrix(signals[:, k * stride:k * stride + window], similarity_measure)
+            for k in range(n_windows)
+        ]).reshape(n_windows, signals.shape[0], signals.shape[0])
+    
+    adjacency = threshold_similarity_matrix(similarity, threshold)
+    return {
+        'starts': np.arange(len(similarity)) * stride,
+        'similarity': similarity,
+        'metrics': compute_network_metrics(adjacency)
+    }
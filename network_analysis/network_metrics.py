@@ -1,46 +1,121 @@
 import numpy as np
-import networkx as nx
 
-def extract_network_metrics(G):
+METRIC_NAMES = ['density', 'avg_degree_centrality', 'assortativity',
+                'avg_clustering', 'global_efficiency', 'avg_strength']
+
+def _as_adjacency(G):
+    """将networkx图或邻接矩阵统一转换为浮点邻接矩阵"""
+    if hasattr(G, 'nodes'):
+        import networkx as nx
+        return nx.to_numpy_array(G, nodelist=sorted(G.nodes()), weight='weight')
+    return np.asarray(G, dtype=np.float64)
+
+def _weighted_assortativity(weights, degree_values):
     """
-    提取网络的拓扑特性指标
+    加权度同配性 (与 nx.degree_assortativity_coefficient(G, weight='weight') 一致)
+    
+    对每条边的两个方向，以两端节点的强度 (加权度) 计算皮尔逊相关系数。
+    """
+    edge_mask = weights != 0
+    n_directed = edge_mask.sum(axis=(1, 2))
+    # 每条有向边起点强度的一阶、二阶矩以及两端强度乘积的均值
+    out_edges = edge_mask.sum(axis=2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_x = (out_edges * degree_values).sum(axis=1) / n_directed
+        mean_x2 = (out_edges * degree_values ** 2).sum(axis=1) / n_directed
+        mean_xy = np.einsum('gi,gij,gj->g', degree_values, edge_mask, degree_values) / n_directed
+        variance = mean_x2 - mean_x ** 2
+        r = (mean_xy - mean_x ** 2) / variance
+    # 强度全部相同时相关系数无定义
+    r[~(variance > 1e-12 * np.maximum(mean_x2, 1e-300))] = np.nan
+    return r
+
+def _global_efficiency(edge_mask):
+    """
+    无权全局效率: 所有节点对最短路径长度倒数的平均值
+    
+    以布尔矩阵乘法逐层扩展可达集合 (批量BFS)，所有图同时推进。
+    """
+    n_graphs, n_nodes, _ = edge_mask.shape
+    adjacency = edge_mask.astype(np.float64)
+    reached = np.broadcast_to(np.eye(n_nodes, dtype=bool), edge_mask.shape).copy()
+    frontier = reached.astype(np.float64)
+    inverse_distance_sum = np.zeros(n_graphs)
+    
+    for distance in range(1, n_nodes):
+        frontier = (frontier @ adjacency > 0) & ~reached
+        if not frontier.any():
+            break
+        inverse_distance_sum += frontier.sum(axis=(1, 2)) / distance
+        reached |= frontier
+        frontier = frontier.astype(np.float64)
+    
+    return inverse_distance_sum / (n_nodes * (n_nodes - 1))
+
+def compute_network_metrics(adjacency):
+    """
+    基于邻接矩阵批量计算网络拓扑指标
     
     参数:
-    G (networkx.Graph): 网络图
+    adjacency (np.array): 形状为 [n_nodes, n_nodes] 或 [n_graphs, n_nodes, n_nodes] 的
+                          对称加权邻接矩阵，0表示无边
     
     返回:
-    dict: 包含各种网络指标的字典
+    dict: 指标名称到指标值的字典；输入为单个矩阵时值为float，
+          输入为堆叠矩阵时值为形状 [n_graphs] 的数组。
+          无边或节点数不超过1的图所有指标均为NaN
     """
-    metrics = {}
+    weights = np.asarray(adjacency, dtype=np.float64)
+    single = weights.ndim == 2
+    if single:
+        weights = weights[np.newaxis]
+    weights = weights.copy()
+    weights[:, np.arange(weights.shape[1]), np.arange(weights.shape[1])] = 0.0
     
-    # 如果网络为空或只有一个节点，返回NaN指标
-    if G.number_of_nodes() <= 1 or G.number_of_edges() == 0:
-        metrics['density'] = np.nan
-        metrics['avg_degree_centrality'] = np.nan
-        metrics['assortativity'] = np.nan
-        return metrics
-    
-    # 检查图是否连通
-    if not nx.is_connected(G):
-        # 如果不连通，使用最大连通子图
-        largest_cc = max(nx.connected_components(G), key=len)
-        connected_G = G.subgraph(largest_cc).copy()
-        print(f"警告: 图不连通，使用最大连通子图进行指标计算 ({len(largest_cc)}/{G.number_of_nodes()}个节点)")
-    else:
-        connected_G = G
+    n_graphs, n_nodes, _ = weights.shape
+    edge_mask = weights != 0
+    degree = edge_mask.sum(axis=2)
+    strength = weights.sum(axis=2)
+    n_edges = degree.sum(axis=1) / 2
     
-    # 计算基本网络指标
-    metrics['density'] = nx.density(G)
-    
-    # 计算每个节点的度中心性
-    degree_centrality = nx.degree_centrality(G)
-    metrics['avg_degree_centrality'] = np.mean(list(degree_centrality.values()))
+    metrics = {}
+    if n_nodes > 1:
+        metrics['density'] = n_edges / (n_nodes * (n_nodes - 1) / 2)
+        metrics['avg_degree_centrality'] = degree.mean(axis=1) / (n_nodes - 1)
+        metrics['assortativity'] = _weighted_assortativity(weights, strength)
+        
+        # 加权聚类系数 (与 nx.clustering(G, weight='weight') 一致): 以每个图的最大权重归一化后
+        # 取三角形边权几何平均
+        max_weight = np.abs(weights).max(axis=(1, 2), keepdims=True)
+        max_weight[max_weight == 0] = 1.0
+        cube_root = np.cbrt(weights / max_weight)
+        triangles = np.einsum('gij,gjk,gki->gi', cube_root, cube_root, cube_root)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            clustering = np.where(degree > 1, triangles / (degree * (degree - 1)), 0.0)
+        metrics['avg_clustering'] = clustering.mean(axis=1)
+        
+        metrics['global_efficiency'] = _global_efficiency(edge_mask)
+        metrics['avg_strength'] = strength.mean(axis=1)
+    else:
+        metrics = {name: np.zeros(n_graphs) for name in METRIC_NAMES}
     
-    # 计算同配性 (度相关)
-    try:
-        metrics['assortativity'] = nx.degree_assortativity_coefficient(G, weight='weight')
-    except:
-        metrics['assortativity'] = np.nan
+    # 如果网络为空或只有一个节点，返回NaN指标
+    empty = (n_edges == 0) | (n_nodes <= 1)
+    for name in METRIC_NAMES:
+        metrics[name] = np.where(empty, np.nan, metrics[name])
     
+    if single:
+        return {name: float(values[0]) for name, values in metrics.items()}
     return metrics
 
+def extract_network_metrics(G):
+    """
+    提取网络的拓扑特性指标
+    
+    参数:
+    G (np.array | networkx.Graph): 加权邻接矩阵或网络图
+    
+    返回:
+    dict: 包含各种网络指标的字典
+    """
+    return compute_network_metrics(_as_adjacency(G))
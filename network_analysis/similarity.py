@@ -0,0 +1,131 @@
+import numpy as np
+from utils.dtypes import as_float_array
+from entropy.multivariate import cross_sampen_similarity
+
+def correlation_matrix(signals):
+    """
+    计算所有通道对的皮尔逊相关系数绝对值
+    
+    对每个通道去均值后用一次矩阵乘法得到协方差 (Gram) 矩阵，再以其对角线归一化。
+    计算精度与输入相同；float32输入时以同一Gram矩阵的对角线归一化，舍入误差大部分相互抵消。
+    
+    参数:
+    signals (np.array): 形状为 [n_channels, n_timepoints] 或 [n_batch, n_channels, n_timepoints] 的信号数据
+    
+    返回:
+    np.array: 形状为 [n_channels, n_channels] (或 [n_batch, n_channels, n_channels]) 的相似度矩阵，
+              常数通道对应的行列为NaN
+    """
+    signals = as_float_array(signals)
+    centered = signals - signals.mean(axis=-1, keepdims=True)
+    gram = (centered @ centered.swapaxes(-1, -2)).astype(np.float64)
+    norms = np.sqrt(np.diagonal(gram, axis1=-2, axis2=-1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        similarity = np.abs(gram / (norms[..., :, np.newaxis] * norms[..., np.newaxis, :]))
+    return np.clip(similarity, 0.0, 1.0)
+
+def phase_locking_matrix(signals):
+    """
+    计算所有通道对的锁相值 (Phase Locking Value, PLV)
+    
+    对全部通道做一次批量希尔伯特变换得到瞬时相位，再用单位相量矩阵的
+    一次复数矩阵乘法得到所有通道对的PLV。
+    
+    参数:
+    signals (np.array): 形状为 [n_channels, n_timepoints] 或 [n_batch, n_channels, n_timepoints] 的信号数据
+    
+    返回:
+    np.array: 形状为 [n_channels, n_channels] (或 [n_batch, n_channels, n_channels]) 的PLV矩阵，
+              取值范围 [0, 1]
+    """
+    from scipy.signal import hilbert  # 延迟导入以加快启动
+    
+    signals = as_float_array(signals)
+    analytic = hilbert(signals - signals.mean(axis=-1, keepdims=True), axis=-1)
+    phasors = np.exp(1j * np.angle(analytic))
+    return (np.abs(phasors @ phasors.conj().swapaxes(-1, -2)) / signals.shape[-1]).astype(np.float64)
+
+def mutual_info_matrix(signals, n_bins=16, chunk_size=65536):
+    """
+    计算所有通道对的归一化互信息 (基于等宽直方图)
+    
+    每个通道先离散化为 n_bins 个区间，所有通道对的联合直方图由独热编码矩阵
+    的乘积一次得到；样本按 chunk_size 分块累加以限制内存。互信息按
+    MI / sqrt(H_i * H_j) 归一化到 [0, 1]，以便与相关系数使用同一阈值尺度。
+    
+    参数:
+    signals (np.array): 形状为 [n_channels, n_timepoints] 的信号数据
+    n_bins (int): 每个通道的直方图区间数
+    chunk_size (int): 每次累加联合直方图的样本数
+    
+    返回:
+    np.array: 形状为 [n_channels, n_channels] 的归一化互信息矩阵
+    """
+    signals = as_float_array(signals)
+    n_channels, n = signals.shape
+    
+    # 每个通道按自身取值范围等宽离散化
+    lo = signals.min(axis=1, keepdims=True)
+    span = signals.max(axis=1, keepdims=True) - lo
+    span[span == 0] = 1.0
+    codes = np.minimum(((signals - lo) / span * n_bins).astype(np.intp), n_bins - 1)
+    codes += (np.arange(n_channels) * n_bins)[:, np.newaxis]
+    
+    # 联合计数矩阵 [C*k, C*k]，块 (i, j) 为通道i和j的联合直方图
+    joint = np.zeros((n_channels * n_bins, n_channels * n_bins))
+    for start in range(0, n, chunk_size):
+        block = codes[:, start:start + chunk_size]
+        # 每块的计数不超过chunk_size，float32可精确表示
+        one_hot = np.zeros((n_channels * n_bins, block.shape[1]), dtype=np.float32)
+        one_hot[block, np.arange(block.shape[1])] = 1.0
+        joint += one_hot @ one_hot.T
+    
+    p_joint = (joint / n).reshape(n_channels, n_bins, n_channels, n_bins).transpose(0, 2, 1, 3)
+    p_marginal = np.bincount(codes.ravel(), minlength=n_channels * n_bins).reshape(n_channels, n_bins) / n
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        outer = p_marginal[:, np.newaxis, :, np.newaxis] * p_marginal[np.newaxis, :, np.newaxis, :]
+        terms = np.where(p_joint > 0, p_joint * np.log(p_joint / outer), 0.0)
+        mi = terms.sum(axis=(2, 3))
+        entropy = -np.where(p_marginal > 0, p_marginal * np.log(p_marginal), 0.0).sum(axis=1)
+        normalized = mi / np.sqrt(np.outer(entropy, entropy))
+    return np.clip(normalized, 0.0, 1.0)
+
+SIMILARITY_FUNCTIONS = {
+    'correlation': correlation_matrix,
+    'phase_sync': phase_locking_matrix,
+    'mutual_info': mutual_info_matrix,
+    'cross_sampen': cross_sampen_similarity,
+}
+
+# 可以直接处理 [n_batch, n_channels, n_timepoints] 输入的度量
+BATCHED_MEASURES = ('correlation', 'phase_sync')
+
+def compute_similarity_matrix(signals, similarity_measure='correlation'):
+    """
+    计算所有通道对的相似度矩阵
+    
+    输入为一组信号的堆叠时，相关系数和锁相值对整批信号一次计算 (批量矩阵乘法)，互信息和交叉样本熵
+    逐个计算。交叉样本熵 ('cross_sampen') 的相似度为 exp(-交叉样本熵)，所有通道对在一个共享模板索引上
+    一次统计 (见 entropy.multivariate)。
+    
+    参数:
+    signals (np.array): 形状为 [n_channels, n_timepoints] 或 [n_batch, n_channels, n_timepoints] 的信号数据
+    similarity_measure (str): 相似度度量方式，可选 'correlation', 'mutual_info', 'phase_sync', 'cross_sampen'
+    
+    返回:
+    np.array: 形状为 [n_channels, n_channels] (或 [n_batch, n_channels, n_channels]) 的对称相似度矩阵，
+              对角线为0
+    """
+    if similarity_measure not in SIMILARITY_FUNCTIONS:
+        raise ValueError(f"不支持的相似度度量方式: {similarity_measure}，"
+                         f"可选: {list(SIMILARITY_FUNCTIONS)}")
+    if np.ndim(signals) == 3 and similarity_measure in BATCHED_MEASURES:
+        similarity = SIMILARITY_FUNCTIONS[similarity_measure](signals)
+    elif np.ndim(signals) == 3:
+        similarity = np.stack([SIMILARITY_FUNCTIONS[similarity_measure](batch) for batch in signals])
+    else:
+        similarity = SIMILARITY_FUNCTIONS[similarity_measure](signals)
+    diag = np.arange(similarity.shape[-1])
+    similarity[..., diag, diag] = 0.0
+    return similarity
@@ -0,0 +1,13 @@
+from .batch import run_isolated_batch
+from .cache import ResultCache, file_digest, make_cache_key
+from .results_store import ResultsStore
+from .render import FigureRenderer, render_figure
+from .streaming import StreamingAnalyzer
+from .prefetch import Prefetcher
+from .significance import surrogate_test, prune_edges
+from .hrv import hrv_analysis, beat_series
+from .manifest import RunManifest, parse_shard, in_shard
+
+__all__ = ['run_isolated_batch', 'ResultCache', 'file_digest', 'make_cache_key', 'ResultsStore',
+           'FigureRenderer', 'render_figure', 'StreamingAnalyzer', 'Prefetcher', 'surrogate_test',
+           'prune_edges', 'hrv_analysis', 'beat_series', 'RunManifest', 'parse_shard', 'in_shard']
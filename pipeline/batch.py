@@ -0,0 +1,94 @@
+"""
+故障隔离的并行批处理执行器
+
+每个任务 (通常是一个记录) 在独立的子进程中运行，结束后进程退出并释放全部内存。
+子进程只把精简的结果通过管道传回父进程；某个任务崩溃、抛出异常或超时
+只会影响该任务本身，不会中断整个批处理。
+"""
+import os
+import time
+import multiprocessing as mp
+from multiprocessing.connection import wait
+
+def _run_task(func, args, conn):
+    """子进程入口: 执行任务并通过管道返回 (状态, 结果)"""
+    try:
+        result = func(*args)
+        conn.send(('ok', result))
+    except BaseException as e:
+        conn.send(('error', f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+def run_isolated_batch(func, task_args, n_workers=None, timeout=None, poll_interval=0.5):
+    """
+    在多个独立子进程中并行执行任务，按完成顺序逐个返回结果
+    
+    参数:
+    func (callable): 任务函数，必须可被子进程导入 (模块顶层函数)
+    task_args (iterable): 每个任务的参数元组，可以是生成器: 只在有空闲进程槽位时才取下一个任务，
+                          因此上游 (例如后台预取) 可以按需产生任务
+    n_workers (int): 同时运行的子进程数，None或<=0表示使用全部CPU核心
+    timeout (float): 单个任务的超时时间(秒)，None表示不限制
+    poll_interval (float): 检查子进程状态的时间间隔(秒)
+    
+    返回:
+    generator: 逐个产生 (任务序号, 状态, 结果)，状态为 'ok'、'error'、'crashed' 或 'timeout'，
+               状态不是 'ok' 时结果为错误描述字符串
+    """
+    if n_workers is None or n_workers <= 0:
+        n_workers = os.cpu_count() or 1
+    
+    pending = enumerate(task_args)
+    exhausted = False
+    running = {}  # 任务序号 -> (进程, 接收端, 开始时间)
+    
+    while not exhausted or running:
+        # 填满空闲的进程槽位
+        while not exhausted and len(running) < n_workers:
+            try:
+                idx, args = next(pending)
+            except StopIteration:
+                exhausted = True
+                break
+            recv_conn, send_conn = mp.Pipe(duplex=False)
+            process = mp.Process(target=_run_task, args=(func, tuple(args), send_conn))
+            process.start()
+            send_conn.close()
+            running[idx] = (process, recv_conn, time.monotonic())
+    
+        if not running:
+            continue
+        
+        # 等待任一任务返回结果或进程退出
+        waitables = [conn for _, conn, _ in running.values()]
+        waitables += [process.sentinel for process, _, _ in running.values()]
+        wait(waitables, timeout=poll_interval)
+    
+        for idx, (process, conn, start_time) in list(running.items()):
+            status, payload = None, None
+            if conn.poll():
+                try:
+                    status, payload = conn.recv()
+                except EOFError:
+                    pass
+            if status is None:
+                if not process.is_alive():
+                    # 子进程可能在上面的 poll 之后才发送结果并退出: 退出后再读一次管道中剩余的结果
+                    if conn.poll():
+                        try:
+                            status, payload = conn.recv()
+                        except EOFError:
+                            pass
+                    if status is None:
+                        status, payload = 'crashed', f"子进程异常退出 (exit code {process.exitcode})"
+                elif timeout is not None and time.monotonic() - start_time > timeout:
+                    process.kill()
+                    status, payload = 'timeout', f"超过 {timeout} 秒未完成"
+                else:
+                    continue
+    
+            process.join()
+            conn.close()
+            del running[idx]
+            yield idx, status, payload
@@ -0,0 +1,148 @@
+"""
+基于内容寻址的磁盘结果缓存
+
+缓存键由输入文件的SHA256摘要和相关配置参数共同决定，每个阶段
+(预处理、熵、网络) 使用各自的键，因此只修改网络参数时熵结果仍可复用。
+缓存文件为 .npz 格式，总大小超过上限时按最近使用时间淘汰。
+"""
+import os
+import json
+import hashlib
+import numpy as np
+
+_CHECKSUM_FILE = 'SHA256SUMS.txt'
+
+# (路径, 大小, 修改时间) -> 摘要，避免同一进程内重复计算
+_digest_memo = {}
+
+def _listed_checksum(file_path):
+    """从文件所在目录的 SHA256SUMS.txt 中查找已记录的摘要"""
+    sums_path = os.path.join(os.path.dirname(os.path.abspath(file_path)), _CHECKSUM_FILE)
+    if not os.path.exists(sums_path):
+        return None
+    name = os.path.basename(file_path)
+    with open(sums_path) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 2 and parts[1].lstrip('*') == name:
+                return parts[0].lower()
+    return None
+
+def file_digest(file_path, chunk_size=1 << 20):
+    """
+    计算文件内容的SHA256摘要
+    
+    若文件所在目录的 SHA256SUMS.txt 中已列出该文件，则直接使用其中的摘要。
+    
+    参数:
+    file_path (str): 文件路径
+    chunk_size (int): 分块读取的字节数
+    
+    返回:
+    str: 十六进制摘要
+    """
+    stat = os.stat(file_path)
+    memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    if memo_key in _digest_memo:
+        return _digest_memo[memo_key]
+    
+    digest = _listed_checksum(file_path)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                h.update(chunk)
+        digest = h.hexdigest()
+    
+    _digest_memo[memo_key] = digest
+    return digest
+
+def make_cache_key(*parts):
+    """
+    由任意可JSON序列化的参数生成缓存键
+    
+    参数:
+    *parts: 文件摘要、上一阶段的键以及该阶段相关的配置参数
+    
+    返回:
+    str: 十六进制缓存键
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class ResultCache:
+    """
+    按阶段组织的磁盘缓存
+    
+    参数:
+    cache_dir (str): 缓存目录
+    max_bytes (int): 缓存总大小上限(字节)，None表示不限制
+    """
+    
+    def __init__(self, cache_dir, max_bytes=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def _path(self, stage, key):
+        return os.path.join(self.cache_dir, f"{stage}_{key}.npz")
+    
+    def load(self, stage, key):
+        """
+        读取缓存项
+        
+        返回:
+        tuple: (数组字典, 元数据字典)，未命中时返回 None
+        """
+        path = self._path(stage, key)
+        try:
+            with np.load(path, allow_pickle=False) as f:
+                arrays = {name: f[name] for name in f.files if name != '__meta__'}
+                meta = json.loads(str(f['__meta__'])) if '__meta__' in f.files else {}
+        except (OSError, ValueError, KeyError):
+            return None
+        # 更新修改时间作为最近使用时间
+        os.utime(path)
+        return arrays, meta
+    
+    def save(self, stage, key, arrays, meta=None):
+        """
+        写入缓存项，先写临时文件再原子替换，之后按需淘汰旧缓存
+        
+        参数:
+        stage (str): 阶段名称
+        key (str): 缓存键
+        arrays (dict): 名称到数组的字典
+        meta (dict): 可JSON序列化的元数据
+        """
+        path = self._path(stage, key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, __meta__=np.array(json.dumps(meta or {})), **arrays)
+        os.replace(tmp_path, path)
+        self.evict()
+    
+    def evict(self):
+        """缓存总大小超过上限时，按最近使用时间从旧到新删除缓存项"""
+        if self.max_bytes is None:
+            return
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.npz'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
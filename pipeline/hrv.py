@@ -0,0 +1,100 @@
+"""
+心率变异性 (HRV) 与心搏同步分析
+
+由QRS注释得到的R峰位置把记录变为心搏级的序列: RR间期序列，以及每个通道每个心搏的特征
+(峰峰值或均方根)。这些序列对齐到同一组心搏后作为一组 "通道"，与原始信号的分析相同地计算
+多尺度样本熵和相似度网络: RR间期的多尺度熵即HRV的复杂度，网络反映各通道的逐搏幅度变化
+与心率变化之间的耦合。
+
+心搏序列的长度约为心搏数 (5分钟记录约几百个)，远短于原始信号，因此可以对每个记录的
+整段数据计算。
+"""
+import numpy as np
+
+from entropy.mse import compute_mse_batch
+from network_analysis.similarity import compute_similarity_matrix
+from network_analysis.construct_graph import threshold_similarity_matrix
+from network_analysis.network_metrics import extract_network_metrics
+from utils.beats import rr_intervals, beat_segments, beat_features
+from utils.dtypes import as_float_array
+
+BEAT_FEATURES = ['amplitude', 'rms']
+
+def beat_series(signals, peaks, sfreq, window=(0.05, 0.05), rr_range=(None, None), feature='amplitude'):
+    """
+    对齐到同一组心搏的RR间期和逐搏特征序列
+
+    第k个心搏的RR间期为第k-1个到第k个R峰的间隔；RR间期超出 rr_range 或心搏窗口超出记录范围的
+    心搏被排除，其余心搏依次拼接。
+
+    参数:
+    signals (np.array): 形状为 [n_channels, n_timepoints] 的预处理后信号
+    peaks (np.array): R峰样本位置
+    sfreq (float): 采样率
+    window (tuple): 心搏窗口在R峰之前和之后的时长(秒)
+    rr_range (tuple): 有效RR间期的 (下限, 上限)(秒)，None表示不限制
+    feature (str): 逐搏特征，可选 'amplitude', 'rms'
+
+    返回:
+    tuple: (形状为 [1 + n_channels, n_beats] 的序列，第0行为RR间期(秒)、其余为各通道的逐搏特征,
+            长度为 len(peaks) 的布尔数组，标记被使用的心搏)
+    """
+    if feature not in BEAT_FEATURES:
+        raise ValueError(f"不支持的逐搏特征: {feature}，可选: {BEAT_FEATURES}")
+    signals = np.atleast_2d(as_float_array(signals))
+    peaks = np.asarray(peaks, dtype=np.int64)
+    if len(peaks) == 0:
+        return np.empty((1 + len(signals), 0)), np.zeros(0, dtype=bool)
+    before, after = int(round(window[0] * sfreq)), int(round(window[1] * sfreq))
+
+    segments, in_range = beat_segments(signals, peaks, before, after)
+    values = beat_features(segments)[feature]
+    rr, rr_valid = rr_intervals(peaks, sfreq, *rr_range)
+
+    used = in_range.copy()
+    used[0] = False
+    used[1:] &= rr_valid
+    series = np.empty((1 + len(signals), int(used.sum())))
+    series[0] = rr[used[1:]]
+    # values 只包含窗口在记录范围内的心搏
+    series[1:] = values[:, used[in_range]]
+    return series, used
+
+def hrv_analysis(signals, labels, peaks, sfreq, max_scale=10, m=2, r_ratio=0.2, fixed_r=False,
+                 similarity_measure='correlation', threshold=0.0, window=(0.05, 0.05), rr_range=(None, None),
+                 feature='amplitude'):
+    """
+    心搏级序列的多尺度熵和相似度网络
+
+    可用的心搏少于2个时 (例如注释中没有R峰，或RR间期全部超出 rr_range) 抛出 ValueError。
+
+    参数:
+    signals (np.array): 形状为 [n_channels, n_timepoints] 的预处理后信号 (整段记录)
+    labels (list): 通道标签
+    peaks (np.array): R峰样本位置
+    sfreq (float): 采样率
+    max_scale, m, r_ratio, fixed_r: 多尺度样本熵参数
+    similarity_measure (str): 相似度度量方式
+    threshold (float): 相似度阈值
+    window, rr_range, feature: 心搏序列参数 (见 beat_series)
+
+    返回:
+    dict: 'series' 心搏序列 [1 + n_channels, n_beats]，'series_labels' 各行的标签，
+          'peaks' R峰位置，'used' 被使用的心搏，'mse' 各行的多尺度样本熵 [1 + n_channels, max_scale]，
+          'similarity' 相似度矩阵，'adjacency' 阈值化后的邻接矩阵，'metrics' 网络指标
+    """
+    series, used = beat_series(signals, peaks, sfreq, window, rr_range, feature)
+    if series.shape[1] < 2:
+        raise ValueError(f"可用的心搏数不足: {len(peaks)} 个R峰中只有 {series.shape[1]} 个心搏可用")
+    similarity = compute_similarity_matrix(series, similarity_measure)
+    adjacency = threshold_similarity_matrix(similarity, threshold)
+    return {
+        'series': series,
+        'series_labels': ['RR'] + [f"{label} {feature}" for label in labels],
+        'peaks': np.asarray(peaks, dtype=np.int64),
+        'used': used,
+        'mse': compute_mse_batch(series, max_scale, m, r_ratio, fixed_r),
+        'similarity': similarity,
+        'adjacency': adjacency,
+        'metrics': extract_network_metrics(adjacency),
+    }
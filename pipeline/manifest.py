@@ -0,0 +1,176 @@
+"""
+可续跑的批处理运行清单
+
+运行目录中的清单 (JSON) 记录每个 (记录, 阶段) 单元的完成状态和输出位置。清单在每个单元
+完成后整体重写: 先写临时文件并 fsync，再原子替换，因此进程在任何时刻被终止 (内存不足、节点
+重启) 时，清单都是某个完整的旧版本或新版本。续跑时已完成的单元被跳过，其余单元继续计算。
+
+每个单元记录完成时的参数键 (运行参数的摘要) 和输入键 (记录输入文件内容的摘要)，参数或输入文件
+改变后旧单元不再视为已完成。
+
+分片 (--shard i/n): 记录按文件名的CRC32分配到 n 个分片，第 i 个分片 (0 <= i < n) 只处理分配给它的
+记录；分配只取决于文件名，各进程或机器之间不需要协调，数据集增加记录时已有记录的分片不变。
+每个分片写自己的清单文件 (manifest.shard-i-of-n.json)，同一运行目录中的多个分片不会写同一个文件；
+读取时合并目录中所有清单，任何分片完成的单元都视为已完成。
+"""
+import os
+import glob
+import json
+import zlib
+import pickle
+import datetime
+
+from .cache import make_cache_key
+
+MANIFEST_VERSION = 1
+
+def _atomic_write(path, data):
+    """先写临时文件并落盘，再原子替换"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def write_json_atomic(path, obj):
+    """原子写入JSON文件"""
+    _atomic_write(path, json.dumps(obj, indent=2, default=str).encode('utf-8'))
+
+def write_pickle_atomic(path, obj):
+    """原子写入pickle文件"""
+    _atomic_write(path, pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+def parse_shard(text):
+    """
+    解析分片参数
+
+    参数:
+    text (str): "i/n" 形式的分片，0 <= i < n
+
+    返回:
+    tuple: (i, n)
+    """
+    try:
+        index, count = (int(part) for part in text.split('/'))
+    except ValueError:
+        raise ValueError(f"分片格式应为 i/n: {text}")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"分片序号应满足 0 <= i < n: {text}")
+    return index, count
+
+def in_shard(path, shard):
+    """记录是否属于分片 (按文件名的CRC32分配)，shard为None时总是属于"""
+    if shard is None:
+        return True
+    index, count = shard
+    return zlib.crc32(os.path.basename(path).encode('utf-8')) % count == index
+
+def manifest_name(shard=None):
+    """分片对应的清单文件名"""
+    if shard is None:
+        return 'manifest.json'
+    return f"manifest.shard-{shard[0]}-of-{shard[1]}.json"
+
+class RunManifest:
+    """
+    批处理运行清单
+
+    参数:
+    run_dir (str): 运行目录
+    params (dict): 影响结果的运行参数，其摘要作为各单元的参数键
+    shard (tuple): 本进程的分片 (i, n)，None表示不分片
+    """
+
+    def __init__(self, run_dir, params, shard=None):
+        self.run_dir = run_dir
+        self.shard = shard
+        self.path = os.path.join(run_dir, manifest_name(shard))
+        self.params_key = make_cache_key(params)
+        self.data = self._read(self.path) or {
+            'version': MANIFEST_VERSION,
+            'shard': list(shard) if shard is not None else None,
+            'records': {},
+        }
+        self.data['parameters'] = params
+        self.data['parameters_key'] = self.params_key
+        self._others = {}
+        self.reload()
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data if data.get('version') == MANIFEST_VERSION else None
+
+    def reload(self):
+        """重新读取同一运行目录中其他分片的清单 (其他进程可能已完成更多单元)"""
+        self._others = {}
+        for path in sorted(glob.glob(os.path.join(self.run_dir, 'manifest*.json'))):
+            if os.path.abspath(path) != os.path.abspath(self.path):
+                data = self._read(path)
+                if data is not None:
+                    self._others[path] = data
+
+    def _entries(self, record, stage):
+        """所有清单中该单元的记录 (本清单在前)"""
+        for data in [self.data] + list(self._others.values()):
+            entry = data['records'].get(record, {}).get(stage)
+            if entry is not None:
+                yield entry
+
+    def entry(self, record, stage, inputs=None):
+        """
+        已完成单元的记录
+
+        参数:
+        inputs (str): 记录输入文件的摘要，不为None时只接受以相同输入完成 (mark 时传入相同 inputs) 的单元
+
+        返回:
+        dict: 以当前参数 (和输入) 完成的单元记录，未完成时为None
+        """
+        for entry in self._entries(record, stage):
+            if (entry.get('status') == 'done' and entry.get('parameters_key') == self.params_key
+                    and (inputs is None or entry.get('inputs') == inputs)):
+                return entry
+        return None
+
+    def is_done(self, record, stage, inputs=None):
+        """单元是否已以当前参数 (和输入) 完成"""
+        return self.entry(record, stage, inputs) is not None
+
+    def mark(self, record, stage, status='done', **info):
+        """
+        记录单元的状态并原子写入清单
+
+        参数:
+        record (str): 记录名
+        stage (str): 阶段名
+        status (str): 'done' 表示完成，其他值 (例如 'error') 的单元在续跑时重新计算
+        **info: 输出位置等可JSON序列化的附加信息，其中 'inputs' 为 entry 比较的输入摘要
+        """
+        self.data['records'].setdefault(record, {})[stage] = {
+            'status': status,
+            'parameters_key': self.params_key,
+            'time': datetime.datetime.now().isoformat(timespec='seconds'),
+            **info,
+        }
+        self.data['updated'] = datetime.datetime.now().isoformat(timespec='seconds')
+        write_json_atomic(self.path, self.data)
+
+    def completed(self, stage, inputs):
+        """
+        所有清单中以当前参数和当前输入完成的单元
+
+        参数:
+        stage (str): 阶段名
+        inputs (dict): 记录名到输入摘要的字典，只返回其中的记录以相同输入完成的单元
+
+        返回:
+        dict: 记录名到单元记录的字典 (按记录名排序)
+        """
+        done = {record: self.entry(record, stage, inputs[record]) for record in sorted(inputs)}
+        return {record: entry for record, entry in done.items() if entry is not None}
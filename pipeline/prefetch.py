@@ -0,0 +1,78 @@
+"""
+后台预取
+
+加载记录主要是磁盘I/O (读取EDF数据、计算文件摘要、读取缓存)，在后台线程中提前进行，
+计算阶段在子进程中处理当前记录时，下一个记录已经在读取。结果放入有界队列: 队列满时加载
+线程等待 (反压)，因此同时驻留内存的已加载记录数不超过队列深度。
+
+加载线程运行在父进程中，记录子进程以fork方式创建时直接继承已加载的数组，不需要复制。
+加载函数不应打印输出: 其他线程持有输出锁时fork出的子进程可能在打印时死锁。
+"""
+import queue
+import threading
+
+_DONE = object()
+
+class Prefetcher:
+    """
+    在后台线程中依次加载各个输入，按输入顺序产生结果
+
+    参数:
+    func (callable): 加载函数，参数为一个输入
+    items (list): 输入列表
+    depth (int): 队列中最多保存的已加载结果数
+    """
+
+    def __init__(self, func, items, depth=2):
+        self._queue = queue.Queue(maxsize=max(1, depth))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(func, list(items)), name="prefetch", daemon=True)
+        self._thread.start()
+
+    def _run(self, func, items):
+        for idx, item in enumerate(items):
+            if self._stop.is_set():
+                return
+            try:
+                entry = (idx, item, func(item), None)
+            except Exception as e:
+                entry = (idx, item, None, f"{type(e).__name__}: {e}")
+            if not self._put(entry):
+                return
+        self._put(_DONE)
+
+    def _put(self, entry):
+        """放入队列，队列满时等待；已关闭时放弃并返回False"""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def __iter__(self):
+        """
+        逐个产生 (序号, 输入, 加载结果, 错误描述)，加载失败时结果为None
+        """
+        while True:
+            entry = self._queue.get()
+            if entry is _DONE:
+                return
+            yield entry
+
+    def close(self):
+        """停止加载线程并丢弃尚未取出的结果"""
+        self._stop.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
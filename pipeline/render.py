@@ -0,0 +1,163 @@
+"""
+图表渲染的后台进程池
+
+绘图任务以 (类型, 参数) 的形式提交给独立的工作进程，工作进程使用无界面的Agg后端，
+主进程提交后立即返回，可以继续调度下一个记录的计算而不必等待PNG写入磁盘。
+每个工作进程按图表类型缓存 figure 和 axes，每次绘图前清空后复用，而不是每张图都
+调用 plt.subplots；网络图的节点布局按节点集合缓存 (visualization.cached_layout)。
+"""
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from utils.profiling import enable_profiling, profile_stage, get_events, add_events
+
+# 当前进程中复用的图表: (图表类型, 子图数) -> axes
+_reusable_axes = {}
+
+def _init_render_worker(profile):
+    """工作进程初始化: 使用Agg后端并配置字体"""
+    import matplotlib
+    matplotlib.use('Agg')
+    from utils.plotting_config import configure_matplotlib_fonts
+    configure_matplotlib_fonts()
+    enable_profiling(*profile)
+
+def _get_axes(kind, n_rows=1):
+    """获取某类图表可复用的axes，首次使用时创建，之后清空已有内容后返回"""
+    import matplotlib.pyplot as plt
+
+    key = (kind, n_rows)
+    if key not in _reusable_axes:
+        if kind == 'entropy_curve':
+            _, axes = plt.subplots(figsize=(10, 6))
+        elif kind == 'network_graph':
+            # 颜色条使用固定的axes，复用时不会每次从主图中再切出一块
+            _, axes = plt.subplots(1, 2, figsize=(10, 8), gridspec_kw={'width_ratios': [20, 1]})
+        elif kind == 'dynamic_metrics':
+            _, axes = plt.subplots(n_rows, 1, figsize=(12, 2.5 * n_rows), sharex=True, squeeze=False)
+        elif kind == 'metrics_comparison':
+            _, axes = plt.subplots(figsize=(10, 6))
+        else:
+            raise ValueError(f"不支持的图表类型: {kind}")
+        _reusable_axes[key] = axes
+
+    axes = _reusable_axes[key]
+    fig = axes.flat[0].figure if hasattr(axes, 'flat') else axes.figure
+    for ax in fig.axes:
+        ax.clear()
+    return axes
+
+def render_figure(kind, reuse=True, **kwargs):
+    """
+    在当前进程中绘制并保存一张图表
+
+    参数:
+    kind (str): 图表类型，可选 'entropy_curve', 'network_graph', 'dynamic_metrics', 'metrics_comparison'
+    reuse (bool): 是否复用本进程中缓存的figure和axes (显示图表时应为False)
+    **kwargs: 传给对应绘图函数的参数
+    """
+    import visualization as vis
+
+    with profile_stage('render', kind=kind):
+        if kind == 'entropy_curve':
+            ax = _get_axes(kind) if reuse else None
+            vis.plot_entropy_curve(ax=ax, **kwargs)
+        elif kind == 'network_graph':
+            ax, cax = _get_axes(kind) if reuse else (None, None)
+            vis.plot_network_graph(ax=ax, cax=cax, **kwargs)
+        elif kind == 'dynamic_metrics':
+            axes = _get_axes(kind, len(kwargs['metrics'])) if reuse else None
+            vis.plot_dynamic_metrics(axes=axes, **kwargs)
+        elif kind == 'metrics_comparison':
+            ax = _get_axes(kind) if reuse else None
+            vis.plot_network_metrics_comparison(ax=ax, **kwargs)
+        else:
+            raise ValueError(f"不支持的图表类型: {kind}")
+
+def _render_task(kind, kwargs):
+    """工作进程任务: 绘制一张图表，返回该任务的阶段记录"""
+    render_figure(kind, **kwargs)
+    return get_events(clear=True)
+
+class FigureRenderer:
+    """
+    后台图表渲染器
+
+    submit 只把任务放入进程池队列，不等待绘制完成；等待中的任务达到 max_pending 时先等待最早
+    完成的任务 (反压)，避免绘图跟不上计算时积压的任务参数占用过多内存。close 等待所有任务结束
+    并报告失败的任务。n_workers 为0时在当前进程中同步绘制 (用于需要显示图表的情况)。
+    """
+
+    def __init__(self, n_workers=1, profile=(False, False), max_pending=None):
+        """
+        参数:
+        n_workers (int): 渲染进程数，0表示在当前进程中同步绘制
+        profile (tuple): 工作进程中的 (是否记录阶段, 是否记录内存)
+        max_pending (int): 等待中的任务数上限，None表示不限制
+        """
+        self.n_workers = n_workers
+        self.max_pending = max_pending
+        self._futures = []
+        self._executor = None
+        self.n_submitted = 0
+        self.failures = []
+        if n_workers > 0:
+            self._executor = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_render_worker,
+                                                 initargs=(profile,))
+
+    def submit(self, kind, **kwargs):
+        """提交一个绘图任务，参数同 render_figure"""
+        self.n_submitted += 1
+        if self._executor is None:
+            try:
+                render_figure(kind, reuse=not kwargs.get('show', False), **kwargs)
+            except Exception as e:
+                self._report_failure(kind, kwargs, e)
+            return
+        self._collect(wait=False)
+        while self.max_pending and len(self._futures) >= self.max_pending:
+            wait(self._futures, return_when=FIRST_COMPLETED)
+            self._collect(wait=False)
+        future = self._executor.submit(_render_task, kind, kwargs)
+        future.job = (kind, kwargs)
+        self._futures.append(future)
+
+    def submit_all(self, jobs):
+        """提交多个 (类型, 参数字典) 形式的绘图任务"""
+        for kind, kwargs in jobs:
+            self.submit(kind, **kwargs)
+
+    def _report_failure(self, kind, kwargs, error):
+        self.failures.append((kind, kwargs.get('save_path'), repr(error)))
+        print(f"绘制图表 {kwargs.get('save_path', kind)} 时出错: {error}")
+
+    def _collect(self, wait):
+        """回收已完成的任务，合并其阶段记录；wait为True时等待全部任务完成"""
+        pending = []
+        for future in self._futures:
+            if not wait and not future.done():
+                pending.append(future)
+                continue
+            try:
+                add_events(future.result())
+            except Exception as e:
+                self._report_failure(*future.job, e)
+        self._futures = pending
+
+    def close(self):
+        """
+        等待所有绘图任务完成并关闭进程池
+
+        返回:
+        list: 失败任务的 (图表类型, 保存路径, 错误信息) 列表
+        """
+        if self._executor is not None:
+            self._collect(wait=True)
+            self._executor.shutdown()
+            self._executor = None
+        return self.failures
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,227 @@
+"""
+列式结果库
+
+每次运行的多尺度熵和网络指标以长表形式保存:
+    mse 表:     每行一个 (运行, 记录, 通道, 尺度)，列为 run_id, record, channel, channel_index, scale, value
+    metrics 表: 每行一个 (运行, 记录, 指标)，列为 run_id, record, metric, value
+
+数据按列存为 .npz 分块文件，并按运行分目录 (<表>/run=<run_id>/part-<记录>.npz)。每个记录对应
+一个固定名称的分块文件 (先写临时文件再原子替换)，多个工作进程可以同时追加而不需要加锁；
+重新运行或续跑同一记录时替换该记录的分块，而不是追加重复的行。
+读取时先按目录名跳过不相关的运行，再只加载过滤和输出需要的列。
+"""
+import os
+import re
+import json
+import numpy as np
+
+TABLE_COLUMNS = {
+    'mse': ['run_id', 'record', 'channel', 'channel_index', 'scale', 'value'],
+    'metrics': ['run_id', 'record', 'metric', 'value'],
+}
+
+def _safe_name(name):
+    """将记录名或运行名转换为可用作文件名的字符串"""
+    return re.sub(r'[^0-9A-Za-z_.-]', '_', str(name))
+
+def _current_rows(path, records):
+    """
+    合并文件中仍然有效的行: 合并之后又单独写入了分块文件的记录，以分块文件为准
+
+    参数:
+    path (str): 合并文件路径
+    records (np.array): 合并文件的 record 列
+
+    返回:
+    np.array: 行掩码，没有行被取代时为None
+    """
+    run_dir = os.path.dirname(path)
+    newer = {name[len('part-'):-len('.npz')] for name in os.listdir(run_dir)
+             if name.startswith('part-') and name.endswith('.npz')}
+    if not newer:
+        return None
+    names, inverse = np.unique(records, return_inverse=True)
+    keep = np.array([_safe_name(name) not in newer for name in names], dtype=bool)
+    return None if keep.all() else keep[inverse]
+
+def _matches(column, wanted):
+    """返回列中取值等于 wanted (或属于 wanted 列表) 的行掩码"""
+    if isinstance(wanted, (list, tuple, set, np.ndarray)):
+        return np.isin(column, list(wanted))
+    return column == wanted
+
+class ResultsStore:
+    """
+    追加写入、按条件读取的列式结果库
+
+    参数:
+    store_dir (str): 结果库目录，多次运行共用同一目录以便跨运行比较
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        for table in TABLE_COLUMNS:
+            os.makedirs(os.path.join(store_dir, table), exist_ok=True)
+        os.makedirs(os.path.join(store_dir, 'runs'), exist_ok=True)
+
+    def _run_dir(self, table, run_id):
+        return os.path.join(self.store_dir, table, f"run={_safe_name(run_id)}")
+
+    def _write_part(self, table, run_id, columns, name):
+        """将一组列写成名为 name 的分块文件 (替换同名文件)，先写临时文件再原子替换"""
+        run_dir = self._run_dir(table, run_id)
+        os.makedirs(run_dir, exist_ok=True)
+        path = os.path.join(run_dir, f"{name}.npz")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **columns)
+        os.replace(tmp_path, path)
+        return path
+
+    def write_run_info(self, run_id, params):
+        """
+        保存一次运行的配置参数
+
+        参数:
+        run_id (str): 运行标识
+        params (dict): 可JSON序列化的参数字典
+        """
+        path = os.path.join(self.store_dir, 'runs', f"{_safe_name(run_id)}.json")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(params, f, indent=2, default=str)
+        os.replace(tmp_path, path)
+
+    def run_info(self, run_id=None):
+        """
+        读取运行的配置参数
+
+        返回:
+        dict: 指定run_id时为该运行的参数，否则为 {run_id: 参数} 字典
+        """
+        runs_dir = os.path.join(self.store_dir, 'runs')
+        infos = {}
+        for name in sorted(os.listdir(runs_dir)):
+            if name.endswith('.json'):
+                with open(os.path.join(runs_dir, name)) as f:
+                    infos[name[:-len('.json')]] = json.load(f)
+        return infos.get(_safe_name(run_id)) if run_id is not None else infos
+
+    def append_record(self, run_id, record, labels, mse, metrics):
+        """
+        写入一个记录的结果，替换该运行中同一记录之前写入的结果
+
+        参数:
+        run_id (str): 运行标识
+        record (str): 记录名
+        labels (list): 通道名称
+        mse (np.array): 形状为 [n_channels, n_scales] 的多尺度熵
+        metrics (dict): 网络指标名称到数值的字典
+        """
+        mse = np.asarray(mse, dtype=np.float64)
+        n_channels, n_scales = mse.shape
+        n_rows = n_channels * n_scales
+        name = f"part-{_safe_name(record)}"
+        self._write_part('mse', run_id, {
+            'run_id': np.full(n_rows, str(run_id)),
+            'record': np.full(n_rows, str(record)),
+            'channel': np.repeat(np.asarray(labels, dtype=str), n_scales),
+            'channel_index': np.repeat(np.arange(n_channels), n_scales),
+            'scale': np.tile(np.arange(1, n_scales + 1), n_channels),
+            'value': mse.ravel(),
+        }, name)
+
+        names = list(metrics)
+        self._write_part('metrics', run_id, {
+            'run_id': np.full(len(names), str(run_id)),
+            'record': np.full(len(names), str(record)),
+            'metric': np.asarray(names, dtype=str),
+            'value': np.array([metrics[metric] for metric in names], dtype=np.float64),
+        }, name)
+
+    def _part_files(self, table, run_id=None):
+        """列出某个表的分块文件，指定run_id时只列出这些运行的目录"""
+        if table not in TABLE_COLUMNS:
+            raise ValueError(f"不支持的表: {table}，可选: {list(TABLE_COLUMNS)}")
+        table_dir = os.path.join(self.store_dir, table)
+        if run_id is None:
+            run_dirs = [os.path.join(table_dir, name) for name in sorted(os.listdir(table_dir))]
+        else:
+            run_ids = run_id if isinstance(run_id, (list, tuple, set)) else [run_id]
+            run_dirs = [self._run_dir(table, r) for r in sorted(run_ids)]
+
+        paths = []
+        for run_dir in run_dirs:
+            if os.path.isdir(run_dir):
+                paths.extend(os.path.join(run_dir, name) for name in sorted(os.listdir(run_dir))
+                             if name.endswith('.npz'))
+        return paths
+
+    def read(self, table, columns=None, **filters):
+        """
+        按条件读取一个表
+
+        参数:
+        table (str): 'mse' 或 'metrics'
+        columns (list): 要返回的列，None表示全部列
+        **filters: 列名到取值 (或取值列表) 的过滤条件，例如 record='r01', scale=[1, 2, 3]
+
+        返回:
+        dict: 列名到数组的字典，各数组行数相同
+        """
+        all_columns = TABLE_COLUMNS.get(table)
+        if all_columns is None:
+            raise ValueError(f"不支持的表: {table}，可选: {list(TABLE_COLUMNS)}")
+        columns = list(all_columns if columns is None else columns)
+        unknown = (set(columns) | set(filters)) - set(all_columns)
+        if unknown:
+            raise ValueError(f"表 {table} 中没有列: {sorted(unknown)}")
+
+        chunks = {name: [] for name in columns}
+        for path in self._part_files(table, filters.get('run_id')):
+            # npz中的每一列单独解压，只读取过滤和输出需要的列
+            with np.load(path, allow_pickle=False) as part:
+                mask = None
+                if os.path.basename(path).startswith('compacted'):
+                    mask = _current_rows(path, part['record'])
+                for name, wanted in filters.items():
+                    match = _matches(part[name], wanted)
+                    mask = match if mask is None else mask & match
+                    if not mask.any():
+                        break
+                if mask is not None and not mask.any():
+                    continue
+                for name in columns:
+                    values = part[name]
+                    chunks[name].append(values if mask is None else values[mask])
+
+        return {name: np.concatenate(parts) if parts else np.array([]) for name, parts in chunks.items()}
+
+    def compact(self, table, run_id):
+        """
+        将一个运行的所有分块文件合并为一个文件，减少大量记录时的文件数和读取开销
+
+        只合并调用时已存在的分块文件，之后写入的分块不受影响；之前的合并文件也参与合并，
+        其中已被单独的分块文件取代的记录以分块文件为准。
+
+        返回:
+        int: 合并的分块文件数
+        """
+        paths = self._part_files(table, run_id)
+        if len(paths) <= 1:
+            return len(paths)
+
+        chunks = {name: [] for name in TABLE_COLUMNS[table]}
+        for path in paths:
+            with np.load(path, allow_pickle=False) as part:
+                mask = None
+                if os.path.basename(path).startswith('compacted'):
+                    mask = _current_rows(path, part['record'])
+                for name in chunks:
+                    chunks[name].append(part[name] if mask is None else part[name][mask])
+        compacted = self._write_part(table, run_id,
+                                     {name: np.concatenate(parts) for name, parts in chunks.items()}, 'compacted')
+        for path in paths:
+            if path != compacted:
+                os.remove(path)
+        return len(paths)
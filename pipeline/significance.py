@@ -0,0 +1,149 @@
+"""
+替代数据显著性检验
+
+在同一组信号的替代数据 (见 utils.surrogates) 上计算多尺度样本熵和相似度矩阵，得到每个
+(通道, 尺度) 的熵值和每条边的权重在零假设 (线性随机过程、通道间无耦合) 下的p值:
+    尺度: 双侧检验，熵值显著高于或低于替代数据时p值小；p值大的尺度上MSE曲线与线性噪声无法区分
+    边:   单侧检验，相似度显著高于独立的替代数据时p值小；p值大的边可以视为偶然相关而删除
+
+替代数据按内存上限分块生成，每块的全部替代序列作为一组通道一次送入多尺度熵的批量/并行计算，
+相似度矩阵对整块一次批量计算；每块处理完后只累加比较计数，不保存替代数据本身。
+
+多尺度熵在替代数据上的计算占几乎全部时间。stop_after 启用序贯蒙特卡洛检验 (Besag-Clifford):
+某个 (通道, 尺度) 两侧都已有 stop_after 个替代数据不弱于观测值时，该位置已可判定为不显著，之后的
+替代数据块不再计算该位置的样本熵。与线性噪声无法区分的尺度通常在几十个替代数据内停止，
+只有接近显著的位置需要计算全部替代数据。
+"""
+import numpy as np
+
+from entropy.parallel import compute_mse_parallel
+from network_analysis.similarity import compute_similarity_matrix
+from utils.surrogates import iter_surrogate_blocks
+from utils.dtypes import as_float_array
+from utils.profiling import profile_stage
+
+SURROGATE_TARGETS = ['mse', 'edges']
+
+def _empirical_p(count, n_valid):
+    """p = (1 + 不弱于观测值的替代数据数) / (1 + 有效替代数据数)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (1.0 + count) / (1.0 + n_valid)
+
+def surrogate_test(signals, n_surrogates=100, method='phase', targets=('mse', 'edges'), max_scale=20, m=2,
+                   r_ratio=0.2, fixed_r=False, similarity_measure='correlation', mse=None, similarity=None,
+                   seed=None, n_workers=None, memory_budget=256 * 1024 ** 2, stop_after=None):
+    """
+    用替代数据检验多尺度熵的各尺度和网络的各条边
+
+    参数:
+    signals (np.array): 形状为 [n_channels, n_timepoints] 的预处理后信号
+    n_surrogates (int): 每个通道的替代数据个数，最小可达到的p值为 1 / (n_surrogates + 1)
+    method (str): 替代数据生成方法，可选 'phase', 'iaaft'
+    targets (tuple): 检验对象，'mse' 和/或 'edges'
+    max_scale, m, r_ratio, fixed_r: 多尺度样本熵参数 (与观测值的计算一致)
+    similarity_measure (str): 相似度度量方式
+    mse (np.array): 可选，已计算的观测多尺度熵 [n_channels, max_scale]，None时在此计算
+    similarity (np.array): 可选，已计算的观测相似度矩阵，None时在此计算
+    seed (int): 随机数种子，None表示不固定
+    n_workers (int): 熵计算使用的进程数 (见 compute_mse_parallel)
+    memory_budget (int): 每块替代数据的内存上限(字节)
+    stop_after (int): 序贯检验的停止计数，None表示每个位置都计算全部替代数据；停止的位置p值按
+                      已计算的l个替代数据估计为 min(1, 2 * min(低于数, 高于数) / l)
+
+    返回:
+    dict: 'mse' 在targets中时包含 'mse_p' 各 (通道, 尺度) 的双侧p值、'mse_surrogate_mean' 和
+          'mse_surrogate_std' 替代数据熵值的均值和标准差 (均为 [n_channels, max_scale])；
+          'edges' 在targets中时包含 'edge_p' 各条边的单侧p值 [n_channels, n_channels] (对角线为NaN)。
+          观测值为NaN的位置p值为NaN
+    """
+    unknown = set(targets) - set(SURROGATE_TARGETS)
+    if unknown:
+        raise ValueError(f"不支持的检验对象: {sorted(unknown)}，可选: {SURROGATE_TARGETS}")
+    signals = np.atleast_2d(as_float_array(signals))
+    n_channels = signals.shape[0]
+    rng = np.random.default_rng(seed)
+    test_mse, test_edges = 'mse' in targets, 'edges' in targets
+
+    if test_mse:
+        if mse is None:
+            mse = compute_mse_parallel(signals, max_scale, m, r_ratio, fixed_r, n_workers, show_progress=False)
+        mse_counts = {'lower': np.zeros(mse.shape), 'upper': np.zeros(mse.shape), 'valid': np.zeros(mse.shape)}
+        mse_sum, mse_sum_sq = np.zeros(mse.shape), np.zeros(mse.shape)
+        # 仍需在替代数据上计算的 (通道, 尺度)
+        active = ~np.isnan(mse)
+    if test_edges:
+        if similarity is None:
+            similarity = compute_similarity_matrix(signals, similarity_measure)
+        edge_count = np.zeros(similarity.shape)
+        edge_valid = np.zeros(similarity.shape)
+
+    blocks = iter_surrogate_blocks(signals, n_surrogates, method, rng, memory_budget)
+    block_idx = 0
+    while True:
+        with profile_stage('surrogate_generate', block=block_idx):
+            block = next(blocks, None)
+        if block is None:
+            break
+        # 序贯检验时每次计算 stop_after 个替代数据后检查哪些位置可以停止
+        step = stop_after if stop_after is not None else len(block)
+        for start in range(0, len(block), step) if test_mse else ():
+            if not active.any():
+                break
+            part = block[start:start + step]
+            with profile_stage('surrogate_mse', block=block_idx, n=len(part), cells=int(active.sum())):
+                # 替代数据作为 n_part * n_channels 个通道一次计算，只计算仍需计算的位置
+                values = compute_mse_parallel(part.reshape(-1, part.shape[-1]), max_scale, m, r_ratio, fixed_r,
+                                              n_workers, show_progress=False, cells=np.tile(active, (len(part), 1))
+                                              ).reshape(len(part), n_channels, -1)
+            valid = ~np.isnan(values)
+            mse_counts['lower'] += (valid & (values <= mse)).sum(axis=0)
+            mse_counts['upper'] += (valid & (values >= mse)).sum(axis=0)
+            mse_counts['valid'] += valid.sum(axis=0)
+            filled = np.where(valid, values, 0.0)
+            mse_sum += filled.sum(axis=0)
+            mse_sum_sq += (filled ** 2).sum(axis=0)
+            if stop_after is not None:
+                active &= np.minimum(mse_counts['lower'], mse_counts['upper']) < stop_after
+        if test_edges:
+            with profile_stage('surrogate_similarity', block=block_idx, n=len(block)):
+                values = compute_similarity_matrix(block, similarity_measure)
+            valid = ~np.isnan(values)
+            edge_count += (valid & (values >= similarity)).sum(axis=0)
+            edge_valid += valid.sum(axis=0)
+        block_idx += 1
+
+    results = {}
+    if test_mse:
+        n_valid = mse_counts['valid']
+        extreme = np.minimum(mse_counts['lower'], mse_counts['upper'])
+        p = 2 * _empirical_p(extreme, n_valid)
+        if stop_after is not None:
+            # 提前停止的位置使用 Besag-Clifford 估计
+            with np.errstate(divide='ignore', invalid='ignore'):
+                p = np.where(active, p, 2 * extreme / n_valid)
+        results['mse_p'] = np.where(np.isnan(mse) | (n_valid == 0), np.nan, np.minimum(1.0, p))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = mse_sum / n_valid
+            results['mse_surrogate_mean'] = mean
+            results['mse_surrogate_std'] = np.sqrt(np.maximum(mse_sum_sq / n_valid - mean ** 2, 0.0))
+    if test_edges:
+        edge_p = np.where(np.isnan(similarity) | (edge_valid == 0), np.nan, _empirical_p(edge_count, edge_valid))
+        np.fill_diagonal(edge_p, np.nan)
+        results['edge_p'] = edge_p
+    return results
+
+def prune_edges(adjacency, edge_p, alpha=0.05):
+    """
+    删除不显著的边
+
+    参数:
+    adjacency (np.array): 加权邻接矩阵
+    edge_p (np.array): surrogate_test 得到的各条边的p值
+    alpha (float): 显著性水平，p值不小于alpha (或为NaN) 的边被删除
+
+    返回:
+    np.array: 删除不显著的边后的邻接矩阵 (副本)
+    """
+    with np.errstate(invalid='ignore'):
+        significant = edge_p < alpha
+    return np.where(significant, adjacency, 0.0)
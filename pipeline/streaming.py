@@ -0,0 +1,162 @@
+"""
+流式 (实时) 分析
+
+StreamingAnalyzer 接收任意长度的数据块，每当数据流前进一个步长 (hop)，就输出最近一个窗口的
+多尺度样本熵和相似度网络指标。各阶段都只处理新到达的样本而不是重算整个窗口:
+    预处理:   StreamingBandpass 在块之间保存滤波器状态 (与 preprocess_signal 使用同一滤波器设计)
+    多尺度熵: SlidingMultiscaleEntropy 增量更新各尺度的模板匹配对数
+    相似度:   相关系数由滚动的一阶和与交叉乘积和得到；其他度量在环形缓冲区的窗口上计算
+
+可以用 preprocessing.edf_reader.iter_edf_chunks 把EDF文件按块回放，作为实时设备的替代数据源。
+"""
+import numpy as np
+
+from utils.signal_processing import StreamingBandpass
+from utils.ring_buffer import RingBuffer
+from utils.dtypes import as_float_array
+from entropy.streaming import SlidingMultiscaleEntropy
+from network_analysis.similarity import compute_similarity_matrix
+from network_analysis.construct_graph import threshold_similarity_matrix
+from network_analysis.network_metrics import compute_network_metrics
+from network_analysis.dynamic import correlation_from_sums
+
+class StreamingAnalyzer:
+    """
+    滑动窗口流式分析器
+
+    预处理使用因果的流式带通滤波 (零相位滤波需要未来的样本)，不做去趋势和标准化:
+    带通滤波已去除直流和慢漂移，而样本熵 (容限与标准差成比例) 和相似度度量都不受幅度缩放和
+    偏移的影响。数据流开头的 warmup 个样本只用于让滤波器越过启动瞬态，不进入分析窗口，
+    因此第一次校准样本熵容限的窗口不含瞬态；之后容限跟随窗口的标准差 (见 entropy.streaming)。
+
+    参数:
+    n_channels (int): 通道数
+    sampling_rate (float): 采样率(Hz)
+    window (int): 窗口长度(样本点)
+    hop (int): 输出间隔(样本点)，不大于窗口长度
+    max_scale (int): 最大尺度因子
+    m (int): 嵌入维度
+    r_ratio (float): 容限因子比例
+    fixed_r (bool): 是否在所有尺度上使用尺度1的容限
+    similarity_measure (str): 相似度度量方式
+    threshold (float): 相似度阈值
+    low_freq, high_freq (float): 带通滤波频带(Hz)
+    filter_order (int): 滤波器阶数
+    dtype: 缓冲区和熵计算的精度
+    refresh_every (int): 每隔多少次输出从窗口重新计算相关系数的滚动和，以抑制误差累积
+    warmup (int): 滤波器预热的样本数，这些样本滤波后丢弃
+    r_tolerance (float): 样本熵容限跟随窗口标准差的相对容差 (见 SlidingMultiscaleEntropy)
+    """
+
+    def __init__(self, n_channels, sampling_rate, window, hop, max_scale=20, m=2, r_ratio=0.2, fixed_r=False,
+                 similarity_measure='correlation', threshold=0.0, low_freq=0.5, high_freq=45.0, filter_order=4,
+                 dtype=np.float64, refresh_every=64, warmup=0, r_tolerance=0.02):
+        if not 0 < hop <= window:
+            raise ValueError(f"步长必须在 1 到窗口长度 {window} 之间: {hop}")
+        self.n_channels = n_channels
+        self.sampling_rate = sampling_rate
+        self.window = window
+        self.hop = hop
+        self.similarity_measure = similarity_measure
+        self.threshold = threshold
+        self.refresh_every = refresh_every
+        self.warmup = warmup
+        self.dtype = dtype
+        self._filter = StreamingBandpass(sampling_rate, low_freq, high_freq, filter_order)
+        self._buffer = RingBuffer(n_channels, window, dtype)
+        self._entropy = SlidingMultiscaleEntropy(n_channels, window, max_scale, m, r_ratio, fixed_r, dtype,
+                                                 r_tolerance)
+        self.reset()
+
+    def reset(self):
+        """清除所有状态，开始新的数据流"""
+        self._filter.reset()
+        self._buffer.reset()
+        self._entropy.reset()
+        self._sums = None
+        self._shift = None
+        self._n_updates = 0
+        self._warmed = 0  # 已用于滤波器预热的样本数
+
+    @property
+    def n_samples(self):
+        """已接收的样本数 (包括预热样本)"""
+        return self._warmed + self._buffer.total
+
+    def _refresh_sums(self):
+        """从窗口重新计算相关系数的滚动和"""
+        segment = self._buffer.view().astype(np.float64)
+        if self._shift is None:
+            # 减去第一个窗口的均值以减小滚动和中的抵消误差
+            self._shift = segment.mean(axis=1, keepdims=True)
+        segment -= self._shift
+        self._sums = [segment.sum(axis=1), segment @ segment.T]
+
+    def _update_sums(self, entering, dropped):
+        """用进入和移出窗口的样本更新滚动和"""
+        entering = entering.astype(np.float64) - self._shift
+        dropped = dropped.astype(np.float64) - self._shift
+        self._sums[0] += entering.sum(axis=1) - dropped.sum(axis=1)
+        self._sums[1] += entering @ entering.T - dropped @ dropped.T
+
+    def _similarity(self):
+        if self.similarity_measure == 'correlation':
+            # 窗口第一次填满时以及每隔 refresh_every 次输出时重新计算滚动和
+            if self._sums is None or self._n_updates % self.refresh_every == 0:
+                self._refresh_sums()
+            return correlation_from_sums(self._sums[0], self._sums[1], self.window)
+        similarity = compute_similarity_matrix(self._buffer.view(), self.similarity_measure)
+        np.fill_diagonal(similarity, 0.0)
+        return similarity
+
+    def _advance(self, samples):
+        """写入一段不跨越输出边界的滤波后样本"""
+        dropped = self._buffer.extend(samples)
+        self._entropy.update(samples)
+        if self._sums is not None:
+            self._update_sums(samples, dropped)
+
+    def push(self, chunk):
+        """
+        输入一个数据块
+
+        参数:
+        chunk (np.array): 形状为 [n_channels, n_samples] 的原始数据块
+
+        返回:
+        list: 本数据块中每个输出时刻的结果字典:
+              'end' 窗口结束位置(数据流中的样本点，不含), 'time' 对应的时间(秒),
+              'mse' 形状为 [n_channels, max_scale] 的多尺度样本熵,
+              'similarity' 相似度矩阵, 'metrics' 网络指标字典
+        """
+        filtered = self._filter.process(as_float_array(np.atleast_2d(chunk), self.dtype))
+        updates = []
+        # 预热阶段的样本只推进滤波器状态
+        position = min(self.warmup - self._warmed, filtered.shape[1])
+        self._warmed += position
+        while position < filtered.shape[1]:
+            # 在输出时刻切分数据块，使每次输出都对应窗口恰好结束于该时刻
+            total = self._buffer.total
+            if total < self.window:
+                boundary = self.window
+            else:
+                boundary = total + self.hop - (total - self.window) % self.hop
+            step = min(boundary - total, filtered.shape[1] - position)
+            self._advance(filtered[:, position:position + step])
+            position += step
+            if self._buffer.total == boundary:
+                updates.append(self._emit())
+        return updates
+
+    def _emit(self):
+        """计算当前窗口的结果"""
+        similarity = self._similarity()
+        self._n_updates += 1
+        end = self.n_samples
+        return {
+            'end': end,
+            'time': end / self.sampling_rate,
+            'mse': self._entropy.values(),
+            'similarity': similarity,
+            'metrics': compute_network_metrics(threshold_similarity_matrix(similarity, self.threshold)),
+        }
@@ -1,3 +1,6 @@
 from .edf_loader import load_edf
+from .edf_reader import read_edf_header, read_edf_data, iter_edf_chunks
+from .annotations import read_annotations, read_qrs_peaks, qrs_annotation_path, QRS_CODES
 
-__all__ = ['load_edf']
+__all__ = ['load_edf', 'read_edf_header', 'read_edf_data', 'iter_edf_chunks', 'read_annotations',
+           'read_qrs_peaks', 'qrs_annotation_path', 'QRS_CODES']
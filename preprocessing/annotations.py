@@ -0,0 +1,102 @@
+"""
+WFDB (MIT格式) 注释文件读取器
+
+adfecgdb 的每个记录附带 `.edf.qrs` 注释文件，按WFDB的MIT格式保存QRS波位置。文件由16位小端字组成，
+每个字的高6位为注释类型、低10位为与上一个注释的样本间隔；类型为 SKIP (59)、NUM (60)、
+SUB (61)、CHN (62)、AUX (63) 的字是附加字段，其中 SKIP 后跟一个32位间隔 (高16位在前)，
+AUX 后跟长度为低10位的字节串 (补齐到偶数字节)；全零字表示文件结束。
+
+整个文件一次读入为uint16数组，类型和间隔向量化拆分；附加字段只出现在文件头部等少数位置，
+只有这些字段逐个处理，普通注释的位置由一次累积和得到，不为每个注释创建Python对象。
+"""
+import os
+import re
+import numpy as np
+
+# WFDB注释类型代码
+_SKIP, _NUM, _SUB, _CHN, _AUX = 59, 60, 61, 62, 63
+
+# 表示心搏 (QRS波) 的注释类型，与WFDB的 isqrs 表相同
+QRS_CODES = (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 25, 30, 34, 35, 38)
+
+_TIME_RESOLUTION = re.compile(r'##\s*time resolution:\s*([0-9.]+)')
+
+def read_annotations(annotation_path):
+    """
+    读取WFDB注释文件
+
+    参数:
+    annotation_path (str): 注释文件路径
+
+    返回:
+    tuple: (样本位置 int64数组, 注释类型 uint8数组, 注释的采样率)；
+           文件中没有 "## time resolution" 说明时采样率为None
+    """
+    words = np.fromfile(annotation_path, dtype='<u2')
+    codes = (words >> 10).astype(np.uint8)
+    intervals = (words & 0x3FF).astype(np.int64)
+
+    # 每个字对样本位置的增量；只有普通注释和SKIP字有增量，普通注释保留为结果
+    increments = np.zeros(len(words), dtype=np.int64)
+    regular = np.zeros(len(words), dtype=bool)
+    aux_notes = []
+
+    # 附加字段和结束标记的候选位置；AUX字节串中的字也可能出现在候选中，但会被跳过
+    candidates = np.flatnonzero((codes >= _SKIP) | (words == 0))
+    pos = 0
+    while pos < len(words):
+        k = np.searchsorted(candidates, pos)
+        idx = candidates[k] if k < len(candidates) else len(words)
+        # pos 到 idx 之间的字都是普通注释
+        regular[pos:idx] = True
+        increments[pos:idx] = intervals[pos:idx]
+        if idx >= len(words) or words[idx] == 0:
+            break
+        code = codes[idx]
+        if code == _SKIP:
+            skip = (int(words[idx + 1]) << 16) | int(words[idx + 2])
+            increments[idx] = skip - (1 << 32) if skip >= (1 << 31) else skip
+            pos = idx + 3
+        elif code == _AUX:
+            n_bytes = int(intervals[idx])
+            payload = words[idx + 1:idx + 1 + (n_bytes + 1) // 2].astype('<u2').tobytes()[:n_bytes]
+            aux_notes.append(payload.decode('latin-1'))
+            pos = idx + 1 + (n_bytes + 1) // 2
+        else:
+            pos = idx + 1
+
+    samples = np.cumsum(increments)[regular]
+    fs = None
+    for note in aux_notes:
+        match = _TIME_RESOLUTION.search(note)
+        if match:
+            fs = float(match.group(1))
+    return samples, codes[regular], fs
+
+def qrs_annotation_path(edf_path):
+    """
+    EDF文件对应的QRS注释文件路径 (`<文件名>.qrs`)
+
+    返回:
+    str: 注释文件路径，不存在时为None
+    """
+    path = edf_path + '.qrs'
+    return path if os.path.exists(path) else None
+
+def read_qrs_peaks(annotation_path, sfreq=None, codes=QRS_CODES):
+    """
+    读取QRS波 (R峰) 的位置
+
+    参数:
+    annotation_path (str): 注释文件路径
+    sfreq (float): 信号的采样率；注释的采样率与之不同时换算到信号的样本位置，None表示不换算
+    codes (tuple): 视为心搏的注释类型
+
+    返回:
+    np.array: 按时间排序的R峰样本位置 (int64)
+    """
+    samples, types, fs = read_annotations(annotation_path)
+    peaks = samples[np.isin(types, codes)]
+    if sfreq is not None and fs is not None and fs != sfreq:
+        peaks = np.round(peaks * (sfreq / fs)).astype(np.int64)
+    return np.sort(peaks[peaks >= 0])
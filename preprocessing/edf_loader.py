@@ -1,24 +1,52 @@
-import mne
 import numpy as np
 import os
+from .edf_reader import read_edf_data
 
-def load_edf(edf_file_path):
+def load_edf(edf_file_path, channels=None, start=0, stop=None, return_sfreq=False, dtype=np.float64,
+             verbose=True):
     """
     加载EDF格式的ECG/EEG数据。
     
+    通过内存映射只解码所请求的通道和样本区间；文件无法按标准EDF解析
+    (例如通道采样率不一致) 时回退到mne读取全部数据后再截取。
+    
     参数:
     edf_file_path (str): EDF文件的完整路径
+    channels (list | slice): 通道序号或标签列表，或通道序号切片，None表示全部通道
+    start (int): 起始样本 (含)
+    stop (int): 结束样本 (不含)，None表示到记录末尾
+    return_sfreq (bool): 是否同时返回文件头中的采样率
+    dtype: 数据精度 (np.float64 或 np.float32)
+    verbose (bool): 是否打印加载信息 (在后台线程中加载时应为False)
     
     返回:
-    tuple: (数据数组, 通道标签)
+    tuple: (数据数组, 通道标签)，return_sfreq为True时为 (数据数组, 通道标签, 采样率)
     """
     try:
-        raw = mne.io.read_raw_edf(edf_file_path, preload=True, verbose='WARNING')
-        data = raw.get_data()
-        labels = raw.ch_names
-        print(f"成功加载文件: {edf_file_path}")
-        print(f"数据形状: {data.shape}, 采样率: {raw.info['sfreq']} Hz")
-        return data, labels
+        try:
+            data, labels, sfreq = read_edf_data(edf_file_path, channels, start, stop, dtype=dtype)
+        except ValueError:
+            data, labels, sfreq = _load_edf_mne(edf_file_path, channels, start, stop)
+            data = data.astype(dtype, copy=False)
+        if verbose:
+            print(f"成功加载文件: {edf_file_path}")
+            print(f"数据形状: {data.shape}, 采样率: {sfreq} Hz")
+        return (data, labels, sfreq) if return_sfreq else (data, labels)
     except Exception as e:
-        print(f"加载EDF文件 {edf_file_path} 失败: {e}")
-        return None, None
+        if verbose:
+            print(f"加载EDF文件 {edf_file_path} 失败: {e}")
+        return (None, None, None) if return_sfreq else (None, None)
+
+def _load_edf_mne(edf_file_path, channels=None, start=0, stop=None):
+    """使用mne完整读取EDF文件后截取通道和样本区间"""
+    import mne
+    raw = mne.io.read_raw_edf(edf_file_path, preload=True, verbose='WARNING')
+    labels = raw.ch_names
+    if channels is None:
+        ch_idx = list(range(len(labels)))
+    elif isinstance(channels, slice):
+        ch_idx = list(range(len(labels)))[channels]
+    else:
+        ch_idx = [labels.index(c) if isinstance(c, str) else c for c in channels]
+    data = raw.get_data(picks=ch_idx, start=start, stop=stop)
+    return data, [labels[i] for i in ch_idx], raw.info['sfreq']
@@ -0,0 +1,166 @@
+"""
+基于内存映射的EDF/EDF+读取器
+
+只解析一次文件头，数据记录通过 np.memmap 映射，读取时只解码所请求的
+通道和样本区间，并以向量化方式换算为物理量。
+"""
+import os
+import time
+import numpy as np
+
+# 与mne一致，将电压类单位换算为伏特
+_UNIT_SCALES = {'uv': 1e-6, 'µv': 1e-6, 'mv': 1e-3, 'v': 1.0}
+
+_ANNOTATION_LABEL = 'EDF Annotations'
+
+def _parse_fields(raw, n_signals, width, cast=str):
+    """解析文件头中按信号排列的定宽字段"""
+    fields = [raw[i * width:(i + 1) * width].decode('latin-1').strip() for i in range(n_signals)]
+    return [cast(f) for f in fields]
+
+def read_edf_header(edf_file_path):
+    """
+    读取EDF文件头
+    
+    参数:
+    edf_file_path (str): EDF文件的完整路径
+    
+    返回:
+    dict: 文件头信息，包括数据通道 (不含EDF+注释通道) 的标签、采样率、
+          每个数据记录内的样本偏移以及数字量到物理量的换算系数
+    """
+    with open(edf_file_path, 'rb') as f:
+        fixed = f.read(256)
+        header_bytes = int(fixed[184:192])
+        n_records = int(fixed[236:244])
+        record_duration = float(fixed[244:252])
+        n_signals = int(fixed[252:256])
+        sig = f.read(256 * n_signals)
+    
+    widths = [16, 80, 8, 8, 8, 8, 8, 80, 8, 32]
+    offsets = np.concatenate([[0], np.cumsum(widths) * n_signals])
+    block = lambda k: sig[offsets[k]:offsets[k + 1]]
+    
+    labels = _parse_fields(block(0), n_signals, 16)
+    units = _parse_fields(block(2), n_signals, 8)
+    phys_min = np.array(_parse_fields(block(3), n_signals, 8, float))
+    phys_max = np.array(_parse_fields(block(4), n_signals, 8, float))
+    dig_min = np.array(_parse_fields(block(5), n_signals, 8, float))
+    dig_max = np.array(_parse_fields(block(6), n_signals, 8, float))
+    samples_per_record = np.array(_parse_fields(block(8), n_signals, 8, int))
+    
+    # 每个数据记录按信号顺序连续存放各信号的int16样本
+    record_samples = int(samples_per_record.sum())
+    sample_offsets = np.concatenate([[0], np.cumsum(samples_per_record)[:-1]])
+    
+    # 记录数未知(-1)时由文件大小推算
+    if n_records < 0:
+        n_records = (os.path.getsize(edf_file_path) - header_bytes) // (2 * record_samples)
+    
+    cal = (phys_max - phys_min) / (dig_max - dig_min)
+    unit_scale = np.array([_UNIT_SCALES.get(u.lower(), 1.0) for u in units])
+    gain = cal * unit_scale
+    offset = (phys_min - dig_min * cal) * unit_scale
+    
+    data_idx = np.array([i for i, label in enumerate(labels) if label != _ANNOTATION_LABEL], dtype=int)
+    
+    return {
+        'header_bytes': header_bytes,
+        'n_records': n_records,
+        'record_duration': record_duration,
+        'record_samples': record_samples,
+        'labels': [labels[i] for i in data_idx],
+        'units': [units[i] for i in data_idx],
+        'samples_per_record': samples_per_record[data_idx],
+        'sample_offsets': sample_offsets[data_idx],
+        'sampling_rates': samples_per_record[data_idx] / record_duration,
+        'n_samples': samples_per_record[data_idx] * n_records,
+        'gain': gain[data_idx],
+        'offset': offset[data_idx]
+    }
+
+def read_edf_data(edf_file_path, channels=None, start=0, stop=None, header=None, dtype=np.float64):
+    """
+    读取EDF文件中指定通道和样本区间的数据
+    
+    参数:
+    edf_file_path (str): EDF文件的完整路径
+    channels (list | slice): 数据通道的序号或标签列表，或通道序号切片，None表示全部
+    start (int): 起始样本 (含)
+    stop (int): 结束样本 (不含)，None表示到记录末尾
+    header (dict): 可选，read_edf_header 的结果，避免重复解析文件头
+    dtype: 输出数据的精度 (np.float64 或 np.float32)
+    
+    返回:
+    tuple: (形状为 [n_channels, n_samples] 的物理量数据, 通道标签, 采样率)
+    """
+    if header is None:
+        header = read_edf_header(edf_file_path)
+    
+    n_data_channels = len(header['labels'])
+    if channels is None:
+        ch_idx = np.arange(n_data_channels)
+    elif isinstance(channels, slice):
+        ch_idx = np.arange(n_data_channels)[channels]
+    else:
+        ch_idx = np.array([header['labels'].index(c) if isinstance(c, str) else c for c in channels], dtype=int)
+    
+    spr = header['samples_per_record'][ch_idx]
+    if len(ch_idx) == 0 or np.any(spr != spr[0]):
+        raise ValueError("所选通道为空或采样率不一致")
+    spr = int(spr[0])
+    
+    n_total = spr * header['n_records']
+    stop = n_total if stop is None else min(stop, n_total)
+    start = max(0, min(start, stop))
+    
+    records = np.memmap(edf_file_path, dtype='<i2', mode='r', offset=header['header_bytes'],
+                        shape=(header['n_records'], header['record_samples']))
+    
+    # 只映射覆盖 [start, stop) 的数据记录，并只取所选通道的样本列
+    rec_start = start // spr
+    rec_stop = max(rec_start, -(-stop // spr))
+    columns = header['sample_offsets'][ch_idx][:, np.newaxis] + np.arange(spr)
+    digital = records[rec_start:rec_stop][:, columns]  # [n_records, n_channels, spr]
+    digital = digital.transpose(1, 0, 2).reshape(len(ch_idx), -1)
+    digital = digital[:, start - rec_start * spr:stop - rec_start * spr]
+    
+    # 只分配一次输出数组，增益和偏移原地应用
+    data = digital.astype(dtype)
+    data *= header['gain'][ch_idx][:, np.newaxis].astype(dtype)
+    data += header['offset'][ch_idx][:, np.newaxis].astype(dtype)
+    labels = [header['labels'][i] for i in ch_idx]
+    return data, labels, float(header['sampling_rates'][ch_idx[0]])
+
+def iter_edf_chunks(edf_path, chunk_size, channels=None, start=0, stop=None, dtype=np.float64, realtime=False):
+    """
+    按块回放EDF文件，作为实时设备的替代数据源
+
+    参数:
+    edf_path (str): EDF文件路径
+    chunk_size (int): 每块的样本数
+    channels (list | slice): 通道序号或标签，None表示全部
+    start (int): 起始样本
+    stop (int): 结束样本 (不含)，None表示到记录末尾
+    dtype: 数据精度
+    realtime (bool): 是否按采样率节奏输出 (模拟设备)
+
+    返回:
+    generator: 依次产生形状为 [n_channels, chunk_size] 的数据块 (最后一块可能较短)
+    """
+    header = read_edf_header(edf_path)
+    # 读取0个样本，只解析通道选择并取得采样率
+    _, _, sfreq = read_edf_data(edf_path, channels, 0, 0, header=header)
+    n_total = int(header['samples_per_record'][0]) * header['n_records']
+    stop = n_total if stop is None else min(stop, n_total)
+
+    began = time.perf_counter()
+    for chunk_start in range(start, stop, chunk_size):
+        chunk, _, _ = read_edf_data(edf_path, channels, chunk_start, min(chunk_start + chunk_size, stop),
+                                    header=header, dtype=dtype)
+        if realtime:
+            # 等到该块的最后一个样本在实时设备上"采集"完成
+            delay = (chunk_start + chunk.shape[1] - start) / sfreq - (time.perf_counter() - began)
+            if delay > 0:
+                time.sleep(delay)
+        yield chunk
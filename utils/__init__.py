@@ -1,4 +1,21 @@
-from .signal_processing import preprocess_signal, coarse_grain_time_series
-from .plotting_config import configure_matplotlib_fonts
+from .signal_processing import (preprocess_signal, design_bandpass, bandpass_filter, StreamingBandpass,
+                                coarse_grain_time_series, coarse_grain_all_scales, iter_coarse_grained)
+from .dtypes import resolve_dtype, as_float_array
+from .ring_buffer import RingBuffer
+from .surrogates import (phase_randomized_surrogates, iaaft_surrogates, iter_surrogate_blocks,
+                         SURROGATE_METHODS)
+from .beats import rr_intervals, beat_indices, beat_segments, beat_features
 
-__all__ = ['preprocess_signal', 'coarse_grain_time_series', 'configure_matplotlib_fonts']
+__all__ = ['preprocess_signal', 'design_bandpass', 'bandpass_filter', 'StreamingBandpass',
+           'coarse_grain_time_series', 'coarse_grain_all_scales', 'iter_coarse_grained',
+           'resolve_dtype', 'as_float_array', 'RingBuffer',
+           'phase_randomized_surrogates', 'iaaft_surrogates', 'iter_surrogate_blocks', 'SURROGATE_METHODS',
+           'rr_intervals', 'beat_indices', 'beat_segments', 'beat_features',
+           'configure_matplotlib_fonts']
+
+def __getattr__(name):
+    # configure_matplotlib_fonts 会导入matplotlib，只在首次访问时加载
+    if name == 'configure_matplotlib_fonts':
+        from .plotting_config import configure_matplotlib_fonts
+        return configure_matplotlib_fonts
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
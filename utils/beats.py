@@ -0,0 +1,83 @@
+"""
+心搏同步处理: RR间期序列和按心搏分段
+
+R峰位置 (见 preprocessing.annotations) 给出每个心搏的时刻。RR间期序列由相邻R峰之差得到；
+按心搏分段时，所有心搏窗口的样本下标组成一个 [window, n_beats] 的下标数组，对
+[n_channels, n_timepoints] 的信号一次索引即得到 [n_channels, window, n_beats] 的分段，
+每个心搏的特征在整段记录上一次批量计算。窗口轴放在心搏轴之前: 沿窗口轴的归约是对连续存放的
+各心搏逐元素进行的，比沿很短的最后一个轴归约快一个数量级。
+"""
+import numpy as np
+from .dtypes import as_float_array
+
+def rr_intervals(peaks, sfreq, min_rr=None, max_rr=None):
+    """
+    由R峰位置计算RR间期序列
+
+    参数:
+    peaks (np.array): 按时间排序的R峰样本位置
+    sfreq (float): 采样率
+    min_rr (float): RR间期的下限(秒)，低于下限的间期 (误检的R峰) 视为无效，None表示不限制
+    max_rr (float): RR间期的上限(秒)，高于上限的间期 (漏检的R峰) 视为无效，None表示不限制
+
+    返回:
+    tuple: (RR间期(秒), 有效掩码)，长度均为 len(peaks) - 1，第k个间期结束于第k+1个R峰
+    """
+    rr = np.diff(np.asarray(peaks, dtype=np.int64)) / float(sfreq)
+    valid = np.ones(len(rr), dtype=bool)
+    if min_rr is not None:
+        valid &= rr >= min_rr
+    if max_rr is not None:
+        valid &= rr <= max_rr
+    return rr, valid
+
+def beat_indices(peaks, n_samples, before, after):
+    """
+    所有心搏窗口的样本下标
+
+    参数:
+    peaks (np.array): R峰样本位置
+    n_samples (int): 信号长度，窗口超出信号范围的心搏被排除
+    before (int): R峰之前的样本数
+    after (int): R峰之后的样本数 (不含R峰本身)
+
+    返回:
+    tuple: (形状为 [before + after + 1, n_valid] 的下标数组, 长度为 len(peaks) 的有效掩码)
+    """
+    peaks = np.asarray(peaks, dtype=np.int64)
+    valid = (peaks - before >= 0) & (peaks + after < n_samples)
+    offsets = np.arange(-before, after + 1)
+    return offsets[:, np.newaxis] + peaks[np.newaxis, valid], valid
+
+def beat_segments(signals, peaks, before, after):
+    """
+    按心搏分段
+
+    参数:
+    signals (np.array): 一维信号或形状为 [n_channels, n_timepoints] 的信号
+    peaks (np.array): R峰样本位置
+    before (int): R峰之前的样本数
+    after (int): R峰之后的样本数
+
+    返回:
+    tuple: (形状为 [n_channels, before + after + 1, n_valid] 的分段, 长度为 len(peaks) 的有效掩码)
+    """
+    signals = np.atleast_2d(as_float_array(signals))
+    index, valid = beat_indices(peaks, signals.shape[1], before, after)
+    return signals[:, index], valid
+
+def beat_features(segments):
+    """
+    每个心搏的特征
+
+    参数:
+    segments (np.array): 形状为 [n_channels, window, n_beats] 的心搏分段 (见 beat_segments)
+
+    返回:
+    dict: 'amplitude' 每个窗口的峰峰值，'rms' 每个窗口去均值后的均方根，形状均为 [n_channels, n_beats]
+    """
+    centered = segments - segments.mean(axis=1, keepdims=True)
+    return {
+        'amplitude': segments.max(axis=1) - segments.min(axis=1),
+        'rms': np.sqrt(np.mean(centered ** 2, axis=1)),
+    }
@@ -0,0 +1,41 @@
+"""
+计算精度策略
+
+加载数据时选择 float64 或 float32，之后的预处理、粗粒化、熵和相似度计算都沿用输入数组的精度，
+不再各自转换回 float64。float32 使内存占用和内存带宽减半；对误差敏感的累加 (粗粒化的累积和、
+滑动窗口的滚动和、网络指标) 仍在 float64 中进行。
+"""
+import numpy as np
+
+SUPPORTED_DTYPES = (np.float32, np.float64)
+
+def resolve_dtype(dtype):
+    """
+    将配置中的精度名称解析为numpy类型
+
+    参数:
+    dtype (str | np.dtype): 'float32'、'float64' 或numpy类型，None表示float64
+
+    返回:
+    type: np.float32 或 np.float64
+    """
+    resolved = np.dtype(np.float64 if dtype is None else dtype).type
+    if resolved not in SUPPORTED_DTYPES:
+        raise ValueError(f"不支持的计算精度: {dtype}，可选: float32, float64")
+    return resolved
+
+def as_float_array(data, dtype=None):
+    """
+    转换为浮点数组，只在需要时复制
+
+    参数:
+    data (array_like): 输入数据
+    dtype: 目标精度，None表示保留float32/float64输入的精度，其他类型转为float64
+
+    返回:
+    np.ndarray: 浮点数组
+    """
+    data = np.asarray(data)
+    if dtype is None:
+        dtype = data.dtype if data.dtype.type in SUPPORTED_DTYPES else np.float64
+    return data.astype(dtype, copy=False)
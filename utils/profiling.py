@@ -0,0 +1,194 @@
+"""
+分阶段的运行时间与内存记录
+
+用 profile_stage 上下文管理器包裹各个阶段，启用后记录墙钟时间、CPU时间和阶段内的
+峰值内存分配 (tracemalloc)，并可导出为 Chrome Trace 格式 (chrome://tracing 或
+Perfetto 可直接打开)。未启用时 profile_stage 不做任何事情。
+
+CPU时间是执行该阶段的线程的CPU时间 (time.thread_time)，不包括其他线程，也不包括子进程。
+tracemalloc 的峰值是整个进程的: 阶段内其他线程的分配也计入峰值。与其他线程中的阶段 (例如
+后台预取线程的加载阶段) 在时间上重叠的阶段无法区分各自的峰值，这些阶段不记录峰值分配，
+事件中以 'peak_alloc_shared' 标记。
+"""
+import os
+import json
+import time
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+_enabled = False
+_trace_memory = False
+_events = []
+# 线程标识 -> 该线程中嵌套阶段的栈，每项为 [开始时的已分配内存, 已观测到的峰值, 是否与其他线程的阶段重叠]
+_memory_stacks = {}
+_memory_lock = threading.Lock()
+
+def _after_fork_in_child():
+    """子进程中只有执行 fork 的线程: 丢弃其他线程的阶段，重新创建锁"""
+    global _memory_lock
+    _memory_lock = threading.Lock()
+    stack = _memory_stacks.get(threading.get_ident())
+    _memory_stacks.clear()
+    if stack:
+        _memory_stacks[threading.get_ident()] = stack
+
+# fork 时持有锁，子进程不会继承其他线程持有的锁或修改到一半的阶段栈
+os.register_at_fork(before=lambda: _memory_lock.acquire(), after_in_parent=lambda: _memory_lock.release(),
+                    after_in_child=_after_fork_in_child)
+
+def _enter_memory_stage():
+    """记录阶段开始时的内存；其他线程中有未结束的阶段时，双方的阶段都标记为重叠"""
+    with _memory_lock:
+        stack = _memory_stacks.setdefault(threading.get_ident(), [])
+        others = [entry for other in _memory_stacks.values() if other is not stack for entry in other]
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        for entry in others:
+            entry[2] = True
+        if not others:
+            # 峰值是整个进程的，只有没有其他线程依赖它时才能重置
+            tracemalloc.reset_peak()
+        stack.append([current, current, bool(others)])
+
+def _exit_memory_stage():
+    """
+    结束当前线程最内层的阶段
+
+    返回:
+    int: 阶段内的峰值分配(字节)，与其他线程的阶段重叠时为None
+    """
+    with _memory_lock:
+        ident = threading.get_ident()
+        stack = _memory_stacks[ident]
+        start_current, peak_seen, shared = stack.pop()
+        peak = max(peak_seen, tracemalloc.get_traced_memory()[1])
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        else:
+            del _memory_stacks[ident]
+    return None if shared else max(0, peak - start_current)
+
+def enable_profiling(enabled=True, trace_memory=True):
+    """
+    启用或关闭阶段记录
+    
+    参数:
+    enabled (bool): 是否启用
+    trace_memory (bool): 是否用tracemalloc记录峰值内存 (会明显增加运行开销)
+    """
+    global _enabled, _trace_memory
+    _enabled = enabled
+    _trace_memory = enabled and trace_memory
+    if _trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not _trace_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def is_profiling_enabled():
+    """返回 (是否启用, 是否记录内存)"""
+    return _enabled, _trace_memory
+
+@contextmanager
+def profile_stage(name, **args):
+    """
+    记录一个阶段的运行时间和峰值内存
+    
+    参数:
+    name (str): 阶段名称
+    **args: 附加到事件上的信息 (如通道、尺度)
+    """
+    if not _enabled:
+        yield
+        return
+    
+    trace_memory = _trace_memory
+    if trace_memory:
+        _enter_memory_stage()
+    
+    start_us = time.time_ns() // 1000
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.thread_time() - cpu_start
+        event_args = dict(args, cpu_s=cpu)
+        
+        if trace_memory:
+            peak_alloc = _exit_memory_stage()
+            if peak_alloc is None:
+                event_args['peak_alloc_shared'] = True
+            else:
+                event_args['peak_alloc_bytes'] = peak_alloc
+        
+        _events.append({
+            'name': name,
+            'ph': 'X',
+            'ts': start_us,
+            'dur': wall * 1e6,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': event_args
+        })
+
+def get_events(clear=False):
+    """
+    获取已记录的事件
+    
+    参数:
+    clear (bool): 获取后是否清空
+    
+    返回:
+    list: Chrome Trace 格式的事件列表
+    """
+    global _events
+    events = _events
+    if clear:
+        _events = []
+    return list(events)
+
+def add_events(events):
+    """合并其他进程中记录的事件"""
+    _events.extend(events)
+
+def export_chrome_trace(path, events=None):
+    """
+    将事件导出为 Chrome Trace JSON 文件
+    
+    参数:
+    path (str): 输出文件路径
+    events (list): 事件列表，None表示使用当前进程已记录的全部事件
+    """
+    events = get_events() if events is None else events
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+def summarize_events(events=None):
+    """
+    按阶段名称汇总事件
+    
+    返回:
+    dict: {阶段名: {'count', 'wall_s', 'cpu_s', 'max_peak_alloc_bytes'}}
+    """
+    events = get_events() if events is None else events
+    summary = {}
+    for event in events:
+        entry = summary.setdefault(event['name'], {'count': 0, 'wall_s': 0.0, 'cpu_s': 0.0,
+                                                   'max_peak_alloc_bytes': 0})
+        entry['count'] += 1
+        entry['wall_s'] += event['dur'] / 1e6
+        entry['cpu_s'] += event['args'].get('cpu_s', 0.0)
+        entry['max_peak_alloc_bytes'] = max(entry['max_peak_alloc_bytes'],
+                                            event['args'].get('peak_alloc_bytes', 0))
+    return summary
+
+def print_summary(events=None):
+    """打印各阶段的耗时与内存汇总"""
+    summary = summarize_events(events)
+    print(f"\n{'阶段':<16s} {'次数':>6s} {'墙钟(s)':>10s} {'CPU(s)':>10s} {'峰值分配(MB)':>14s}")
+    for name, entry in sorted(summary.items(), key=lambda item: -item[1]['wall_s']):
+        print(f"{name:<16s} {entry['count']:>6d} {entry['wall_s']:>10.3f} {entry['cpu_s']:>10.3f} "
+              f"{entry['max_peak_alloc_bytes'] / 2**20:>14.2f}")
@@ -0,0 +1,75 @@
+import numpy as np
+
+class RingBuffer:
+    """
+    多通道环形缓冲区，保存最近 capacity 个样本
+
+    每个样本在长度为 2*capacity 的数组中写入两次 (镜像存储)，因此按时间顺序排列的窗口
+    始终是一段连续切片，读取窗口不需要复制或拼接。
+
+    参数:
+    n_channels (int): 通道数
+    capacity (int): 窗口长度(样本点)
+    dtype: 数据精度
+    """
+
+    def __init__(self, n_channels, capacity, dtype=np.float64):
+        if capacity < 1:
+            raise ValueError("环形缓冲区的长度必须为正数")
+        self.capacity = capacity
+        self._data = np.zeros((n_channels, 2 * capacity), dtype=dtype)
+        self._head = 0
+        self.size = 0
+        self.total = 0  # 累计写入的样本数
+
+    @property
+    def full(self):
+        return self.size == self.capacity
+
+    def view(self):
+        """
+        按时间顺序返回缓冲区中的样本 (视图，下一次写入后内容会改变)
+
+        返回:
+        np.array: 形状为 [n_channels, size] 的数组
+        """
+        return self._data[:, self._head:self._head + self.size]
+
+    def extend(self, chunk):
+        """
+        写入一个数据块
+
+        参数:
+        chunk (np.array): 形状为 [n_channels, n_samples] 的数据块
+
+        返回:
+        np.array: 因缓冲区已满而被移出的样本 (副本)，形状为 [n_channels, n_dropped]
+        """
+        chunk = np.asarray(chunk)
+        n = chunk.shape[1]
+        self.total += n
+        n_dropped = max(0, self.size + n - self.capacity)
+        if n_dropped <= self.size:
+            dropped = self.view()[:, :n_dropped].copy()
+        else:
+            # 数据块比缓冲区还长: 原窗口全部移出，数据块前部直接跳过
+            dropped = np.concatenate([self.view(), chunk[:, :n_dropped - self.size]], axis=1)
+        if n > self.capacity:
+            chunk = chunk[:, -self.capacity:]
+            n = self.capacity
+
+        # 写入位置为当前窗口末尾之后的槽位 (对容量取模)，每个槽位在两半中各写一次
+        slots = (self._head + self.size + np.arange(n)) % self.capacity
+        self._data[:, slots] = chunk
+        self._data[:, slots + self.capacity] = chunk
+
+        new_size = min(self.capacity, self.size + n)
+        self._head = (self._head + self.size + n - new_size) % self.capacity
+        self.size = new_size
+        return dropped
+
+    def reset(self):
+        """清空缓冲区"""
+        self._head = 0
+        self.size = 0
+        self.total = 0
@@ -1,29 +1,147 @@
 import numpy as np
-from scipy import signal  # 使用signal而不是stats来获取detrend函数
+from .dtypes import as_float_array
 
-def preprocess_signal(signal_data, low_freq=0.5, high_freq=45.0, sampling_rate=256):
+# (采样率, 下限, 上限, 阶数) -> 二阶节 (SOS) 滤波器系数
+_sos_cache = {}
+
+def design_bandpass(sampling_rate, low_freq=0.5, high_freq=45.0, order=4):
+    """
+    设计巴特沃斯带通滤波器 (二阶节形式)，每个 (采样率, 频带, 阶数) 只设计一次
+    
+    上限不低于奈奎斯特频率时退化为高通，下限不大于0时退化为低通。
+    
+    参数:
+    sampling_rate (float): 采样率(Hz)
+    low_freq (float): 通带下限(Hz)，None或<=0表示不限
+    high_freq (float): 通带上限(Hz)，None或不低于奈奎斯特频率表示不限
+    order (int): 滤波器阶数
+    
+    返回:
+    np.array: 形状为 [n_sections, 6] 的SOS系数，无需滤波时为None
+    """
+    key = (float(sampling_rate), low_freq, high_freq, order)
+    if key in _sos_cache:
+        return _sos_cache[key]
+    
+    from scipy.signal import butter  # 延迟导入以加快启动
+    nyquist = sampling_rate / 2
+    has_low = low_freq is not None and low_freq > 0
+    has_high = high_freq is not None and high_freq < nyquist
+    if has_low and has_high:
+        sos = butter(order, [low_freq, high_freq], btype='bandpass', fs=sampling_rate, output='sos')
+    elif has_low:
+        sos = butter(order, low_freq, btype='highpass', fs=sampling_rate, output='sos')
+    elif has_high:
+        sos = butter(order, high_freq, btype='lowpass', fs=sampling_rate, output='sos')
+    else:
+        sos = None
+    
+    _sos_cache[key] = sos
+    return sos
+
+def bandpass_filter(signals, sampling_rate, low_freq=0.5, high_freq=45.0, order=4):
+    """
+    对所有通道做一次零相位带通滤波 (前向-后向SOS滤波)
+    
+    参数:
+    signals (np.array): 一维信号或形状为 [n_channels, n_timepoints] 的信号
+    sampling_rate (float): 采样率(Hz)
+    low_freq (float): 通带下限(Hz)
+    high_freq (float): 通带上限(Hz)
+    order (int): 滤波器阶数
+    
+    返回:
+    np.array: 与输入形状和精度相同的滤波后信号
+    """
+    sos = design_bandpass(sampling_rate, low_freq, high_freq, order)
+    signals = as_float_array(signals)
+    if sos is None or signals.shape[-1] < 2:
+        return signals
+    
+    from scipy.signal import sosfiltfilt
+    # 短信号上缩短边缘延拓长度
+    padlen = min(3 * (2 * len(sos) + 1), signals.shape[-1] - 1)
+    return sosfiltfilt(sos, signals, axis=-1, padlen=padlen).astype(signals.dtype, copy=False)
+
+class StreamingBandpass:
+    """
+    分块 (流式) 带通滤波器
+    
+    在块之间保存滤波器状态，依次处理的各块拼接后与对整段信号做一次因果SOS滤波
+    (scipy.signal.sosfilt) 的结果相同，因此长记录可以逐块读取、逐块滤波。
+    流式滤波是因果的，会引入相位延迟，与离线的零相位 bandpass_filter 结果不同。
+    
+    参数:
+    sampling_rate (float): 采样率(Hz)
+    low_freq (float): 通带下限(Hz)
+    high_freq (float): 通带上限(Hz)
+    order (int): 滤波器阶数
+    """
+    
+    def __init__(self, sampling_rate, low_freq=0.5, high_freq=45.0, order=4):
+        self.sos = design_bandpass(sampling_rate, low_freq, high_freq, order)
+        self.state = None
+    
+    def process(self, chunk):
+        """
+        滤波一个数据块
+        
+        参数:
+        chunk (np.array): 形状为 [n_channels, n_chunk_samples] 的数据块
+        
+        返回:
+        np.array: 滤波后的数据块
+        """
+        chunk = np.atleast_2d(as_float_array(chunk))
+        if self.sos is None:
+            return chunk
+        from scipy.signal import sosfilt
+        if self.state is None:
+            # 初始状态为零，与对整段信号调用 sosfilt 一致；状态始终保持float64
+            self.state = np.zeros((len(self.sos), chunk.shape[0], 2))
+        filtered, self.state = sosfilt(self.sos, chunk, axis=-1, zi=self.state)
+        return filtered.astype(chunk.dtype, copy=False)
+    
+    def reset(self):
+        """清除滤波器状态，开始新的数据流"""
+        self.state = None
+
+def preprocess_signal(signal_data, low_freq=0.5, high_freq=45.0, sampling_rate=256, filter_order=4,
+                      overwrite=False):
     """
-    对信号进行预处理，包括滤波等操作
+    对信号进行预处理: 去线性趋势、零相位带通滤波、Z-score标准化
+    
+    多通道信号在一次调用中批量处理，滤波器系数按 (采样率, 频带) 缓存。
+    输出保持输入的精度 (float32或float64)，标准化原地进行。
     
     参数:
-    signal_data (np.array): 原始信号数据
-    low_freq (float): 低通滤波截止频率
-    high_freq (float): 高通滤波截止频率
-    sampling_rate (float): 采样率
+    signal_data (np.array): 一维信号或形状为 [n_channels, n_timepoints] 的信号
+    low_freq (float): 带通滤波下限频率(Hz)
+    high_freq (float): 带通滤波上限频率(Hz)
+    sampling_rate (float): 采样率(Hz)，应使用文件中记录的真实采样率
+    filter_order (int): 滤波器阶数
+    overwrite (bool): 是否允许在输入数组上原地去趋势 (调用方不再需要原始数据时使用，可少一次复制)
     
     返回:
-    np.array: 处理后的信号
+    np.array: 处理后的信号，形状与输入相同
     """
-    # 这里可以添加更多的预处理步骤，如去基线、滤波等
-    # 简单示例: 标准化信号
-    if len(signal_data) == 0:
+    signal_data = as_float_array(signal_data)
+    if signal_data.shape[-1] == 0:
         return np.array([])
+    
+    from scipy import signal  # 使用signal而不是stats来获取detrend函数；延迟导入以加快启动
         
     # 移除线性趋势
-    detrended_signal = signal.detrend(signal_data)  # 从signal模块获取detrend
+    detrended_signal = signal.detrend(signal_data, axis=-1, overwrite_data=overwrite)  # 从signal模块获取detrend
+    
+    # 带通滤波 (滤波结果是新数组，之后的标准化都在它上面原地进行)
+    normalized_signal = bandpass_filter(detrended_signal, sampling_rate, low_freq, high_freq, filter_order)
+    if normalized_signal is detrended_signal and not overwrite:
+        normalized_signal = normalized_signal.copy()
     
     # Z-score标准化
-    normalized_signal = (detrended_signal - np.mean(detrended_signal)) / np.std(detrended_signal)
+    normalized_signal -= normalized_signal.mean(axis=-1, keepdims=True)
+    normalized_signal /= normalized_signal.std(axis=-1, keepdims=True)
     
     return normalized_signal
 
@@ -38,11 +156,63 @@ def coarse_grain_time_series(time_series, scale_factor):
     返回:
     np.array: 粗粒化后的时间序列
     """
-    n = len(time_series)
-    n_coarse = n // scale_factor
+    time_series = as_float_array(time_series)
+    n_coarse = len(time_series) // scale_factor
     if n_coarse == 0:
         return np.array([])
-    coarse_grained_ts = np.zeros(n_coarse)
-    for i in range(n_coarse):
-        coarse_grained_ts[i] = np.mean(time_series[i*scale_factor:(i+1)*scale_factor])
-    return coarse_grained_ts
+    # 与 coarse_grain_all_scales 相同，由float64累积和的跨步差分得到各段均值，两者结果逐位相同
+    cumsum = np.zeros(n_coarse * scale_factor + 1)
+    np.cumsum(time_series[:n_coarse * scale_factor], out=cumsum[1:])
+    coarse = (cumsum[scale_factor::scale_factor] - cumsum[:-1:scale_factor]) / scale_factor
+    return coarse.astype(time_series.dtype, copy=False)
+
+def coarse_grain_all_scales(signals, max_scale):
+    """
+    一次性计算所有尺度的粗粒化序列。
+    
+    对最后一个轴只做一次累积和，每个尺度的粗粒化序列由累积和的跨步差分得到，
+    因此总开销与尺度数无关地只遍历一次样本。累积和使用float64，输出保持输入的精度。
+    
+    参数:
+    signals (np.array): 一维信号或形状为 [n_channels, n_timepoints] 的信号
+    max_scale (int): 最大尺度因子
+    
+    返回:
+    list: 长度为max_scale的列表，第s-1项为尺度s的粗粒化序列，
+          形状为 [..., n_timepoints // s]
+    """
+    return [coarse.copy() for coarse in iter_coarse_grained(signals, max_scale)]
+
+def iter_coarse_grained(signals, max_scale):
+    """
+    逐个尺度生成粗粒化序列，所有尺度共用一个预先分配的输出缓冲区
+    
+    与 coarse_grain_all_scales 结果相同，但每次生成的数组是缓冲区的视图，
+    在取下一个尺度之前有效；调用方需要保留时应自行复制。
+    
+    参数:
+    signals (np.array): 一维信号或形状为 [n_channels, n_timepoints] 的信号
+    max_scale (int): 最大尺度因子
+    
+    返回:
+    iterator: 依次为尺度 1, 2, ..., max_scale 的粗粒化序列，形状为 [..., n_timepoints // s]
+    """
+    signals = as_float_array(signals)
+    n = signals.shape[-1]
+    # 累积和在调用时立即计算，之后每个尺度只做一次跨步差分
+    cumsum = np.zeros(signals.shape[:-1] + (n + 1,))
+    np.cumsum(signals, axis=-1, out=cumsum[..., 1:])
+    buffer = np.empty(signals.shape[:-1] + (n,), dtype=signals.dtype)
+    return _iter_scales(cumsum, buffer, max_scale)
+
+def _iter_scales(cumsum, buffer, max_scale):
+    """由累积和逐个尺度生成粗粒化序列，写入共用的缓冲区"""
+    n = buffer.shape[-1]
+    for scale in range(1, max_scale + 1):
+        n_coarse = n // scale
+        ends = cumsum[..., scale:n_coarse * scale + 1:scale]
+        starts = cumsum[..., 0:(n_coarse - 1) * scale + 1:scale] if n_coarse > 0 else ends
+        coarse = buffer[..., :n_coarse]
+        # 差分和除法在float64中完成，只在写入缓冲区时转换精度
+        np.divide(ends - starts, scale, out=coarse, casting='same_kind')
+        yield coarse
@@ -0,0 +1,130 @@
+"""
+替代数据 (surrogate data) 生成
+
+替代数据保留原始信号的线性性质而破坏其余结构，用作 "信号只是线性随机过程" 这一零假设下的样本:
+    相位随机化 ('phase'): 保留每个通道的功率谱 (幅度谱)，傅里叶相位替换为均匀随机相位
+    IAAFT ('iaaft'):      迭代幅度调整傅里叶变换，同时保留幅度谱 (近似) 和取值分布 (精确)
+
+每个通道使用独立的随机相位，因此替代数据之间也不存在通道间的耦合。一批替代数据在一次批量
+FFT 中生成，形状为 [n_surrogates, n_channels, n_timepoints]；iter_surrogate_blocks 按内存上限
+分块生成，调用方逐块处理，内存占用与替代数据总数无关。
+"""
+import numpy as np
+from .dtypes import as_float_array
+
+SURROGATE_METHODS = ['phase', 'iaaft']
+
+def phase_randomized_surrogates(signals, n_surrogates, rng=None):
+    """
+    生成相位随机化替代数据
+
+    参数:
+    signals (np.array): 一维信号或形状为 [n_channels, n_timepoints] 的信号
+    n_surrogates (int): 每个通道的替代数据个数
+    rng (np.random.Generator): 随机数生成器，None表示新建
+
+    返回:
+    np.array: 形状为 [n_surrogates, n_channels, n_timepoints] 的替代数据，精度与输入相同
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    signals = np.atleast_2d(as_float_array(signals))
+    n = signals.shape[-1]
+    spectrum = np.fft.rfft(signals, axis=-1)
+    phases = rng.uniform(0.0, 2 * np.pi, size=(n_surrogates,) + spectrum.shape)
+    surrogate_spectrum = np.abs(spectrum) * np.exp(1j * phases)
+    # 直流分量 (以及偶数长度时的奈奎斯特分量) 必须为实数，保留原信号的值
+    surrogate_spectrum[..., 0] = spectrum[..., 0]
+    if n % 2 == 0:
+        surrogate_spectrum[..., -1] = spectrum[..., -1]
+    return np.fft.irfft(surrogate_spectrum, n, axis=-1).astype(signals.dtype, copy=False)
+
+def iaaft_surrogates(signals, n_surrogates, rng=None, max_iter=100):
+    """
+    生成IAAFT (迭代幅度调整傅里叶变换) 替代数据
+
+    从原信号的随机排列开始，交替进行: 把幅度谱替换为原信号的幅度谱 (保留当前相位)，再按秩次
+    把取值替换为原信号排序后的取值。所有替代序列在同一批FFT中迭代，秩次不再变化的序列退出批次，
+    之后的迭代只处理尚未收敛的序列；达到 max_iter 时停止。最后一步为秩次替换，因此取值分布与
+    原信号完全相同。
+
+    参数:
+    signals (np.array): 一维信号或形状为 [n_channels, n_timepoints] 的信号
+    n_surrogates (int): 每个通道的替代数据个数
+    rng (np.random.Generator): 随机数生成器，None表示新建
+    max_iter (int): 最大迭代次数
+
+    返回:
+    np.array: 形状为 [n_surrogates, n_channels, n_timepoints] 的替代数据，精度与输入相同
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    signals = np.atleast_2d(as_float_array(signals))
+    n_channels, n = signals.shape
+    # 所有替代序列展开为 [n_surrogates * n_channels, n_timepoints]，第k行对应通道 k % n_channels
+    channel = np.tile(np.arange(n_channels), n_surrogates)
+    amplitude = np.abs(np.fft.rfft(signals, axis=-1))
+    sorted_values = np.sort(signals, axis=-1)
+
+    surrogates = rng.permuted(signals[channel], axis=-1)
+    order = np.argsort(surrogates, axis=-1, kind='stable')
+    active = np.arange(len(surrogates))
+    for _ in range(max_iter):
+        spectrum = np.fft.rfft(surrogates[active], axis=-1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            unit = np.where(spectrum != 0, spectrum / np.abs(spectrum), 1.0)
+        adjusted = np.fft.irfft(amplitude[channel[active]] * unit, n, axis=-1)
+        new_order = np.argsort(adjusted, axis=-1, kind='stable')
+        ranked = np.empty_like(surrogates[active])
+        np.put_along_axis(ranked, new_order, sorted_values[channel[active]], axis=-1)
+        surrogates[active] = ranked
+        changed = (new_order != order[active]).any(axis=1)
+        order[active] = new_order
+        active = active[changed]
+        if len(active) == 0:
+            break
+    return surrogates.reshape(n_surrogates, n_channels, n)
+
+SURROGATE_GENERATORS = {
+    'phase': phase_randomized_surrogates,
+    'iaaft': iaaft_surrogates,
+}
+
+def surrogate_block_size(n_channels, n_timepoints, memory_budget, itemsize=8):
+    """
+    按内存上限确定每块的替代数据个数
+
+    每个替代数据在生成过程中需要时域数组、复数频谱和随机相位等若干份与信号同样长度的数组，
+    按每个样本约 4 * itemsize + 32 字节估计。
+
+    参数:
+    n_channels (int): 通道数
+    n_timepoints (int): 每个通道的样本数
+    memory_budget (int): 每块的内存上限(字节)
+    itemsize (int): 信号精度的字节数
+
+    返回:
+    int: 每块的替代数据个数 (至少为1)
+    """
+    per_surrogate = n_channels * n_timepoints * (4 * itemsize + 32)
+    return max(1, int(memory_budget // per_surrogate))
+
+def iter_surrogate_blocks(signals, n_surrogates, method='phase', rng=None, memory_budget=256 * 1024 ** 2):
+    """
+    分块生成替代数据
+
+    参数:
+    signals (np.array): 一维信号或形状为 [n_channels, n_timepoints] 的信号
+    n_surrogates (int): 每个通道的替代数据总数
+    method (str): 生成方法，可选 'phase', 'iaaft'
+    rng (np.random.Generator): 随机数生成器，None表示新建
+    memory_budget (int): 每块的内存上限(字节)
+
+    返回:
+    generator: 依次产生形状为 [n_block, n_channels, n_timepoints] 的替代数据块，n_block之和为n_surrogates
+    """
+    if method not in SURROGATE_GENERATORS:
+        raise ValueError(f"不支持的替代数据生成方法: {method}，可选: {SURROGATE_METHODS}")
+    rng = np.random.default_rng() if rng is None else rng
+    signals = np.atleast_2d(as_float_array(signals))
+    block_size = surrogate_block_size(*signals.shape, memory_budget, signals.itemsize)
+    for start in range(0, n_surrogates, block_size):
+        yield SURROGATE_GENERATORS[method](signals, min(block_size, n_surrogates - start), rng)
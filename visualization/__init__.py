@@ -1,5 +1,5 @@
 from .plot_entropy import plot_entropy_curve, plot_entropy_comparison
-from .plot_network import plot_network_graph, plot_network_metrics_comparison
+from .plot_network import plot_network_graph, cached_layout, plot_network_metrics_comparison, plot_dynamic_metrics
 
 __all__ = ['plot_entropy_curve', 'plot_entropy_comparison',
-           'plot_network_graph', 'plot_network_metrics_comparison']
+           'plot_network_graph', 'cached_layout', 'plot_network_metrics_comparison', 'plot_dynamic_metrics']
@@ -13,12 +13,13 @@ def plot_entropy_curve(entropy_values, title="Multiscale Entropy Analysis", xlab
     ylabel (str): y轴标签
     save_path (str): 保存路径，None表示不保存
     show (bool): 是否显示图表
-    ax (matplotlib.axes.Axes): 可选，用于绘制在特定的axes上
+    ax (matplotlib.axes.Axes): 可选，用于绘制在特定的axes上 (可复用已有的图表)
     
     返回:
     matplotlib.axes.Axes: 绘制的轴对象
     """
-    if ax is None:
+    created = ax is None
+    if created:
         fig, ax = plt.subplots(figsize=(10, 6))
     
     scales = list(range(1, len(entropy_values) + 1))
@@ -30,12 +31,12 @@ def plot_entropy_curve(entropy_values, title="Multiscale Entropy Analysis", xlab
     ax.grid(True)
     
     if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        ax.figure.savefig(save_path, dpi=300, bbox_inches='tight')
     
     if show:
         plt.show()
-    elif ax is None:  # 如果是新创建的图且不显示，则关闭
-        plt.close()
+    elif created:  # 如果是新创建的图且不显示，则关闭
+        plt.close(ax.figure)
     
     return ax
 
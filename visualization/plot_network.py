@@ -2,21 +2,50 @@ import matplotlib.pyplot as plt
 import networkx as nx
 import numpy as np
 
+# 按节点集合缓存的节点布局
+_layout_cache = {}
+
+def cached_layout(G, seed=42):
+    """
+    获取网络的节点布局，节点集合相同的网络共用同一布局
+    
+    布局在以这些节点构成的完全图上计算，只取决于节点集合而与边无关，因此不同记录的
+    同一通道总是画在相同位置，且每个节点集合只需计算一次spring布局。
+    
+    参数:
+    G (networkx.Graph): 网络图
+    seed (int): spring布局的随机种子
+    
+    返回:
+    dict: 节点到二维坐标的字典
+    """
+    key = (tuple(sorted(G.nodes())), seed)
+    if key not in _layout_cache:
+        _layout_cache[key] = nx.spring_layout(nx.complete_graph(key[0]), seed=seed)
+    return _layout_cache[key]
+
 def plot_network_graph(G, title="Signal Similarity Network", node_color='skyblue', 
-                      edge_color_by_weight=True, save_path=None, show=False, ax=None):
+                      edge_color_by_weight=True, save_path=None, show=False, ax=None,
+                      pos=None, cax=None):
     """
     可视化网络图
     
     参数:
-    G (networkx.Graph): 待可视化的网络
+    G (networkx.Graph | np.array): 待可视化的网络，或加权邻接矩阵
     title (str): 图表标题
     node_color (str): 节点颜色
     edge_color_by_weight (bool): 是否根据边的权重着色
     save_path (str): 保存路径，None表示不保存
     show (bool): 是否显示图表
-    ax (matplotlib.axes.Axes): 可选，用于绘制在特定的axes上
+    ax (matplotlib.axes.Axes): 可选，用于绘制在特定的axes上 (可复用已有的图表)
+    pos (dict): 可选，节点布局，None表示使用按节点集合缓存的布局
+    cax (matplotlib.axes.Axes): 可选，绘制颜色条的axes，复用图表时避免每次新建颜色条
     """
-    if ax is None:
+    if isinstance(G, np.ndarray):
+        G = nx.from_numpy_array(G)
+    
+    created = ax is None
+    if created:
         fig, ax = plt.subplots(figsize=(10, 8))
     
     # 判断网络是否为空
@@ -25,8 +54,9 @@ def plot_network_graph(G, title="Signal Similarity Network", node_color='skyblue
         ax.axis('off')
         return ax
     
-    # 获取节点位置 - 使用spring布局
-    pos = nx.spring_layout(G, seed=42)  # 固定seed以便结果可复现
+    # 获取节点位置 - 同一节点集合复用缓存的spring布局
+    if pos is None:
+        pos = cached_layout(G)
     
     # 绘制节点
     nx.draw_networkx_nodes(G, pos, node_color=node_color, node_size=500, alpha=0.8, ax=ax)
@@ -50,35 +80,44 @@ def plot_network_graph(G, title="Signal Similarity Network", node_color='skyblue
         # 添加颜色条
         sm = plt.cm.ScalarMappable(cmap=cmap, norm=norm)
         sm.set_array([])
-        plt.colorbar(sm, ax=ax, label='Edge Weight')
+        if cax is None:
+            ax.figure.colorbar(sm, ax=ax, label='Edge Weight')
+        else:
+            cax.set_visible(True)
+            ax.figure.colorbar(sm, cax=cax, label='Edge Weight')
     else:
         # 正常绘制边，不考虑权重
         nx.draw_networkx_edges(G, pos, width=2, edge_color='gray', alpha=0.7, ax=ax)
+        if cax is not None:
+            cax.set_visible(False)
     
     ax.set_title(title)
     ax.axis('off')
     
     if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
+        ax.figure.savefig(save_path, dpi=300, bbox_inches='tight')
     
     if show:
         plt.show()
-    elif ax is None:  # 如果是新创建的图且不显示，则关闭
-        plt.close()
+    elif created:  # 如果是新创建的图且不显示，则关闭
+        plt.close(ax.figure)
     
     return ax
 
 def plot_network_metrics_comparison(metrics_dict, metrics_to_plot=None, title="Network Metrics Comparison",
-                                   save_path=None, show=False):
+                                   save_path=None, show=False, ax=None):
     """
     比较多个网络的指标
     
+    每个指标保存为一张图，所有指标依次清空并复用同一个figure和axes。
+    
     参数:
     metrics_dict (dict): 键为网络名，值为网络指标字典的字典
     metrics_to_plot (list): 要绘制的指标名称列表，None表示全部
     title (str): 图表标题
     save_path (str): 保存路径，None表示不保存
     show (bool): 是否显示图表
+    ax (matplotlib.axes.Axes): 可选，用于绘制在特定的axes上 (可复用已有的图表)
     """
     if not metrics_dict:
         print("错误：metrics_dict为空")
@@ -102,44 +141,51 @@ def plot_network_metrics_comparison(metrics_dict, metrics_to_plot=None, title="N
     metrics_to_plot = common_metrics
     network_names = list(metrics_dict.keys())
     
-    # 为每个指标创建单独的图表
+    # 为每个指标保存单独的图表，复用同一个axes
+    created = ax is None
+    if created:
+        fig, ax = plt.subplots(figsize=(10, 6))
+    fig = ax.figure
+    
     for metric in metrics_to_plot:
         try:
-            plt.figure(figsize=(10, 6))
+            ax.clear()
             
             # 获取指标值
             values = [metrics_dict[name].get(metric, np.nan) for name in network_names]
             
             # 绘制柱状图
-            bars = plt.bar(range(len(network_names)), values, color='skyblue', alpha=0.7)
+            bars = ax.bar(range(len(network_names)), values, color='skyblue', alpha=0.7)
             
             # 添加数值标签
             for bar, value in zip(bars, values):
                 if not np.isnan(value):
                     height = bar.get_height()
-                    plt.text(bar.get_x() + bar.get_width()/2., height + 0.02,
+                    ax.text(bar.get_x() + bar.get_width()/2., height + 0.02,
                            f'{value:.4f}', ha='center', va='bottom', fontsize=9)
             
             # 设置标题和标签
-            plt.title(f'Comparison of {metric}')
-            plt.xticks(range(len(network_names)), network_names, rotation=45, ha='right')
-            plt.ylabel(metric)
-            plt.grid(axis='y', linestyle='--', alpha=0.7)
-            plt.tight_layout()
+            ax.set_title(f'Comparison of {metric}')
+            ax.set_xticks(range(len(network_names)))
+            ax.set_xticklabels(network_names, rotation=45, ha='right')
+            ax.set_ylabel(metric)
+            ax.grid(axis='y', linestyle='--', alpha=0.7)
+            fig.tight_layout()
             
             # 保存图表
             if save_path:
                 metric_save_path = save_path.replace('.png', f'_{metric}.png')
-                plt.savefig(metric_save_path, dpi=100)
+                fig.savefig(metric_save_path, dpi=100)
             
             if show:
                 plt.show()
-            else:
-                plt.close()
                 
         except Exception as e:
             print(f"绘制指标 {metric} 时出错: {e}")
     
+    if created and not show:
+        plt.close(fig)
+    
     # 创建汇总信息的文本文件
     if save_path:
         try:
@@ -156,3 +202,45 @@ def plot_network_metrics_comparison(metrics_dict, metrics_to_plot=None, title="N
                     f.write("\n")
         except Exception as e:
             print(f"创建汇总文件时出错: {e}")
+
+def plot_dynamic_metrics(starts, metrics, title="Dynamic Network Metrics", save_path=None, show=False,
+                         axes=None, xlabel="Window Start (samples)"):
+    """
+    绘制动态网络指标随窗口位置变化的曲线
+    
+    参数:
+    starts (np.array): 每个窗口的起始样本
+    metrics (dict): 指标名称到每个窗口指标值数组的字典
+    title (str): 图表标题
+    save_path (str): 保存路径，None表示不保存
+    show (bool): 是否显示图表
+    axes (np.array): 可选，形状为 [n_metrics, 1] 的axes数组 (可复用已有的图表)
+    xlabel (str): 横轴标签 (也用于绘制阈值扫描等其他横轴上的指标曲线)
+    
+    返回:
+    matplotlib.figure.Figure: 图表对象
+    """
+    names = list(metrics.keys())
+    created = axes is None
+    if created:
+        fig, axes = plt.subplots(len(names), 1, figsize=(12, 2.5 * len(names)), sharex=True, squeeze=False)
+    fig = axes[0, 0].figure
+    
+    for ax, name in zip(axes[:, 0], names):
+        ax.plot(starts, metrics[name], linewidth=1.5)
+        ax.set_ylabel(name)
+        ax.grid(True)
+    
+    axes[0, 0].set_title(title)
+    axes[-1, 0].set_xlabel(xlabel)
+    fig.tight_layout()
+    
+    if save_path:
+        fig.savefig(save_path, dpi=300, bbox_inches='tight')
+    
+    if show:
+        plt.show()
+    elif created:
+        plt.close(fig)
+    
+    return fig